@@ -0,0 +1,261 @@
+'''
+
+ Description:
+
+    Address planning for the demo networks. Subnet, range, reservation
+    and record addresses are calculated arithmetically from integers so
+    host and subnet lists are never built, whatever the size of the
+    container or subnets
+
+ Requirements:
+   Python3 with ipaddress module
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import ipaddress
+
+
+def int_to_ip(n):
+    '''
+    Convert an integer to a dotted quad IPv4 address
+
+    Parameters:
+        n (int): Address as integer
+
+    Returns:
+        str: IPv4 address
+    '''
+    return '%d.%d.%d.%d' % (n >> 24, (n >> 16) & 255, (n >> 8) & 255, n & 255)
+
+
+def ip_to_int(ip):
+    '''
+    Convert a dotted quad IPv4 address to an integer
+
+    Parameters:
+        ip (str): IPv4 address
+
+    Returns:
+        int: Address as integer
+    '''
+    a, b, c, d = ip.split('.')
+
+    return (int(a) << 24) | (int(b) << 16) | (int(c) << 8) | int(d)
+
+
+def validate_ip(ip):
+    '''
+    Check for a valid IPv4 or IPv6 address
+
+    Parameters:
+        ip (str): IP address
+
+    Returns:
+        bool: True if valid
+    '''
+    try:
+        ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+
+    return True
+
+
+def reverse_zone(n):
+    '''
+    Reverse zone fqdn for the /16 containing an address
+
+    Parameters:
+        n (int): IPv4 address as integer
+
+    Returns:
+        str: Zone fqdn
+    '''
+    return '%d.%d.in-addr.arpa.' % ((n >> 16) & 255, n >> 24)
+
+
+def parent_subnet(ip, cidr):
+    '''
+    Return the subnet, of prefix length cidr, containing an address
+
+    Parameters:
+        ip (str): IPv4 address
+        cidr (str/int): Prefix length
+
+    Returns:
+        str: Subnet as address/cidr
+    '''
+    mask = (0xffffffff << (32 - int(cidr))) & 0xffffffff
+
+    return int_to_ip(ip_to_int(ip) & mask) + '/' + str(cidr)
+
+
+def container(base_net, container_cidr):
+    '''
+    Return the container network
+
+    Parameters:
+        base_net (str): Base network address
+        container_cidr (str/int): Container prefix length
+
+    Returns:
+        network (obj): ipaddress.IPv4Network
+    '''
+    return ipaddress.ip_network(base_net + '/' + str(container_cidr))
+
+
+def subnet_count(base_net, container_cidr, cidr):
+    '''
+    Number of subnets of prefix length cidr in the container
+
+    Parameters:
+        base_net (str): Base network address
+        container_cidr (str/int): Container prefix length
+        cidr (str/int): Subnet prefix length
+
+    Returns:
+        int: Number of subnets
+    '''
+    block = container(base_net, container_cidr)
+
+    return 2 ** (int(cidr) - block.prefixlen)
+
+
+def subnet_batch(base_net, container_cidr, cidr, start=0, stop=None):
+    '''
+    Network addresses, as integers, of a batch of subnets. A range
+    object is returned so no list is built however large the batch.
+
+    Parameters:
+        base_net (str): Base network address
+        container_cidr (str/int): Container prefix length
+        cidr (str/int): Subnet prefix length
+        start (int): Index of first subnet
+        stop (int): Index after last subnet, default all subnets
+
+    Returns:
+        range: Integer network addresses
+    '''
+    block = container(base_net, container_cidr)
+    size = 2 ** (block.max_prefixlen - int(cidr))
+    first = int(block.network_address)
+    count = 2 ** (int(cidr) - block.prefixlen)
+    if stop is None or stop > count:
+        stop = count
+
+    return range(first + start * size, first + stop * size, size)
+
+
+def iter_subnets(base_net, container_cidr, cidr, start=0, stop=None):
+    '''
+    Lazily generate subnets of the container
+
+    Parameters:
+        base_net (str): Base network address
+        container_cidr (str/int): Container prefix length
+        cidr (str/int): Subnet prefix length
+        start (int): Index of first subnet
+        stop (int): Index after last subnet, default all subnets
+
+    Yields:
+        network (obj): ipaddress.IPv4Network
+    '''
+    prefix = int(cidr)
+    for address in subnet_batch(base_net, container_cidr, cidr, start, stop):
+        yield ipaddress.IPv4Network((address, prefix))
+
+
+def range_bounds(network):
+    '''
+    DHCP Range covering the top half of the network (less broadcast)
+
+    Parameters:
+        network (obj): ipaddress.IPv4Network
+
+    Returns:
+        (start, end) tuple of str
+    '''
+    range_size = network.num_addresses // 2
+    broadcast = int(network.network_address) + network.num_addresses - 1
+
+    return int_to_ip(broadcast - (range_size + 1)), int_to_ip(broadcast - 1)
+
+
+def reservation_count(network, no_of_ips):
+    '''
+    Number of IP reservations for the network, the smaller of no_of_ips
+    and a quarter of the network
+
+    Parameters:
+        network (obj): ipaddress.IPv4Network
+        no_of_ips (int): Requested number of IPs
+
+    Returns:
+        int
+    '''
+    return min(int(no_of_ips), network.num_addresses // 4)
+
+
+def reservation_addresses(network, no_of_ips):
+    '''
+    Generate the reservation addresses. These start at the second host
+    address, i.e. the addresses are network + 2 ... network + no_of_ips
+
+    Parameters:
+        network (obj): ipaddress.IPv4Network
+        no_of_ips (int): Number of IPs (as reservation_count())
+
+    Yields:
+        str: IPv4 address
+    '''
+    first = int(network.network_address)
+    for n in range(2, int(no_of_ips) + 1):
+        yield int_to_ip(first + n)
+
+
+def host_address(network, n):
+    '''
+    Return the nth address of the network
+
+    Parameters:
+        network (obj): ipaddress.IPv4Network
+        n (int): Offset from network address
+
+    Returns:
+        str: IPv4 address
+    '''
+    return int_to_ip(int(network.network_address) + n)
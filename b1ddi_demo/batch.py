@@ -0,0 +1,253 @@
+'''
+
+ Description:
+
+    Run many demos, from several ini files or several demo sections of
+    an ini file, concurrently in one process.
+    
+    Demos share one HTTP transport. Requests are limited by a global
+    budget (requests in flight and requests per second) and by a budget
+    for each tenant (bloxone ini file), whose adaptive rate controller is
+    shared by all demos for the tenant.
+
+ Requirements:
+   Python3 with concurrent.futures, configparser and threading modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import concurrent.futures
+import configparser
+import logging
+import threading
+import time
+from b1ddi_demo import client
+from b1ddi_demo import ratelimit
+
+# Global Variables
+log = logging.getLogger(__name__)
+
+SECTION = 'B1DDI_Demo'
+
+
+def demo_sections(filename):
+    '''
+    Find the demo sections of an ini file, B1DDI_Demo and any sections
+    named B1DDI_Demo:<name>
+
+    Parameters:
+        filename (str): ini file
+
+    Returns:
+        list: Section names
+    '''
+    cfg = configparser.ConfigParser()
+    try:
+        cfg.read(filename)
+    except configparser.Error as err:
+        log.error(err)
+    sections = [ s for s in cfg.sections() 
+                 if s == SECTION or s.startswith(SECTION + ':') ]
+
+    return sections
+
+
+def demo_label(filename, section):
+    if section == SECTION:
+        return filename
+    return filename + ':' + section.split(':', 1)[1]
+
+
+class Budget:
+    '''
+    Limits on requests in flight and requests per second
+    '''
+
+    def __init__(self, inflight=0, rate=0.0):
+        '''
+        Parameters:
+            inflight (int): Maximum requests in flight, 0 for no limit
+            rate (float): Maximum requests per second, 0 for no limit
+        '''
+        self.semaphore = (threading.BoundedSemaphore(inflight) 
+                          if inflight else None)
+        self.controller = (ratelimit.RateController(rate=rate, max_rate=rate,
+                                                    increase=0.0) 
+                           if rate else None)
+
+        return
+
+
+    def acquire(self):
+        if self.controller:
+            self.controller.acquire()
+        if self.semaphore:
+            self.semaphore.acquire()
+        return
+
+
+    def release(self):
+        if self.semaphore:
+            self.semaphore.release()
+        return
+
+
+class Tenant:
+    '''
+    Resources shared by the demos for one tenant
+    '''
+
+    def __init__(self, name, budget, controller=None):
+        '''
+        Parameters:
+            name (str): Tenant, the bloxone ini file
+            budget (obj): Budget for the tenant
+            controller (obj): Adaptive RateController for the tenant
+        '''
+        self.name = name
+        self.budget = budget
+        self.controller = controller
+
+        return
+
+
+class Batch:
+    '''
+    Shared resources and budgets for a batch of demos
+    '''
+
+    def __init__(self, transport, inflight=0, rate=0.0, 
+                 tenant_inflight=0):
+        '''
+        Parameters:
+            transport (obj): Transport shared by all demos
+            inflight (int): Global maximum requests in flight
+            rate (float): Global maximum requests per second
+            tenant_inflight (int): Maximum requests in flight per tenant
+        '''
+        self.transport = transport
+        self.budget = Budget(inflight, rate)
+        self.tenant_inflight = tenant_inflight
+        self.tenants = {}
+        self.lock = threading.Lock()
+
+        return
+
+
+    def tenant(self, config):
+        '''
+        Get the tenant for a demo config, the first demo for a tenant
+        sets its rate
+
+        Parameters:
+            config (dict): Demo config
+
+        Returns:
+            tenant (obj): Tenant
+        '''
+        name = config['b1inifile']
+        with self.lock:
+            if name not in self.tenants:
+                self.tenants[name] = Tenant(name, 
+                                            Budget(self.tenant_inflight), 
+                                            ratelimit.from_config(config))
+
+        return self.tenants[name]
+
+
+    def run(self, demos, func, workers=0):
+        '''
+        Run demos concurrently
+
+        Parameters:
+            demos (list): (label, config) tuples
+            func (callable): Called as func(label, config) for each demo,
+                             returns an exit code
+            workers (int): Demos run at once, 0 for all
+
+        Returns:
+            results (dict): Exit code and seconds taken for each label
+        '''
+        results = {}
+
+        def timed(label, config):
+            start = time.perf_counter()
+            try:
+                exitcode = func(label, config)
+            except Exception as err:
+                log.error("Demo %s failed: %s", label, err)
+                exitcode = 99
+            return exitcode, time.perf_counter() - start
+
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=(workers or len(demos) or 1)) as executor:
+            futures = { executor.submit(timed, label, config): label 
+                        for label, config in demos }
+            for future in concurrent.futures.as_completed(futures):
+                results[futures[future]] = future.result()
+
+        return results
+
+
+def install_budget(b1ddi, batch, tenant):
+    '''
+    Hold each request of a bloxone object within the tenant and global
+    budgets. The tenant budget is acquired first so a throttled tenant
+    does not hold global capacity while it waits.
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        batch (obj): Batch
+        tenant (obj): Tenant
+
+    Returns:
+        tenant (obj): Tenant
+    '''
+    def budgeted(method, call, url, *args, **kwargs):
+        tenant.budget.acquire()
+        try:
+            batch.budget.acquire()
+            try:
+                return call(url, *args, **kwargs)
+            finally:
+                batch.budget.release()
+        finally:
+            tenant.budget.release()
+
+    client.wrap_api(b1ddi, budgeted)
+    b1ddi.tenant = tenant
+
+    return tenant
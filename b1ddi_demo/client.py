@@ -0,0 +1,112 @@
+'''
+
+ Description:
+
+    Helpers to layer behaviour (rate control, retries, metrics, etc.) on
+    to the HTTP calls made by a bloxone.b1ddi object. All API calls made
+    by bloxone go through the _apiget, _apipost, _apidelete, _apiput and
+    _apipatch methods, these are wrapped on the instance.
+
+ Requirements:
+   Python3 with functools and urllib modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import functools
+import urllib.parse
+
+# HTTP method used by each of the bloxone request methods
+API_METHODS = { '_apiget': 'GET',
+                '_apipost': 'POST',
+                '_apidelete': 'DELETE',
+                '_apiput': 'PUT',
+                '_apipatch': 'PATCH' }
+
+
+def connect(inifile):
+    '''
+    Create a bloxone.b1ddi client. bloxone, and the HTTP stack it
+    brings with it, is imported on first use so that --help, dry runs
+    and exports do not pay for it.
+
+    Parameters:
+        inifile (str): bloxone ini file
+
+    Returns:
+        b1ddi (obj): bloxone.b1ddi object
+    '''
+    import bloxone
+
+    return bloxone.b1ddi(inifile)
+
+
+def wrap_api(b1ddi, wrapper):
+    '''
+    Wrap the request methods of a bloxone object. Wrappers stack, the
+    last installed is called first.
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        wrapper (callable): Called as wrapper(method, call, url, *args,
+                            **kwargs) where call is the wrapped request
+                            method and must return a response object
+    '''
+    for attr, method in API_METHODS.items():
+        call = getattr(b1ddi, attr)
+        setattr(b1ddi, attr, functools.partial(wrapper, method, call))
+
+    return
+
+
+def endpoint(url):
+    '''
+    Reduce a request URL to its endpoint, e.g. /ipam/subnet, removing the
+    base URL, object ids and query parameters
+
+    Parameters:
+        url (str): Request URL
+
+    Returns:
+        str: Endpoint
+    '''
+    path = urllib.parse.urlsplit(url).path
+    if '/api/ddi/' in path:
+        # /api/ddi/<version>/<area>/<object>[/<id>...]
+        parts = path.split('/api/ddi/', 1)[1].split('/')
+        path = '/' + '/'.join(parts[1:3])
+
+    return path
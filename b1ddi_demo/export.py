@@ -0,0 +1,327 @@
+'''
+
+ Description:
+
+    Export the planned demo data as bulk import files, one file per object
+    type in CSV or JSON lines, as an alternative to creating each object
+    with its own API request. Plan entries (see b1ddi_demo.plan) are
+    written as they are generated, in chunks, so the data set is never held
+    in memory. References to other objects use their names rather than ids.
+    
+    An optional uploader sends each file, streamed from disk, to a bulk
+    import URL supplied by the caller.
+
+ Requirements:
+   Python3 with csv, json, logging, os and time modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import logging
+import csv
+import json
+import os
+import time
+from b1ddi_demo import client
+from b1ddi_demo import plan
+
+# Global Variables
+log = logging.getLogger(__name__)
+
+CHUNK = 10000
+
+# File name and columns for each object type, in import order
+FILES = { '/ipam/ip_space': 'ip_space',
+          '/ipam/address_block': 'address_block',
+          '/ipam/subnet': 'subnet',
+          '/ipam/range': 'range',
+          '/ipam/address': 'address',
+          '/dns/view': 'dns_view',
+          '/dns/auth_zone': 'auth_zone',
+          '/dns/record': 'record' }
+
+COLUMNS = { '/ipam/ip_space': [ 'name', 'tags' ],
+            '/ipam/address_block': [ 'address', 'cidr', 'space', 
+                                     'comment', 'tags' ],
+            '/ipam/subnet': [ 'address', 'cidr', 'space', 'comment', 'tags' ],
+            '/ipam/range': [ 'start', 'end', 'space', 'tags' ],
+            '/ipam/address': [ 'address', 'space', 'tags' ],
+            '/dns/view': [ 'name', 'tags' ],
+            '/dns/auth_zone': [ 'fqdn', 'view', 'nsgs', 'primary_type', 
+                                'tags' ],
+            '/dns/record': [ 'name_in_zone', 'zone', 'type', 'rdata', 
+                             'options', 'inheritance_sources', 'tags' ] }
+
+CONTENT_TYPES = { 'csv': 'text/csv', 'json': 'application/x-ndjson' }
+
+
+class ExportFile:
+    '''
+    Rows for one object type, buffered and written in chunks. With 
+    rows_per_file set the rows are split over numbered files.
+    '''
+
+    def __init__(self, directory, objpath, format='csv', chunk=CHUNK,
+                 rows_per_file=0):
+        '''
+        Parameters:
+            directory (str): Output directory
+            objpath (str): Swagger object path
+            format (str): csv or json
+            chunk (int): Rows buffered between writes
+            rows_per_file (int): Maximum rows in each file, 0 for no limit
+        '''
+        self.directory = directory
+        self.objpath = objpath
+        self.format = format
+        self.chunk = max(1, int(chunk))
+        self.rows_per_file = int(rows_per_file)
+        self.columns = COLUMNS[objpath]
+        self.buffer = []
+        self.files = []
+        self.handle = None
+        self.rows = 0
+
+        return
+
+
+    def _open(self):
+        name = FILES[self.objpath]
+        if self.rows_per_file:
+            name += '-%04d' % (len(self.files) + 1)
+        filename = os.path.join(self.directory, name + '.' + 
+                                ('csv' if self.format == 'csv' else 'jsonl'))
+        # Written to a temporary file, only complete files are exposed
+        self.handle = open(filename + '.tmp', 'w', newline='')
+        if self.format == 'csv':
+            self.writer = csv.writer(self.handle)
+            self.writer.writerow(self.columns)
+        self.files.append([ filename, 0 ])
+
+        return
+
+
+    def _close(self):
+        if self.handle:
+            self.handle.close()
+            os.replace(self.handle.name, self.files[-1][0])
+            self.handle = None
+
+        return
+
+
+    def flush(self):
+        '''
+        Write the buffered rows
+        '''
+        rows = self.buffer
+        while rows:
+            if not self.handle:
+                self._open()
+            room = len(rows)
+            if self.rows_per_file:
+                room = min(room, self.rows_per_file - self.files[-1][1])
+            if self.format == 'csv':
+                self.writer.writerows(rows[:room])
+            else:
+                self.handle.write('\n'.join(rows[:room]) + '\n')
+            self.files[-1][1] += room
+            rows = rows[room:]
+            if self.rows_per_file and self.files[-1][1] >= self.rows_per_file:
+                self._close()
+        self.buffer = []
+
+        return
+
+
+    def write(self, body):
+        '''
+        Add an object
+
+        Parameters:
+            body (str): JSON object
+        '''
+        if self.format == 'csv':
+            obj = json.loads(body)
+            row = []
+            for column in self.columns:
+                value = obj.get(column, '')
+                if isinstance(value, (dict, list)):
+                    value = json.dumps(value)
+                row.append(value)
+            self.buffer.append(row)
+        else:
+            self.buffer.append(body)
+        self.rows += 1
+        if len(self.buffer) >= self.chunk:
+            self.flush()
+
+        return
+
+
+    def close(self):
+        '''
+        Write any buffered rows and close the file
+
+        Returns:
+            list: (filename, rows) for each file written
+        '''
+        self.flush()
+        self._close()
+
+        return [ tuple(f) for f in self.files ]
+
+
+def reference_name(entry):
+    '''
+    Name used in place of the id of a plan entry's object
+
+    Parameters:
+        entry (dict): Plan entry
+
+    Returns:
+        str: Name, fqdn or lookup value of the object
+    '''
+    if entry['op'] == 'lookup':
+        return entry['value']
+    obj = json.loads(entry['body'])
+
+    return obj.get('name') or obj.get('fqdn') or obj.get('address', '')
+
+
+def export(entries, directory, format='csv', chunk=CHUNK, rows_per_file=0,
+           now=''):
+    '''
+    Write plan entries to bulk import files
+
+    Parameters:
+        entries (iter): Iterable of plan entry dicts
+        directory (str): Output directory
+        format (str): csv or json
+        chunk (int): Rows buffered between writes
+        rows_per_file (int): Maximum rows in each file, 0 for no limit
+        now (str): Value for the Created tag
+
+    Returns:
+        files (list): (objpath, filename, rows) for each file, in 
+                      import order
+    '''
+    os.makedirs(directory, exist_ok=True)
+    names = {}
+    outputs = {}
+    created = json.dumps(now)
+
+    for entry in entries:
+        if entry['op'] == 'barrier':
+            continue
+        if entry.get('ref'):
+            names[entry['ref']] = reference_name(entry)
+        if entry['op'] != 'create':
+            continue
+        body = entry['body'].replace('"' + plan.NOW + '"', created)
+        while '"$ref:' in body:
+            start = body.index('"$ref:')
+            end = body.index('"', start + 1)
+            body = (body[:start] + json.dumps(names.get(body[start + 6:end],
+                                                        '')) 
+                    + body[end + 1:])
+        output = outputs.get(entry['objpath'])
+        if not output:
+            output = ExportFile(directory, entry['objpath'], format=format,
+                                chunk=chunk, rows_per_file=rows_per_file)
+            outputs[entry['objpath']] = output
+        output.write(body)
+
+    files = []
+    for objpath in FILES:
+        if objpath in outputs:
+            for filename, rows in outputs[objpath].close():
+                files.append((objpath, filename, rows))
+
+    return files
+
+
+def upload(b1ddi, files, url, format='csv'):
+    '''
+    Upload bulk import files, in import order, stopping at the first
+    failure. Each file is streamed from disk as the request body.
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object, for authentication and its 
+                     transport if installed
+        files (list): (objpath, filename, rows) as returned by export()
+        url (str): Bulk import URL
+        format (str): csv or json
+
+    Returns:
+        uploaded (int): Number of files uploaded
+    '''
+    import requests
+
+    uploaded = 0
+    headers = { k: v for k, v in b1ddi.headers.items() 
+                if k.lower() != 'content-type' }
+    headers['Content-Type'] = CONTENT_TYPES[format]
+
+    for objpath, filename, rows in files:
+        log.info("Uploading %s, %s %s objects", filename, rows, objpath)
+        start = time.perf_counter()
+        with open(filename, 'rb') as f:
+            try:
+                if hasattr(b1ddi, 'transport'):
+                    response = b1ddi.transport.request('POST', url, headers,
+                                                       body=f)
+                else:
+                    response = requests.post(url, headers=headers, data=f)
+            except requests.exceptions.RequestException as err:
+                log.error("--- Upload of %s failed: %s", filename, err)
+                break
+        if hasattr(b1ddi, 'metrics'):
+            b1ddi.metrics.request('POST', client.endpoint(url), 
+                                  time.perf_counter() - start,
+                                  response.status_code, 
+                                  os.path.getsize(filename),
+                                  len(response.content))
+        if response.status_code in b1ddi.return_codes_ok + [ 202 ]:
+            log.info("+++ %s uploaded", filename)
+            uploaded += 1
+        else:
+            log.error("--- Upload of %s failed", filename)
+            log.debug("Return code: %s", response.status_code)
+            log.debug("Return body: %s", response.text)
+            break
+
+    return uploaded
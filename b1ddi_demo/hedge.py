@@ -0,0 +1,259 @@
+'''
+
+ Description:
+
+    Hedged reads. A GET that has not completed within the recent 95th
+    percentile latency for its endpoint is sent again and whichever
+    response arrives first is used, trimming the tail latency of lookups
+    that the rest of a run waits on. Hedges are limited to a fraction of
+    reads so a slow API is not loaded further.
+
+ Requirements:
+   Python3 with collections, concurrent.futures, threading and time modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import logging
+import collections
+import concurrent.futures
+import threading
+import time
+from b1ddi_demo import client
+from b1ddi_demo import metrics
+
+# Global Variables
+log = logging.getLogger(__name__)
+
+# Reads of an endpoint needed before its own percentile is used
+MIN_SAMPLES = 20
+
+
+class Hedger:
+    '''
+    Send a second copy of slow reads, within a budget
+    '''
+
+    def __init__(self, percentile=95, budget=0.05, burst=2, delay=0.1,
+                 min_delay=0.005, workers=32):
+        '''
+        Parameters:
+            percentile (float): Latency percentile to hedge after
+            budget (float): Maximum hedges as a fraction of reads
+            burst (int): Hedges allowed in addition to the budget, so
+                         the first reads of a run can be hedged
+            delay (float): Seconds to hedge after until there are enough
+                           reads to measure the percentile
+            min_delay (float): Shortest delay before hedging
+            workers (int): Maximum reads, and hedges, in flight
+        '''
+        self.percentile = float(percentile)
+        self.budget = float(budget)
+        self.burst = int(burst)
+        self.default_delay = float(delay)
+        self.min_delay = float(min_delay)
+        self.latency = collections.defaultdict(metrics.Histogram)
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(2, int(workers)), thread_name_prefix='hedge')
+        self.lock = threading.Lock()
+        # Set by the timer when a read is sent, see install_timer()
+        self.local = threading.local()
+        # Statistics
+        self.requests = 0
+        self.hedged = 0
+        self.wins = 0
+
+        return
+
+
+    def delay(self, endpoint):
+        '''
+        Seconds to wait for a read before hedging it
+
+        Parameters:
+            endpoint (str): API endpoint, e.g. /ipam/subnet
+
+        Returns:
+            float: Seconds
+        '''
+        with self.lock:
+            for key in [ endpoint, '' ]:
+                if self.latency[key].count >= MIN_SAMPLES:
+                    return max(self.min_delay, 
+                               self.latency[key].percentile(self.percentile))
+
+        return self.default_delay
+
+
+    def allow(self):
+        '''
+        Take a hedge from the budget
+
+        Returns:
+            bool: True if a hedge may be sent
+        '''
+        with self.lock:
+            if self.hedged < self.budget * self.requests + self.burst:
+                self.hedged += 1
+                return True
+
+        return False
+
+
+    def record(self, endpoint, seconds):
+        with self.lock:
+            self.latency[endpoint].record(seconds)
+            self.latency[''].record(seconds)
+        return
+
+
+    def request(self, endpoint, call, url, *args, **kwargs):
+        '''
+        Make a read, hedging it if it is slow
+
+        Parameters:
+            endpoint (str): API endpoint for latency tracking
+            call (callable): Request method
+            url (str): Request URL
+
+        Returns:
+            response (obj): First response received
+        '''
+        def attempt(sent):
+            self.local.sent = sent
+            try:
+                return call(url, *args, **kwargs)
+            finally:
+                self.local.sent = None
+
+        with self.lock:
+            self.requests += 1
+        sent = threading.Event()
+        first = self.executor.submit(attempt, sent)
+        first.add_done_callback(lambda f: sent.set())
+        # Only hedge reads that are slow on the wire, not those waiting
+        # for the rate limiter
+        sent.wait()
+        done, _ = concurrent.futures.wait([ first ], 
+                                          timeout=self.delay(endpoint))
+        if done or not self.allow():
+            return first.result()
+
+        log.debug("Hedging GET %s", endpoint)
+        second = self.executor.submit(attempt, threading.Event())
+        pending = [ first, second ]
+        winner = None
+        while pending and not winner:
+            done, pending = concurrent.futures.wait(pending,
+                return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                if not future.exception():
+                    winner = future
+                    break
+        if not winner:
+            # Both failed, report the original error
+            return first.result()
+        if winner is second:
+            with self.lock:
+                self.wins += 1
+        for future in [ first, second ]:
+            if future is not winner and not future.cancel():
+                # Release the connection of the losing request
+                future.add_done_callback(lambda f: f.exception() or 
+                                         f.result().close())
+
+        return winner.result()
+
+
+    def close(self):
+        '''
+        Stop the hedging threads, once no more reads will be made
+        '''
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        return
+
+
+def install_timer(b1ddi, hedger):
+    '''
+    Record the latency of the reads made by a bloxone object. Installed
+    inside the rate limiter so only the time on the wire is counted, 
+    and the hedge delay starts when the read is sent.
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        hedger (obj): Hedger
+
+    Returns:
+        hedger (obj): Hedger
+    '''
+    def timed(method, call, url, *args, **kwargs):
+        if method != 'GET' or kwargs.get('stream'):
+            return call(url, *args, **kwargs)
+        sent = getattr(hedger.local, 'sent', None)
+        if sent:
+            sent.set()
+        start = time.perf_counter()
+        response = call(url, *args, **kwargs)
+        hedger.record(client.endpoint(url), time.perf_counter() - start)
+        return response
+
+    client.wrap_api(b1ddi, timed)
+
+    return hedger
+
+
+def install_hedging(b1ddi, hedger):
+    '''
+    Hedge the reads made by a bloxone object. Streamed reads are not 
+    hedged, as their body is read after the response is returned. The
+    latency of reads must be recorded by install_timer().
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        hedger (obj): Hedger
+
+    Returns:
+        hedger (obj): Hedger
+    '''
+    def hedged(method, call, url, *args, **kwargs):
+        if method != 'GET' or kwargs.get('stream'):
+            return call(url, *args, **kwargs)
+        return hedger.request(client.endpoint(url), call, url, *args, **kwargs)
+
+    client.wrap_api(b1ddi, hedged)
+    b1ddi.hedger = hedger
+
+    return hedger
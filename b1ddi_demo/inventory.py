@@ -0,0 +1,472 @@
+'''
+
+ Description:
+
+    Local SQLite inventory of the objects created by each run. Creates and
+    deletes are recorded from the API responses, in batches, so that demo
+    data can be removed directly by id without discovery queries, per run
+    reports produced and a single run or subnet torn down.
+
+ Requirements:
+   Python3 with datetime, sqlite3, threading, urllib and uuid modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import logging
+import datetime
+import ipaddress
+import sqlite3
+import threading
+import time
+import urllib.parse
+import uuid
+from b1ddi_demo import addressing
+from b1ddi_demo import client
+from b1ddi_demo import teardown
+
+# Global Variables
+log = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started REAL,
+    finished REAL,
+    customer TEXT,
+    ip_space TEXT,
+    dns_view TEXT,
+    exitcode INTEGER
+);
+CREATE TABLE IF NOT EXISTS objects (
+    id TEXT PRIMARY KEY,
+    objpath TEXT NOT NULL,
+    parent TEXT,
+    run_id TEXT NOT NULL,
+    name TEXT,
+    ip INTEGER,
+    created REAL,
+    deleted REAL
+);
+CREATE INDEX IF NOT EXISTS objects_run ON objects (run_id);
+CREATE INDEX IF NOT EXISTS objects_parent ON objects (parent);
+CREATE INDEX IF NOT EXISTS objects_ip ON objects (ip);
+'''
+
+# Field of each object type referencing its parent
+PARENTS = { '/ipam/ip_space': '',
+            '/ipam/address_block': 'space',
+            '/ipam/subnet': 'space',
+            '/ipam/range': 'space',
+            '/ipam/address': 'space',
+            '/dns/view': '',
+            '/dns/auth_zone': 'view',
+            '/dns/record': 'zone' }
+
+# Children removed by the API when their parent is deleted
+CASCADES = { '/ipam/ip_space': [ '/ipam/address_block', '/ipam/subnet',
+                                 '/ipam/range', '/ipam/address' ],
+             '/dns/auth_zone': [ '/dns/record' ] }
+
+# Deletes are made a type at a time, children first. Zones must have
+# gone before their view can be deleted
+DELETE_ORDER = [ '/dns/record', '/ipam/address', '/ipam/range', 
+                 '/dns/auth_zone', '/ipam/subnet', '/ipam/address_block',
+                 '/dns/view', '/ipam/ip_space' ]
+
+
+def object_id(url):
+    '''
+    Object id, including path, from a request URL
+
+    Parameters:
+        url (str): Request URL, e.g. .../api/ddi/v1/ipam/subnet/<uuid>
+
+    Returns:
+        id (str): e.g. ipam/subnet/<uuid>
+    '''
+    path = urllib.parse.urlsplit(url).path
+    if '/api/ddi/' in path:
+        path = path.split('/api/ddi/', 1)[1].split('/', 1)[-1]
+
+    return path.strip('/')
+
+
+def describe(objpath, result):
+    '''
+    Name and integer address recorded for an object
+
+    Parameters:
+        objpath (str): Swagger object path
+        result (dict): Object returned by the API
+
+    Returns:
+        (name, ip) tuple, ip is None for non IPv4 objects
+    '''
+    ip = None
+    name = result.get('name') or result.get('fqdn') or ''
+    address = result.get('address') or result.get('start')
+    if objpath == '/dns/record':
+        name = result.get('name_in_zone', '')
+    elif address:
+        name = address
+        if result.get('cidr'):
+            name += '/' + str(result['cidr'])
+        elif result.get('end'):
+            name += '-' + result['end']
+        try:
+            ip = addressing.ip_to_int(address)
+        except ValueError:
+            pass
+
+    return name, ip
+
+
+class Inventory:
+    '''
+    SQLite store of created objects, shared by threads
+    '''
+
+    def __init__(self, path, batch_size=BATCH_SIZE):
+        '''
+        Parameters:
+            path (str): Database filename
+            batch_size (int): Changes held in memory before writing
+        '''
+        self.path = path
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=30,
+                                          check_same_thread=False)
+        # WAL lets concurrent runs, and readers, share the file
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+        self.run = None
+        self.run_saved = False
+        self.created = []
+        self.deleted = []
+
+        return
+
+
+    def start_run(self, config, run_id=''):
+        '''
+        Start recording a run. The run is only saved once it creates an
+        object.
+
+        Parameters:
+            config (dict): Config dictionary
+            run_id (str): Continue this run, e.g. in a shard
+
+        Returns:
+            run_id (str): Run identifier
+        '''
+        now = datetime.datetime.now()
+        if not run_id:
+            run_id = now.strftime('%Y%m%dT%H%M%S-') + uuid.uuid4().hex[:6]
+        self.run = (run_id, now.timestamp(), None, config['customer'],
+                    config['ip_space'], config['dns_view'], None)
+        self.run_saved = False
+
+        return run_id
+
+
+    @property
+    def run_id(self):
+        return self.run[0] if self.run else ''
+
+
+    def add(self, objpath, result):
+        '''
+        Record a created object
+
+        Parameters:
+            objpath (str): Swagger object path
+            result (dict): Object returned by the API
+        '''
+        field = PARENTS.get(objpath, '')
+        name, ip = describe(objpath, result)
+        with self.lock:
+            self.created.append((result['id'], objpath, 
+                                 result.get(field, '') if field else '',
+                                 self.run_id, name, ip, time.time()))
+            if len(self.created) >= self.batch_size:
+                self._flush()
+
+        return
+
+
+    def remove(self, id):
+        '''
+        Record a deleted object, and any children the API removes with it
+
+        Parameters:
+            id (str): Object id including path
+        '''
+        with self.lock:
+            self.deleted.append((time.time(), id))
+            if len(self.deleted) >= self.batch_size:
+                self._flush()
+
+        return
+
+
+    def flush(self):
+        '''
+        Write pending changes
+        '''
+        with self.lock:
+            self._flush()
+
+        return
+
+
+    def _flush(self):
+        if not self.created and not self.deleted:
+            return
+        with self.connection:
+            if self.created and not self.run_saved:
+                self.connection.execute(
+                    'INSERT OR REPLACE INTO runs VALUES (?,?,?,?,?,?,?)', 
+                    self.run)
+                self.run_saved = True
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO objects VALUES (?,?,?,?,?,?,?,NULL)',
+                self.created)
+            self.connection.executemany(
+                'UPDATE objects SET deleted = ? WHERE id = ?', self.deleted)
+            for objpath, children in CASCADES.items():
+                ids = [ (stamp, id) for stamp, id in self.deleted
+                        if id.startswith(objpath.strip('/') + '/') ]
+                if ids:
+                    self.connection.executemany(
+                        'UPDATE objects SET deleted = ? WHERE parent = ? '
+                        'AND deleted IS NULL AND objpath IN (%s)'
+                        % ','.join([ "'" + c + "'" for c in children ]), ids)
+        log.debug("Inventory: %s created, %s deleted written", 
+                  len(self.created), len(self.deleted))
+        self.created = []
+        self.deleted = []
+
+        return
+
+
+    def finish_run(self, exitcode):
+        '''
+        Write pending changes and the result of the run
+
+        Parameters:
+            exitcode (int): Exit code of the run
+        '''
+        with self.lock:
+            self._flush()
+            if self.run_saved:
+                with self.connection:
+                    self.connection.execute(
+                        'UPDATE runs SET finished = ?, exitcode = ? '
+                        'WHERE run_id = ?', 
+                        (time.time(), exitcode, self.run_id))
+
+        return
+
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+        return
+
+
+    def select(self, config=None, run_id='', subnet=''):
+        '''
+        Objects that have not been deleted, for a demo, a run or the 
+        IPAM objects in a subnet
+
+        Parameters:
+            config (dict): Config dictionary, selects the demo's objects
+            run_id (str): Only objects created by this run
+            subnet (str): Only the subnet, its ranges and addresses
+
+        Returns:
+            list: (objpath, id, parent, name) tuples
+        '''
+        query = ('SELECT o.objpath, o.id, o.parent, o.name FROM objects o '
+                 'JOIN runs r ON o.run_id = r.run_id WHERE o.deleted IS NULL')
+        params = []
+        if config:
+            query += ' AND r.ip_space = ? AND r.dns_view = ?'
+            params += [ config['ip_space'], config['dns_view'] ]
+        if run_id:
+            query += ' AND r.run_id = ?'
+            params.append(run_id)
+        if subnet:
+            network = ipaddress.ip_network(subnet, strict=False)
+            first = int(network.network_address)
+            query += (" AND o.ip BETWEEN ? AND ? AND (o.objpath IN "
+                      "('/ipam/range', '/ipam/address') OR "
+                      "(o.objpath = '/ipam/subnet' AND o.name = ?))")
+            params += [ first, first + network.num_addresses - 1, 
+                        str(network) ]
+        self.flush()
+        with self.lock:
+            rows = self.connection.execute(query, params).fetchall()
+
+        return rows
+
+
+    def report(self, run_id=''):
+        '''
+        Objects created and remaining for each run
+
+        Parameters:
+            run_id (str): Only report this run
+
+        Returns:
+            list: Dictionary for each run, oldest first
+        '''
+        query = ('SELECT r.run_id, r.started, r.finished, r.customer, '
+                 'r.exitcode, o.objpath, COUNT(o.id), COUNT(o.id) - '
+                 'COUNT(o.deleted) FROM runs r LEFT JOIN objects o '
+                 'ON o.run_id = r.run_id')
+        params = []
+        if run_id:
+            query += ' WHERE r.run_id = ?'
+            params.append(run_id)
+        query += ' GROUP BY r.run_id, o.objpath ORDER BY r.started, o.objpath'
+        self.flush()
+        runs = {}
+        with self.lock:
+            for row in self.connection.execute(query, params):
+                run = runs.setdefault(row[0], { 'run_id': row[0], 
+                                                'started': row[1], 
+                                                'finished': row[2],
+                                                'customer': row[3],
+                                                'exitcode': row[4],
+                                                'created': {}, 'live': {} })
+                if row[5]:
+                    run['created'][row[5]] = row[6]
+                    run['live'][row[5]] = row[7]
+
+        return list(runs.values())
+
+
+def teardown_plan(objects):
+    '''
+    Order objects for deletion, leaving out those the API deletes with
+    their parent
+
+    Parameters:
+        objects (list): (objpath, id, parent, name) tuples, as select()
+
+    Returns:
+        list: (objpath, [ (objpath, id, label) ]) for each type in order
+    '''
+    selected = set([ o[1] for o in objects ])
+    levels = { objpath: [] for objpath in DELETE_ORDER }
+    for objpath, id, parent, name in objects:
+        if parent in selected and objpath in CASCADES.get(
+                '/' + parent.rsplit('/', 1)[0], []):
+            continue
+        if objpath in levels:
+            levels[objpath].append((objpath, id, 
+                                    '{} {}'.format(objpath, name)))
+
+    return [ (objpath, levels[objpath]) for objpath in DELETE_ORDER 
+             if levels[objpath] ]
+
+
+def delete(b1ddi, plan, workers=8):
+    '''
+    Delete objects from the inventory, each type in parallel
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        plan (list): Objects to delete by type, as teardown_plan()
+        workers (int): Number of concurrent deletes
+
+    Returns:
+        counts (dict): Number of objects 'deleted' and 'failed'
+    '''
+    counts = { 'deleted': 0, 'failed': 0 }
+    views = '/dns/view' in [ objpath for objpath, items in plan ]
+    for objpath, items in plan:
+        log.info("~~~~ Deleting %s %s ~~~~", len(items), objpath)
+        result = teardown.delete_many(b1ddi, items, workers=workers,
+                    wait=(views and objpath == '/dns/auth_zone'))
+        counts['deleted'] += result['deleted']
+        counts['failed'] += result['failed']
+
+    return counts
+
+
+def install_inventory(b1ddi, inventory, config, run_id=''):
+    '''
+    Record the objects created and deleted by a bloxone object in the
+    inventory, starting a new run. The inventory is available as
+    b1ddi.inventory
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        inventory (obj): Inventory
+        config (dict): Config dictionary
+        run_id (str): Add to this run rather than starting a new one
+
+    Returns:
+        inventory (obj): Inventory
+    '''
+    def recorded(method, call, url, *args, **kwargs):
+        response = call(url, *args, **kwargs)
+        if method == 'POST' and response.status_code in [ 200, 201 ]:
+            objpath = client.endpoint(url)
+            if objpath in PARENTS:
+                try:
+                    result = response.json().get('result', {})
+                except ValueError:
+                    result = {}
+                if result.get('id'):
+                    inventory.add(objpath, result)
+        elif method == 'DELETE' and response.status_code in [ 200, 204, 404 ]:
+            inventory.remove(object_id(url))
+        return response
+
+    inventory.start_run(config, run_id=run_id)
+    client.wrap_api(b1ddi, recorded)
+    b1ddi.inventory = inventory
+
+    return inventory
@@ -0,0 +1,162 @@
+'''
+
+ Description:
+
+    Logging set up: records are passed through a queue to a background
+    thread which formats and writes them, so that formatting and file
+    writes are kept off the request path.
+    
+    Adds a SUMMARY level, between INFO and WARNING, for per phase totals
+    so that per object messages can be turned off, and a JSON lines
+    formatter for structured logs.
+
+ Requirements:
+   Python3 with json, logging and queue modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+
+SUMMARY = 25
+logging.addLevelName(SUMMARY, 'SUMMARY')
+
+LEVELS = { 'debug': logging.DEBUG,
+           'info': logging.INFO,
+           'summary': SUMMARY }
+
+
+class JSONFormatter(logging.Formatter):
+    '''
+    Format records as single line JSON objects
+    '''
+
+    def format(self, record):
+        entry = { 'time': self.formatTime(record),
+                  'level': record.levelname,
+                  'logger': record.name,
+                  'message': record.getMessage() }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+
+        return json.dumps(entry)
+
+
+class ConsoleHandler(logging.StreamHandler):
+    '''
+    Stream handler that clears any progress status line on a terminal
+    before writing a record
+    '''
+
+    def __init__(self, stream=None):
+        super().__init__(stream)
+        self.tty = self.stream.isatty()
+
+        return
+
+
+    def format(self, record):
+        text = super().format(record)
+        if self.tty:
+            text = '\r\x1b[K' + text
+
+        return text
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    '''
+    Queue records with their message merged but not formatted. The 
+    listener runs in the same process so records do not need to be made
+    picklable, exceptions and stacks are formatted by the listener.
+    '''
+
+    def prepare(self, record):
+        # Merge the arguments now, whilst they have the values they had 
+        # when the record was logged
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+
+        return record
+
+
+class QueueListener(logging.handlers.QueueListener):
+    '''
+    Queue listener that may be started and stopped more than once, so a
+    worker process can write out its records at the end of each job
+    '''
+
+    def start(self):
+        if self._thread is None:
+            super().start()
+        return
+
+
+    def stop(self):
+        if self._thread is not None:
+            super().stop()
+        return
+
+
+def start(handlers, level=logging.INFO):
+    '''
+    Replace any root handlers with a queue feeding handlers in a
+    background thread. The queue is flushed at exit.
+
+    Parameters:
+        handlers (list): Handlers to write records to
+        level (int): Root logger level
+
+    Returns:
+        listener (obj): QueueListener
+    '''
+    records = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(LazyQueueHandler(records))
+    root.setLevel(level)
+
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    return listener
@@ -0,0 +1,451 @@
+'''
+
+ Description:
+
+    Request and operation metrics: latency histograms with p50/p95/p99,
+    status code counts, retries and bytes transferred per API endpoint, and
+    latency and outcome of each demo step. Exported as JSON or Prometheus
+    text exposition format.
+    
+    Latencies are recorded in logarithmic buckets about 4% wide so memory
+    use does not grow with the number of requests and histograms from
+    separate runs can be merged.
+
+ Requirements:
+   Python3 with functools, json, math and threading modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import collections
+import functools
+import json
+import logging
+import math
+import threading
+import time
+from b1ddi_demo import client
+
+# Global Variables
+log = logging.getLogger(__name__)
+
+PERCENTILES = [ 50, 95, 99 ]
+GROWTH = 1.04
+MINIMUM = 1e-4
+
+
+class Histogram:
+    '''
+    Log bucketed latency histogram
+    '''
+
+    def __init__(self):
+        self.buckets = collections.Counter()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+        return
+
+
+    def record(self, value, count=1):
+        '''
+        Parameters:
+            value (float): Seconds
+            count (int): Number of occurences
+        '''
+        index = 0
+        if value > MINIMUM:
+            index = int(math.log(value / MINIMUM, GROWTH)) + 1
+        self.buckets[index] += count
+        self.count += count
+        self.total += value * count
+        self.max = max(self.max, value)
+
+        return
+
+
+    def merge(self, other):
+        '''
+        Add the values recorded by another histogram
+        '''
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+        return
+
+
+    def percentile(self, p):
+        '''
+        Parameters:
+            p (float): Percentile, 0 - 100
+
+        Returns:
+            float: Upper bound of the bucket containing the percentile
+        '''
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                break
+
+        return min(self.max, MINIMUM * GROWTH ** index)
+
+
+    def to_dict(self):
+        result = { 'count': self.count,
+                   'mean': self.total / self.count if self.count else 0.0,
+                   'max': self.max }
+        for p in PERCENTILES:
+            result['p' + str(p)] = self.percentile(p)
+
+        return result
+
+
+class Stat:
+    '''
+    Measurements for one endpoint or operation
+    '''
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.status = collections.Counter()
+        self.sent = 0
+        self.received = 0
+
+        return
+
+
+class Metrics:
+    '''
+    Metrics collected during a run
+    '''
+
+    def __init__(self):
+        self.endpoints = collections.defaultdict(Stat)
+        self.operations = collections.defaultdict(Stat)
+        self.retries = collections.Counter()
+        self.lock = threading.Lock()
+
+        return
+
+
+    def __getstate__(self):
+        # Locks can not be pickled, e.g. to return metrics from a worker
+        # process
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+
+    def request(self, method, endpoint, seconds, status, sent=0, received=0):
+        '''
+        Record an API request
+
+        Parameters:
+            method (str): HTTP method
+            endpoint (str): API endpoint, e.g. /ipam/subnet
+            seconds (float): Latency
+            status (int): HTTP status code, 0 for a connection error
+            sent (int): Request body bytes
+            received (int): Response body bytes
+        '''
+        with self.lock:
+            stat = self.endpoints[method + ' ' + endpoint]
+            stat.latency.record(seconds)
+            stat.status[status] += 1
+            stat.sent += sent
+            stat.received += received
+
+        return
+
+
+    def retry(self, method, endpoint):
+        with self.lock:
+            self.retries[method + ' ' + endpoint] += 1
+        return
+
+
+    def operation(self, name, seconds, ok):
+        '''
+        Record a demo step
+
+        Parameters:
+            name (str): Operation name
+            seconds (float): Duration
+            ok (bool): Succeeded
+        '''
+        with self.lock:
+            stat = self.operations[name]
+            stat.latency.record(seconds)
+            stat.status['ok' if ok else 'failed'] += 1
+
+        return
+
+
+    def merge(self, other):
+        '''
+        Add the metrics collected by another Metrics object
+        '''
+        with self.lock:
+            for attr in [ 'endpoints', 'operations' ]:
+                for key, theirs in getattr(other, attr).items():
+                    ours = getattr(self, attr)[key]
+                    ours.latency.merge(theirs.latency)
+                    ours.status.update(theirs.status)
+                    ours.sent += theirs.sent
+                    ours.received += theirs.received
+            self.retries.update(other.retries)
+
+        return
+
+
+    def summary(self):
+        '''
+        Returns:
+            dict: Endpoint and operation metrics
+        '''
+        with self.lock:
+            endpoints = {}
+            for key, stat in sorted(self.endpoints.items()):
+                endpoints[key] = dict(stat.latency.to_dict(),
+                    status={ str(k): v for k, v in stat.status.items() },
+                    retries=self.retries[key],
+                    bytes_sent=stat.sent, bytes_received=stat.received)
+            operations = {}
+            for key, stat in sorted(self.operations.items()):
+                operations[key] = dict(stat.latency.to_dict(),
+                                       ok=stat.status['ok'],
+                                       failed=stat.status['failed'])
+
+        return { 'endpoints': endpoints, 'operations': operations }
+
+
+    def prometheus(self):
+        '''
+        Returns:
+            str: Metrics in Prometheus text exposition format
+        '''
+        summary = self.summary()
+        lines = []
+
+        def labels(**values):
+            return '{' + ','.join([ k + '="' + str(v) + '"' 
+                                    for k, v in values.items() ]) + '}'
+
+        def quantiles(metric, data, **names):
+            for p in PERCENTILES:
+                lines.append(metric + labels(**dict(names, quantile=p / 100)) + 
+                             ' ' + repr(data['p' + str(p)]))
+            lines.append(metric + '_sum' + labels(**names) + ' ' + 
+                         repr(data['mean'] * data['count']))
+            lines.append(metric + '_count' + labels(**names) + ' ' + 
+                         str(data['count']))
+
+        lines.append('# HELP b1ddi_request_duration_seconds '
+                     'API request latency')
+        lines.append('# TYPE b1ddi_request_duration_seconds summary')
+        for key, data in summary['endpoints'].items():
+            method, endpoint = key.split(' ', 1)
+            quantiles('b1ddi_request_duration_seconds', data, 
+                      method=method, endpoint=endpoint)
+
+        lines.append('# HELP b1ddi_responses_total API responses by status')
+        lines.append('# TYPE b1ddi_responses_total counter')
+        for key, data in summary['endpoints'].items():
+            method, endpoint = key.split(' ', 1)
+            for code, count in sorted(data['status'].items()):
+                lines.append('b1ddi_responses_total' + 
+                             labels(method=method, endpoint=endpoint, 
+                                    code=code) + ' ' + str(count))
+
+        for metric, field, text in [ 
+                ('b1ddi_retries_total', 'retries', 'API request retries'),
+                ('b1ddi_sent_bytes_total', 'bytes_sent', 'Request bytes'),
+                ('b1ddi_received_bytes_total', 'bytes_received', 
+                 'Response bytes') ]:
+            lines.append('# HELP ' + metric + ' ' + text)
+            lines.append('# TYPE ' + metric + ' counter')
+            for key, data in summary['endpoints'].items():
+                method, endpoint = key.split(' ', 1)
+                lines.append(metric + labels(method=method, endpoint=endpoint)
+                             + ' ' + str(data[field]))
+
+        lines.append('# HELP b1ddi_operation_duration_seconds '
+                     'Demo step duration')
+        lines.append('# TYPE b1ddi_operation_duration_seconds summary')
+        for key, data in summary['operations'].items():
+            quantiles('b1ddi_operation_duration_seconds', data, operation=key)
+        lines.append('# HELP b1ddi_operations_total Demo steps by result')
+        lines.append('# TYPE b1ddi_operations_total counter')
+        for key, data in summary['operations'].items():
+            for result in [ 'ok', 'failed' ]:
+                lines.append('b1ddi_operations_total' + 
+                             labels(operation=key, result=result) + ' ' + 
+                             str(data[result]))
+
+        return '\n'.join(lines) + '\n'
+
+
+    def write(self, filename, format='json'):
+        '''
+        Write the metrics to a file
+
+        Parameters:
+            filename (str): Output file, '-' for stdout
+            format (str): 'json' or 'prometheus'
+        '''
+        if format == 'prometheus':
+            text = self.prometheus()
+        else:
+            text = json.dumps(self.summary(), indent=2) + '\n'
+        if filename == '-':
+            print(text, end='')
+        else:
+            with open(filename, 'w') as f:
+                f.write(text)
+
+        return
+
+
+    def log_operations(self, logger=log, level=logging.INFO):
+        '''
+        Log the totals for each demo step
+
+        Parameters:
+            logger (obj): Logger to use
+            level (int): Log level
+        '''
+        for key, data in self.summary()['operations'].items():
+            logger.log(level, "%-14s %7s ok, %s failed, %0.2fs total, "
+                       "p95 %0.3fs", key, data['ok'], data['failed'],
+                       data['mean'] * data['count'], data['p95'])
+
+        return
+
+
+    def log_summary(self, logger=log, level=logging.INFO):
+        '''
+        Log the latency of each endpoint, slowest total time first
+
+        Parameters:
+            logger (obj): Logger to use
+            level (int): Log level
+        '''
+        endpoints = self.summary()['endpoints']
+        for key, data in sorted(endpoints.items(), 
+                                key=lambda i: -i[1]['mean'] * i[1]['count']):
+            logger.log(level, "%-26s %7s requests, p50 %0.3fs p95 %0.3fs "
+                       "p99 %0.3fs, %s retries", key, data['count'], 
+                       data['p50'], data['p95'], data['p99'], data['retries'])
+
+        return
+
+
+def operation(name):
+    '''
+    Decorator recording the duration and outcome of a demo step. The
+    first argument must be the bloxone object, metrics are recorded if
+    it has them installed. A truthy return counts as success.
+
+    Parameters:
+        name (str): Operation name
+    '''
+    def decorate(func):
+        @functools.wraps(func)
+        def timed(b1ddi, *args, **kwargs):
+            metrics = getattr(b1ddi, 'metrics', None)
+            if metrics is None:
+                return func(b1ddi, *args, **kwargs)
+            start = time.perf_counter()
+            result = None
+            try:
+                result = func(b1ddi, *args, **kwargs)
+            finally:
+                metrics.operation(name, time.perf_counter() - start, 
+                                  bool(result))
+            return result
+        return timed
+
+    return decorate
+
+
+def install_metrics(b1ddi, metrics):
+    '''
+    Record every request made by a bloxone object. Installed directly
+    over the transport so each attempt, including throttled and retried
+    attempts, is measured.
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        metrics (obj): Metrics
+
+    Returns:
+        metrics (obj): Metrics
+    '''
+    import requests
+
+    def measured(method, call, url, *args, **kwargs):
+        path = client.endpoint(url)
+        body = args[0] if args else kwargs.get('body', '')
+        start = time.perf_counter()
+        try:
+            response = call(url, *args, **kwargs)
+        except requests.exceptions.RequestException:
+            metrics.request(method, path, time.perf_counter() - start, 0,
+                            len(body or ''))
+            raise
+        # Streamed bodies are read later, by the caller
+        metrics.request(method, path, time.perf_counter() - start, 
+                        response.status_code, len(body or ''), 
+                        (0 if getattr(response, 'streamed', False) 
+                         else len(response.content)))
+        return response
+
+    client.wrap_api(b1ddi, measured)
+    b1ddi.metrics = metrics
+
+    return metrics
@@ -0,0 +1,198 @@
+'''
+
+ Description:
+
+    Request body (payload) builder. The tag fragment and other shared
+    fragments are serialised once and per object bodies are produced from
+    simple string templates
+
+ Requirements:
+   Python3 with json and datetime modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import datetime
+import functools
+import json
+import threading
+
+# Global Variables
+_builders = {}
+_lock = threading.Lock()
+
+
+def datestamp():
+    '''
+    Timestamp used for the Created tag
+
+    Returns:
+        str: Current time to the minute
+    '''
+    return datetime.datetime.now().strftime('%Y-%m-%dT%H:%MZ')
+
+
+def tag_body(config, **params):
+    '''
+    Create the tags fragment with the Owner, Location, Usage and 
+    Created tags and any others defined in **params
+
+    Parameters:
+        config (dict): Config dictionary, uses owner and location
+        params (dict): Tag key/value pairs
+    
+    Returns:
+        tags (str): JSON string to append to body
+    '''
+    tags = {}
+    tags.update({"Owner": config['owner']})
+    tags.update({"Location": config['location']})
+    tags.update({"Usage": "AUTOMATION DEMO"})
+    tags.update({"Created": datestamp()})
+    if params:
+        tags.update(**params)
+
+    return '"tags":' + json.dumps(tags)
+
+
+@functools.lru_cache(maxsize=1024)
+def quote(value):
+    '''
+    JSON encode a string, caching the result for repeated values such as
+    object ids and comments
+
+    Parameters:
+        value (str): String to encode
+
+    Returns:
+        str: JSON string including quotes
+    '''
+    return json.dumps(value)
+
+
+class PayloadBuilder:
+    '''
+    Build request bodies for the demo objects
+
+    Values that vary per object and are generated by the script 
+    (addresses, cidrs and host names) are inserted as is, everything
+    else is JSON encoded once and reused.
+    '''
+
+    def __init__(self, config, **params):
+        '''
+        Parameters:
+            config (dict): Config dictionary
+            params (dict): Additional tag key/value pairs
+        '''
+        # Shared closing fragment ", "tags":{...} }"
+        self.tail = ', ' + tag_body(config, **params) + ' }'
+
+        return
+
+
+    def ip_space(self, name):
+        return '{ "name": ' + quote(name) + self.tail
+
+
+    def dns_view(self, name):
+        return '{ "name": ' + quote(name) + self.tail
+
+
+    def address_block(self, address, cidr, space, 
+                      comment="Internal Address Allocation"):
+        return ( '{ "address": "%s", "cidr": "%s", "space": %s, '
+                 '"comment": %s%s' 
+                 % (address, cidr, quote(space), quote(comment), self.tail) )
+
+
+    def subnet(self, address, cidr, space, comment):
+        return ( '{ "address": "%s", "cidr": "%s", "space": %s, '
+                 '"comment": %s%s' 
+                 % (address, cidr, quote(space), quote(comment), self.tail) )
+
+
+    def range(self, start, end, space):
+        return ( '{ "start": "%s", "end": "%s", "space": %s%s' 
+                 % (start, end, quote(space), self.tail) )
+
+
+    def address(self, address, space):
+        return ( '{ "address": "%s", "space": %s%s' 
+                 % (address, quote(space), self.tail) )
+
+
+    def zone(self, fqdn, view, nsg):
+        return ( '{ "fqdn": %s, "view": %s, "nsgs": [%s], '
+                 '"primary_type": "cloud"%s'
+                 % (quote(fqdn), quote(view), quote(nsg), self.tail) )
+
+
+    def a_record(self, hostname, zone, address):
+        return ( '{ "name_in_zone": "%s", "zone": %s, "type": "A", '
+                 '"rdata": {"address": "%s"}, '
+                 '"options": {"create_ptr": true}, '
+                 '"inheritance_sources": {"ttl": {"action": "inherit"}}%s'
+                 % (hostname, quote(zone), address, self.tail) )
+
+
+    def record(self, name, zone, rtype, rdata):
+        return ( '{ "name_in_zone": %s, "zone": %s, "type": "%s", '
+                 '"rdata": %s, '
+                 '"inheritance_sources": {"ttl": {"action": "inherit"}}%s'
+                 % (quote(name), quote(zone), rtype, json.dumps(rdata),
+                    self.tail) )
+
+
+def get_builder(config):
+    '''
+    Return the shared PayloadBuilder for a config, so the tags (and
+    Created timestamp) are only built once per owner/location
+
+    Parameters:
+        config (dict): Config dictionary
+
+    Returns:
+        builder (obj): PayloadBuilder
+    '''
+    key = (config['owner'], config['location'])
+    with _lock:
+        builder = _builders.get(key)
+        if not builder:
+            builder = PayloadBuilder(config)
+            _builders[key] = builder
+
+    return builder
@@ -0,0 +1,331 @@
+'''
+
+ Description:
+
+    Compiled plans. A plan is a JSON lines file with one entry per object
+    to create (or look up), written once per config and cached using a hash
+    of the config so repeat runs skip planning. Plans can be inspected
+    without any API calls and executed against the API.
+    
+    Entry format:
+        { "op": "create" | "lookup",
+          "objpath": "/ipam/subnet",
+          "ref": name other entries use to refer to this object (optional),
+          "label": description for logging,
+          "body": JSON body with "$ref:<name>" and "$now" placeholders (create),
+          "key"/"value": key and value to match (lookup) }
+
+ Requirements:
+   Python3 with hashlib and json modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import logging
+import collections
+import concurrent.futures
+import hashlib
+import json
+import os
+from b1ddi_demo import payloads
+
+# Global Variables
+log = logging.getLogger(__name__)
+
+PLAN_VERSION = 1
+
+# Placeholder for the Created tag, filled in when the plan is executed
+NOW = '$now'
+
+# Config keys that determine the plan content, anything else only 
+# affects how a plan is executed
+CONTENT_KEYS = [ 'owner', 'location', 'customer', 'postfix', 'tld', 
+                 'dns_view', 'dns_domain', 'nsg', 'no_of_records', 
+                 'ip_space', 'base_net', 'no_of_networks', 'no_of_ips', 
+                 'container_cidr', 'cidr', 'net_comments', 'profile', 
+                 'seed' ]
+
+
+def ref(name):
+    '''
+    Placeholder for the id of another entry, used in bodies
+
+    Parameters:
+        name (str): ref of the entry
+
+    Returns:
+        str: Placeholder
+    '''
+    return '$ref:' + name
+
+
+def config_hash(config, version=''):
+    '''
+    Hash of the config elements that determine the plan content
+
+    Parameters:
+        config (dict): Config dictionary
+        version (str): Script version, so plans are rebuilt on upgrade
+
+    Returns:
+        str: Hex digest
+    '''
+    content = { k: config.get(k) for k in CONTENT_KEYS }
+    data = json.dumps([ PLAN_VERSION, version, content ], sort_keys=True)
+
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def write_plan(entries, path):
+    '''
+    Stream plan entries to a JSON lines file
+
+    Parameters:
+        entries (iter): Iterable of plan entry dicts
+        path (str): Filename
+
+    Returns:
+        count (int): Number of entries written
+    '''
+    count = 0
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + '\n')
+            count += 1
+    # Only expose complete plans
+    os.replace(tmp, path)
+
+    return count
+
+
+def read_plan(path):
+    '''
+    Stream plan entries from a JSON lines file
+
+    Parameters:
+        path (str): Filename
+
+    Yields:
+        entry (dict): Plan entry
+    '''
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def cached_plan(compile, config, cache_dir, version=''):
+    '''
+    Return the filename of the plan for config, compiling it only if
+    it is not already in the cache
+
+    Parameters:
+        compile (callable): Function returning plan entries for config
+        config (dict): Config dictionary
+        cache_dir (str): Plan cache directory
+        version (str): Script version
+
+    Returns:
+        path (str): Plan filename
+    '''
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, config_hash(config, version) + '.jsonl')
+    if os.path.isfile(path):
+        log.info("Using cached plan %s", path)
+    else:
+        count = write_plan(compile(config), path)
+        log.info("Compiled plan with %s entries to %s", count, path)
+
+    return path
+
+
+def summarise(entries):
+    '''
+    Count plan entries by operation and object path
+
+    Parameters:
+        entries (iter): Iterable of plan entry dicts
+
+    Returns:
+        counts (collections.Counter): Counts keyed by "op objpath"
+    '''
+    counts = collections.Counter()
+    for entry in entries:
+        if entry['op'] != 'barrier':
+            counts[entry['op'] + ' ' + entry['objpath']] += 1
+
+    return counts
+
+
+class Executor:
+    '''
+    Execute plan entries. Entries with a ref are run in order, once all
+    earlier entries have completed, other entries are run concurrently.
+    '''
+
+    def __init__(self, b1ddi, workers=1, ids=None):
+        '''
+        Parameters:
+            b1ddi (obj): bloxone.b1ddi object
+            workers (int): Number of concurrent creates
+            ids (dict): Ids of refs already created, e.g. by another shard
+        '''
+        self.b1ddi = b1ddi
+        self.workers = max(1, int(workers))
+        self.ids = dict(ids or {})
+        self.counts = { 'created': 0, 'found': 0, 'failed': 0, 'skipped': 0 }
+        self.now = json.dumps(payloads.datestamp())
+
+        return
+
+
+    def _substitute(self, body):
+        # Replace placeholders with ids, None if any are unresolved
+        body = body.replace('"' + NOW + '"', self.now)
+        while '"$ref:' in body:
+            start = body.index('"$ref:')
+            end = body.index('"', start + 1)
+            id = self.ids.get(body[start + 6:end])
+            if not id:
+                return None
+            body = body[:start] + json.dumps(id) + body[end + 1:]
+
+        return body
+
+
+    def _lookup(self, entry):
+        id = self.b1ddi.get_id(entry['objpath'], key=entry['key'], 
+                               value=entry['value'], include_path=True)
+        if id:
+            log.info("%s id found: %s", entry['label'], id)
+        else:
+            log.warning("--- %s not found", entry['label'])
+
+        return id
+
+
+    def _create(self, entry):
+        id = ''
+        body = self._substitute(entry['body'])
+        if body is None:
+            log.debug("Skipping %s, parent not created", entry['label'])
+            return None
+        response = self.b1ddi.create(entry['objpath'], body)
+        if response.status_code in self.b1ddi.return_codes_ok:
+            log.info("+++ %s created", entry['label'])
+            id = response.json().get('result', {}).get('id', '') or True
+        else:
+            log.warning("--- %s not created", entry['label'])
+            log.debug("Return code: %s", response.status_code)
+            log.debug("Return body: %s", response.text)
+
+        return id
+
+
+    def _run(self, entry):
+        for name in entry.get('requires', []):
+            if name not in self.ids:
+                log.debug("Skipping %s, %s not available",
+                          entry['label'], name)
+                return None
+        # An unexpected error fails the entry rather than the whole run
+        try:
+            if entry['op'] == 'lookup':
+                return self._lookup(entry)
+            else:
+                return self._create(entry)
+        except Exception as err:
+            log.warning("--- %s failed: %s", entry['label'], err)
+            return False
+
+
+    def _tally(self, entry, result):
+        if result is None:
+            self.counts['skipped'] += 1
+        elif result:
+            if entry['op'] == 'create':
+                self.counts['created'] += 1
+            else:
+                self.counts['found'] += 1
+            if entry.get('ref') and isinstance(result, str):
+                self.ids[entry['ref']] = result
+        else:
+            self.counts['failed'] += 1
+
+        return
+
+
+    def run(self, entries):
+        '''
+        Execute plan entries
+
+        Parameters:
+            entries (iter): Iterable of plan entry dicts
+
+        Returns:
+            counts (dict): Numbers of entries 'created', 'found', 
+                           'failed' and 'skipped'
+        '''
+        pending = {}
+
+        def drain(wait_all):
+            done, _ = concurrent.futures.wait(pending, 
+                return_when=(concurrent.futures.ALL_COMPLETED if wait_all 
+                             else concurrent.futures.FIRST_COMPLETED))
+            for future in done:
+                self._tally(pending.pop(future), future.result())
+            return
+
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.workers) as executor:
+            for entry in entries:
+                if entry['op'] == 'barrier':
+                    if pending:
+                        drain(True)
+                elif entry.get('ref') or entry['op'] == 'lookup':
+                    # Others may depend on this, finish everything first
+                    if pending:
+                        drain(True)
+                    self._tally(entry, self._run(entry))
+                else:
+                    if len(pending) >= self.workers * 2:
+                        drain(False)
+                    pending[executor.submit(self._run, entry)] = entry
+            if pending:
+                drain(True)
+
+        return self.counts
@@ -0,0 +1,403 @@
+'''
+
+ Description:
+
+    Seeded scale profiles for generating large, realistic demo data sets.
+    Each profile sets the number of subnets, the mix of subnet sizes, the
+    range of utilization, the record types and the number of forward zones.
+    Reverse zones are created for each /16 used.
+    
+    The same profile, seed and config always produce the same objects.
+    Objects are generated as plan entries (see b1ddi_demo.plan) one at a
+    time, so memory use does not grow with the size of the profile.
+
+ Requirements:
+   Python3 with collections, ipaddress, logging and random modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import logging
+import collections
+import ipaddress
+import random
+from b1ddi_demo import addressing
+from b1ddi_demo import payloads
+from b1ddi_demo import plan
+
+# Global Variables
+log = logging.getLogger(__name__)
+
+# Subnet prefix lengths and record types are weighted choices, 
+# utilization is the (low, high) range for each subnet
+PROFILES = { 'small': { 'networks': 16, 'container_cidr': 16,
+                        'prefixes': { 24: 6, 25: 2, 26: 2 },
+                        'utilization': (0.1, 0.6),
+                        'record_types': { 'A': 80, 'CNAME': 10, 
+                                          'TXT': 7, 'MX': 3 },
+                        'forward_zones': 2 },
+             'enterprise': { 'networks': 1000, 'container_cidr': 12,
+                             'prefixes': { 22: 1, 23: 2, 24: 10, 
+                                           25: 3, 26: 3, 27: 1 },
+                             'utilization': (0.05, 0.9),
+                             'record_types': { 'A': 75, 'CNAME': 15, 
+                                               'TXT': 7, 'MX': 3 },
+                             'forward_zones': 8 },
+             '1m': { 'networks': 7400, 'container_cidr': 8,
+                     'prefixes': { 22: 1, 23: 2, 24: 12, 25: 2, 26: 2 },
+                     'utilization': (0.3, 0.95),
+                     'record_types': { 'A': 75, 'CNAME': 15, 
+                                       'TXT': 7, 'MX': 3 },
+                     'forward_zones': 16 } }
+
+# Host name prefix, by subnet
+HOST_PREFIXES = [ 'ws', 'srv', 'ap', 'prn', 'cam', 'pos', 'voip', 'iot' ]
+
+# Sub domains of dns_domain used for additional forward zones
+ZONE_LABELS = [ 'corp', 'eng', 'sales', 'ops', 'lab', 'dc', 'branch', 
+                'guest', 'mgmt', 'dev', 'prod', 'test', 'hr', 'finance',
+                'voice', 'iot' ]
+
+Subnet = collections.namedtuple('Subnet', [ 'index', 'network', 'comment',
+                                            'zone', 'utilization' ])
+
+
+def get_profile(name):
+    '''
+    Look up a scale profile
+
+    Parameters:
+        name (str): Profile name
+
+    Returns:
+        profile (dict): Profile parameters
+    '''
+    try:
+        profile = PROFILES[name.lower()]
+    except KeyError:
+        raise ValueError("Unknown scale profile {}, expected one of {}"
+                         .format(name, ', '.join(PROFILES)))
+
+    return profile
+
+
+def address_block(config):
+    '''
+    The address block for a profile, containing base_net
+
+    Parameters:
+        config (dict): Config dictionary with profile set
+
+    Returns:
+        network (obj): ipaddress.IPv4Network
+    '''
+    profile = get_profile(config['profile'])
+
+    return ipaddress.ip_network(config['base_net'] + '/' + 
+                                str(profile['container_cidr']), strict=False)
+
+
+def forward_zones(config):
+    '''
+    Forward zones for a profile, dns_domain and sub domains of it
+
+    Parameters:
+        config (dict): Config dictionary with profile set
+
+    Returns:
+        list: Zone fqdns
+    '''
+    zones = [ config['dns_domain'] ]
+    for n in range(1, get_profile(config['profile'])['forward_zones']):
+        if n <= len(ZONE_LABELS):
+            label = ZONE_LABELS[n - 1]
+        else:
+            label = 'zone' + str(n)
+        zones.append(label + '.' + config['dns_domain'])
+
+    return zones
+
+
+def layout(config):
+    '''
+    Generate the subnets for a profile. Subnets are allocated in order,
+    each aligned to its size, until the profile's number of networks or
+    the address block is used up.
+
+    Parameters:
+        config (dict): Config dictionary with profile and seed set
+
+    Yields:
+        subnet (obj): Subnet tuple
+    '''
+    profile = get_profile(config['profile'])
+    rng = random.Random('{}:{}'.format(config['seed'], config['profile']))
+    prefixes = list(profile['prefixes'])
+    weights = list(profile['prefixes'].values())
+    low, high = profile['utilization']
+    comments = config['net_comments'].split(',')
+    zones = forward_zones(config)
+
+    block = address_block(config)
+    cursor = int(block.network_address)
+    end = int(block.broadcast_address) + 1
+    for index in range(profile['networks']):
+        prefix = rng.choices(prefixes, weights=weights)[0]
+        size = 2 ** (32 - prefix)
+        cursor = -(-cursor // size) * size
+        if cursor + size > end:
+            log.warning("Address block %s only supports %s subnets", 
+                        block, index)
+            break
+        yield Subnet(index, ipaddress.IPv4Network((cursor, prefix)),
+                     comments[rng.randrange(0, len(comments))].strip(),
+                     zones[rng.randrange(0, len(zones))],
+                     round(rng.triangular(low, high), 3))
+        cursor += size
+
+
+def reverse_zones(config):
+    '''
+    Reverse zones covering the subnets of a profile
+
+    Parameters:
+        config (dict): Config dictionary with profile and seed set
+
+    Returns:
+        list: Zone fqdns
+    '''
+    zones = {}
+    for subnet in layout(config):
+        first = int(subnet.network.network_address)
+        last = int(subnet.network.broadcast_address)
+        for n in range(first >> 16, (last >> 16) + 1):
+            zones[addressing.reverse_zone(n << 16)] = True
+
+    return list(zones)
+
+
+def reservation_count(subnet):
+    '''
+    Number of IP reservations, in the bottom half of the subnet below 
+    the DHCP range, for the utilization of the subnet
+
+    Parameters:
+        subnet (obj): Subnet tuple
+
+    Returns:
+        int
+    '''
+    pool = subnet.network.num_addresses // 2 - 2
+
+    return max(1, int(pool * subnet.utilization / 2))
+
+
+def record_count(subnet):
+    '''
+    Number of DNS records for the utilization of the subnet
+
+    Parameters:
+        subnet (obj): Subnet tuple
+
+    Returns:
+        int
+    '''
+    pool = subnet.network.num_addresses // 2 - 2
+
+    return max(1, int(pool * subnet.utilization))
+
+
+def records(config, subnet):
+    '''
+    Generate the DNS records for a subnet. A records take host addresses
+    from the bottom of the subnet, CNAME and MX records point at earlier
+    A records and TXT records describe the host.
+
+    Parameters:
+        config (dict): Config dictionary with profile and seed set
+        subnet (obj): Subnet tuple
+
+    Yields:
+        (name, type, rdata) tuples
+    '''
+    profile = get_profile(config['profile'])
+    # Seeded per subnet so each subnet is reproducible on its own
+    rng = random.Random('{}:{}:{}'.format(config['seed'], config['profile'],
+                                          subnet.index))
+    types = list(profile['record_types'])
+    weights = list(profile['record_types'].values())
+    prefix = HOST_PREFIXES[subnet.index % len(HOST_PREFIXES)]
+    first = int(subnet.network.network_address)
+    hosts = []
+
+    for n in range(1, record_count(subnet) + 1):
+        name = '%s%d-%d' % (prefix, subnet.index, n)
+        rtype = rng.choices(types, weights=weights)[0]
+        if rtype == 'A' or not hosts:
+            hosts.append(name)
+            yield name, 'A', { 'address': addressing.int_to_ip(first + n) }
+        elif rtype == 'CNAME':
+            target = hosts[rng.randrange(0, len(hosts))]
+            yield name, 'CNAME', { 'cname': target + '.' + subnet.zone + '.' }
+        elif rtype == 'MX':
+            target = hosts[rng.randrange(0, len(hosts))]
+            yield name, 'MX', { 'exchange': target + '.' + subnet.zone + '.',
+                                'preference': 10 * rng.randrange(1, 5) }
+        else:
+            yield name, 'TXT', { 'text': '{} {}'.format(subnet.comment,
+                                                        subnet.network) }
+
+
+def shard_layout(config, subnets=None):
+    '''
+    Generate the subnets of the profile layout in a range of indexes,
+    the layout is allocated in order so earlier subnets are allocated
+    but not yielded
+
+    Parameters:
+        config (dict): Config dictionary with profile and seed set
+        subnets (tuple): (start, stop) subnet indexes, default all
+
+    Yields:
+        Subnet namedtuples
+    '''
+    start, stop = subnets or (0, None)
+    for subnet in layout(config):
+        if stop is not None and subnet.index >= stop:
+            break
+        if subnet.index >= start:
+            yield subnet
+
+
+def entries(config, builder=None, subnets=None, shared=True):
+    '''
+    Generate plan entries creating the objects for a profile, in the
+    same order and format as the compiled demo plan
+
+    Parameters:
+        config (dict): Config dictionary with profile and seed set
+        builder (obj): Optional payloads.PayloadBuilder
+        subnets (tuple): (start, stop) subnet indexes, default all
+        shared (bool): Include the IP Space, address block, DNS View 
+                       and zones
+
+    Yields:
+        entry (dict): Plan entries
+    '''
+    if not builder:
+        builder = payloads.get_builder(config)
+    block = address_block(config)
+    space = plan.ref('space')
+
+    # IPAM
+    if shared:
+        yield { 'op': 'create', 'objpath': '/ipam/ip_space', 'ref': 'space',
+                'label': "IP_Space {}".format(config['ip_space']),
+                'body': builder.ip_space(config['ip_space']) }
+        yield { 'op': 'create', 'objpath': '/ipam/address_block', 
+                'ref': 'block',
+                'label': "Address block {}".format(block),
+                'body': builder.address_block(str(block.network_address), 
+                                              block.prefixlen, space) }
+    for subnet in shard_layout(config, subnets):
+        address = str(subnet.network.network_address)
+        yield { 'op': 'create', 'objpath': '/ipam/subnet', 
+                'requires': [ 'block' ],
+                'label': "Subnet {}".format(subnet.network),
+                'body': builder.subnet(address, subnet.network.prefixlen,
+                                       space, subnet.comment) }
+    yield { 'op': 'barrier', 'objpath': '' }
+    for subnet in shard_layout(config, subnets):
+        start_ip, end_ip = addressing.range_bounds(subnet.network)
+        yield { 'op': 'create', 'objpath': '/ipam/range', 
+                'requires': [ 'block' ],
+                'label': "Range {}-{}".format(start_ip, end_ip),
+                'body': builder.range(start_ip, end_ip, space) }
+        for address in addressing.reservation_addresses(subnet.network, 
+                                        reservation_count(subnet) + 1):
+            yield { 'op': 'create', 'objpath': '/ipam/address', 
+                    'requires': [ 'block' ],
+                    'label': "IP {}".format(address),
+                    'body': builder.address(address, space) }
+
+    # DNS, reverse zones first so PTRs are created with the A records
+    view = plan.ref('view')
+    nsg = plan.ref('nsg')
+    if shared:
+        yield { 'op': 'create', 'objpath': '/dns/view', 'ref': 'view',
+                'label': "DNS View {}".format(config['dns_view']),
+                'body': builder.dns_view(config['dns_view']) }
+        yield { 'op': 'lookup', 'objpath': '/dns/auth_nsg', 'ref': 'nsg',
+                'label': "NSG {}".format(config['nsg']),
+                'key': 'name', 'value': config['nsg'] }
+        for zone in reverse_zones(config) + forward_zones(config):
+            yield { 'op': 'create', 'objpath': '/dns/auth_zone', 
+                    'ref': 'zone:' + zone,
+                    'label': "Zone {}".format(zone),
+                    'body': builder.zone(zone, view, nsg) }
+    for subnet in shard_layout(config, subnets):
+        zone = plan.ref('zone:' + subnet.zone)
+        for name, rtype, rdata in records(config, subnet):
+            if rtype == 'A':
+                body = builder.a_record(name, zone, rdata['address'])
+            else:
+                body = builder.record(name, zone, rtype, rdata)
+            yield { 'op': 'create', 'objpath': '/dns/record',
+                    'requires': [ 'zone:' + subnet.zone ],
+                    'label': "record: {}.{} {}".format(name, subnet.zone,
+                                                       rtype),
+                    'body': body }
+
+
+def totals(config):
+    '''
+    Number of objects a profile creates in each phase, without 
+    generating the objects
+
+    Parameters:
+        config (dict): Config dictionary with profile and seed set
+
+    Returns:
+        totals (dict): Objects for the ipam, zones and records phases
+    '''
+    ipam = 2
+    records = 0
+    for subnet in layout(config):
+        ipam += 2 + reservation_count(subnet)
+        records += record_count(subnet)
+    zones = 1 + len(forward_zones(config)) + len(reverse_zones(config))
+
+    return { 'ipam': ipam, 'zones': zones, 'records': records }
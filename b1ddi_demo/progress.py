@@ -0,0 +1,338 @@
+'''
+
+ Description:
+
+    Live progress of a run: objects created or deleted, objects per
+    second and ETA for each phase, with the requests in flight and errors.
+    
+    Requests are counted as they complete, so the cost per request is a
+    counter update. On a terminal a status line is redrawn in place,
+    otherwise a progress line is logged periodically.
+
+ Requirements:
+   Python3 with collections, sys, threading and time modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import collections
+import logging
+import sys
+import threading
+import time
+from b1ddi_demo import client
+from b1ddi_demo import logs
+
+# Global Variables
+log = logging.getLogger(__name__)
+
+PHASES = [ 'ipam', 'zones', 'records', 'teardown' ]
+TTY_INTERVAL = 0.5
+LOG_INTERVAL = 10.0
+RATE_WINDOW = 5.0
+
+
+def phase(method, endpoint):
+    '''
+    Phase that a request belongs to
+
+    Parameters:
+        method (str): HTTP method
+        endpoint (str): API endpoint, e.g. /ipam/subnet
+
+    Returns:
+        str: Phase name or None for lookups
+    '''
+    if method == 'DELETE':
+        return 'teardown'
+    elif method != 'POST':
+        return None
+    elif endpoint.startswith('/ipam/'):
+        return 'ipam'
+    elif endpoint == '/dns/record':
+        return 'records'
+    elif endpoint.startswith('/dns/'):
+        return 'zones'
+
+    return None
+
+
+def duration(seconds):
+    '''
+    Format seconds as H:MM:SS
+    '''
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+
+    return '{}:{:02d}:{:02d}'.format(hours, minutes, seconds)
+
+
+class Phase:
+    '''
+    Counts for one phase
+    '''
+
+    def __init__(self, name, total=0):
+        self.name = name
+        self.total = total
+        self.done = 0
+        self.errors = 0
+        self.rate = 0.0
+        self.samples = collections.deque()
+        self.first = 0.0
+        self.last = 0.0
+
+        return
+
+
+    def update(self, now, window=RATE_WINDOW):
+        '''
+        Update the rate over the last window seconds
+        '''
+        self.samples.append((now, self.done))
+        while len(self.samples) > 2 and now - self.samples[1][0] >= window:
+            self.samples.popleft()
+        (start, first), (end, last) = self.samples[0], self.samples[-1]
+        self.rate = (last - first) / (end - start) if end > start else 0.0
+
+        return
+
+
+    def average(self):
+        '''
+        Returns:
+            float: Objects per second from the first to last completion
+        '''
+        if self.last > self.first:
+            return self.done / (self.last - self.first)
+        return 0.0
+
+
+    def render(self):
+        text = self.name + ' ' + str(self.done)
+        if self.total:
+            text += '/{} {:0.0f}%'.format(self.total, 
+                                          100.0 * self.done / self.total)
+        text += ' {:0.1f}/s'.format(self.rate)
+        remaining = self.total - self.done - self.errors
+        if remaining > 0 and self.rate > 0:
+            text += ' ETA ' + duration(remaining / self.rate)
+
+        return text
+
+
+class Progress:
+    '''
+    Progress reporter
+    '''
+
+    def __init__(self, totals=None, stream=sys.stderr, interval=0):
+        '''
+        Parameters:
+            totals (dict): Planned number of objects for each phase
+            stream (obj): Output for the status line on a terminal
+            interval (float): Seconds between updates, by default 
+                              TTY_INTERVAL on a terminal else LOG_INTERVAL
+        '''
+        totals = totals or {}
+        self.phases = { p: Phase(p, totals.get(p, 0)) for p in PHASES }
+        self.stream = stream
+        self.tty = stream.isatty()
+        self.interval = interval or (TTY_INTERVAL if self.tty else LOG_INTERVAL)
+        self.inflight = 0
+        self.errors = 0
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+        return
+
+
+    def expect(self, name, count):
+        '''
+        Add to the planned number of objects for a phase, e.g. once 
+        the objects to delete are known
+
+        Parameters:
+            name (str): Phase name
+            count (int): Number of objects
+        '''
+        with self.lock:
+            self.phases[name].total += count
+        return
+
+
+    def request_started(self):
+        with self.lock:
+            self.inflight += 1
+        return
+
+
+    def request_done(self, method, endpoint, ok):
+        '''
+        Count a completed request
+
+        Parameters:
+            method (str): HTTP method
+            endpoint (str): API endpoint
+            ok (bool): Request succeeded
+        '''
+        name = phase(method, endpoint)
+        with self.lock:
+            self.inflight -= 1
+            if not ok:
+                self.errors += 1
+            if name:
+                p = self.phases[name]
+                if ok:
+                    p.done += 1
+                else:
+                    p.errors += 1
+                p.last = time.monotonic()
+                if not p.first:
+                    p.first = p.last
+
+        return
+
+
+    def render(self, final=False):
+        '''
+        Parameters:
+            final (bool): Show the average rates of the whole run
+
+        Returns:
+            str: Progress of active phases, requests in flight and errors
+        '''
+        now = time.monotonic()
+        parts = []
+        with self.lock:
+            for p in self.phases.values():
+                if p.done or p.errors:
+                    p.update(now, max(RATE_WINDOW, self.interval))
+                    if final:
+                        p.rate = p.average()
+                    parts.append(p.render())
+            parts.append('in flight ' + str(self.inflight))
+            parts.append('errors ' + str(self.errors))
+        parts.append(duration(now - self.started))
+
+        return ' | '.join(parts)
+
+
+    def report(self, final=False):
+        line = self.render(final)
+        if self.tty:
+            self.stream.write('\r' + line + '\x1b[K')
+            self.stream.flush()
+        else:
+            log.log(logs.SUMMARY, line)
+
+        return
+
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.report()
+        return
+
+
+    def start(self):
+        self.started = time.monotonic()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return
+
+
+    def stop(self):
+        '''
+        Stop reporting, leaving a final progress line
+        '''
+        if self.thread:
+            self.stopped.set()
+            self.thread.join()
+            self.thread = None
+            self.report(final=True)
+            if self.tty:
+                self.stream.write('\n')
+                self.stream.flush()
+
+        return
+
+
+def install_progress(b1ddi, progress):
+    '''
+    Count the requests made by a bloxone object. Installed outside any
+    retries so each request is counted once.
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        progress (obj): Progress
+
+    Returns:
+        progress (obj): Progress
+    '''
+    def counted(method, call, url, *args, **kwargs):
+        progress.request_started()
+        ok = False
+        try:
+            response = call(url, *args, **kwargs)
+            ok = (response.status_code in b1ddi.return_codes_ok or
+                  (method == 'DELETE' and response.status_code == 404))
+        finally:
+            progress.request_done(method, client.endpoint(url), ok)
+        return response
+
+    client.wrap_api(b1ddi, counted)
+    b1ddi.progress = progress
+
+    return progress
+
+
+def expect(b1ddi, name, count):
+    '''
+    Add to the planned number of objects for a phase of the installed
+    progress reporter, if there is one
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        name (str): Phase name
+        count (int): Number of objects
+    '''
+    if hasattr(b1ddi, 'progress'):
+        b1ddi.progress.expect(name, count)
+
+    return
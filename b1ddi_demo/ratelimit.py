@@ -0,0 +1,239 @@
+'''
+
+ Description:
+
+    Adaptive rate control for API requests. A token bucket caps the
+    request rate, which is adjusted using AIMD (additive increase,
+    multiplicative decrease): the rate grows while requests are being held
+    back by the bucket and is cut whenever the API responds with 429 Too
+    Many Requests, honouring any Retry-After header.
+
+ Requirements:
+   Python3 with threading, time and email.utils modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import logging
+import email.utils
+import threading
+import time
+from b1ddi_demo import client
+
+# Global Variables
+log = logging.getLogger(__name__)
+
+
+def retry_after(response, default=1.0):
+    '''
+    Seconds to wait from a Retry-After header, either delta seconds or
+    an HTTP date
+
+    Parameters:
+        response (obj): requests response object
+        default (float): Value if there is no valid header
+
+    Returns:
+        float: Seconds
+    '''
+    value = response.headers.get('Retry-After', '') if response.headers else ''
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            date = email.utils.parsedate_to_datetime(value)
+            seconds = date.timestamp() - time.time()
+        except (TypeError, ValueError):
+            seconds = default
+
+    return max(0.0, seconds)
+
+
+class RateController:
+    '''
+    Token bucket with AIMD rate adjustment
+    '''
+
+    def __init__(self, rate=20.0, min_rate=1.0, max_rate=0, 
+                 increase=1.0, decrease=0.5, burst=1.0):
+        '''
+        Parameters:
+            rate (float): Initial requests per second
+            min_rate (float): Lowest rate after decreases
+            max_rate (float): Highest rate, 0 for no limit
+            increase (float): Requests per second added each second 
+                              that the rate is limiting requests
+            decrease (float): Rate multiplier on throttling
+            burst (float): Seconds worth of requests allowed as a burst
+        '''
+        self.rate = float(rate)
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate)
+        self.increase = float(increase)
+        self.decrease = float(decrease)
+        self.burst = float(burst)
+        self.tokens = self.rate * self.burst
+        self.stamp = time.monotonic()
+        self.paused_until = 0.0
+        self.last_change = self.stamp
+        self.limited = False
+        self.lock = threading.Lock()
+        # Statistics
+        self.requests = 0
+        self.throttled = 0
+        self.wait_time = 0.0
+
+        return
+
+
+    def acquire(self):
+        '''
+        Wait until a request may be made
+
+        Returns:
+            wait (float): Seconds waited
+        '''
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate * self.burst, 
+                              self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            # Tokens go negative to reserve a slot for each waiting request
+            self.tokens -= 1
+            wait = max(-self.tokens / self.rate, self.paused_until - now, 0.0)
+            if wait > 0:
+                self.limited = True
+            self.requests += 1
+            self.wait_time += wait
+
+        if wait > 0:
+            time.sleep(wait)
+
+        return wait
+
+
+    def success(self):
+        '''
+        Additive increase, at most once a second and only while the rate
+        is holding requests back
+        '''
+        with self.lock:
+            now = time.monotonic()
+            if self.limited and now - self.last_change >= 1.0:
+                self.rate += self.increase
+                if self.max_rate:
+                    self.rate = min(self.rate, self.max_rate)
+                self.limited = False
+                self.last_change = now
+
+        return
+
+
+    def throttle(self, delay=0.0):
+        '''
+        Multiplicative decrease and pause all requests
+
+        Parameters:
+            delay (float): Seconds to pause, e.g. from Retry-After
+        '''
+        with self.lock:
+            now = time.monotonic()
+            self.throttled += 1
+            # Concurrent requests see the same throttling, only cut the
+            # rate once per interval
+            if now - self.last_change >= 1.0 / self.rate:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self.last_change = now
+                log.debug("Throttled, rate reduced to %0.1f/s", self.rate)
+            self.tokens = min(self.tokens, 0.0)
+            self.paused_until = max(self.paused_until, 
+                                    now + max(delay, 1.0 / self.rate))
+
+        return
+
+
+def from_config(config):
+    '''
+    Build the adaptive rate controller for a demo config
+
+    Parameters:
+        config (dict): Demo config
+
+    Returns:
+        controller (obj): RateController or None if rate is 0
+    '''
+    controller = None
+    if float(config['rate']):
+        controller = RateController(rate=float(config['rate']),
+                                    max_rate=float(config['max_rate']),
+                                    increase=float(config['rate_increase']))
+
+    return controller
+
+
+def install_rate_limiter(b1ddi, controller, retries=5):
+    '''
+    Rate limit all requests made by a bloxone object. Requests that get
+    a 429 response were not processed so are retried, up to retries
+    times, once the controller allows.
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        controller (obj): RateController, may be shared by clients
+        retries (int): Maximum retries of a throttled request
+
+    Returns:
+        controller (obj): RateController
+    '''
+    def limited(method, call, url, *args, **kwargs):
+        for attempt in range(retries + 1):
+            controller.acquire()
+            response = call(url, *args, **kwargs)
+            if response.status_code != 429:
+                controller.success()
+                break
+            delay = retry_after(response, default=0.0)
+            log.debug("%s %s throttled, retry after %0.1fs",
+                      method, client.endpoint(url), delay)
+            controller.throttle(delay)
+            if hasattr(b1ddi, 'metrics') and attempt < retries:
+                b1ddi.metrics.retry(method, client.endpoint(url))
+        return response
+
+    client.wrap_api(b1ddi, limited)
+    b1ddi.rate_controller = controller
+
+    return controller
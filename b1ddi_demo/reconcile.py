@@ -0,0 +1,156 @@
+'''
+
+ Description:
+
+    Reconciliation of existing demo data against the desired state.
+    Existing objects are bulk read (a page at a time, with projected
+    _fields), compared with the desired objects and only the missing
+    objects are created and stale objects deleted
+
+ Requirements:
+   Python3 with logging module
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import logging
+from b1ddi_demo import progress
+from b1ddi_demo import records
+from b1ddi_demo import sweep
+from b1ddi_demo import teardown
+
+# Global Variables
+log = logging.getLogger(__name__)
+
+
+def fetch_existing(b1ddi, objpath, keyfunc, fields, **params):
+    '''
+    Bulk read existing objects into a dictionary of ids
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        objpath (str): Swagger object path
+        keyfunc (callable): Returns the comparison key for an object
+        fields (str): Comma separated fields needed by keyfunc
+        **params: Query parameters, e.g. _filter, _tfilter
+
+    Returns:
+        existing (dict): Object ids keyed by keyfunc(obj)
+    '''
+    existing = {}
+    for obj in sweep.iter_objects(b1ddi, objpath, 
+                                  _fields='id,' + fields, **params):
+        existing[keyfunc(obj)] = obj['id']
+    log.info("%s existing %s objects", len(existing), objpath)
+
+    return existing
+
+
+def diff(desired, existing):
+    '''
+    Compare desired objects with existing objects
+
+    Parameters:
+        desired (iter): Iterable of (key, item) tuples
+        existing (dict): Object ids keyed by key, as fetch_existing()
+
+    Returns:
+        (missing, stale) tuple, where missing is a list of the items for
+        keys that do not exist and stale is a dictionary of the ids of
+        existing objects that are not desired, keyed by key
+    '''
+    stale = dict(existing)
+    missing = []
+    for key, item in desired:
+        if stale.pop(key, None) is None:
+            missing.append(item)
+
+    return missing, stale
+
+
+def apply(b1ddi, objpath, missing, stale, workers=8):
+    '''
+    Create missing objects and delete stale objects
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        objpath (str): Swagger object path
+        missing (list): (label, body) tuples to create
+        stale (dict): Object ids to delete keyed by description
+        workers (int): Number of concurrent requests
+
+    Returns:
+        counts (dict): Numbers 'created', 'deleted' and 'failed'
+    '''
+    counts = { 'created': 0, 'deleted': 0, 'failed': 0 }
+    log.info("~~~~ %s: %s to create, %s to delete ~~~~",
+             objpath, len(missing), len(stale))
+    if stale:
+        progress.expect(b1ddi, 'teardown', len(stale))
+        result = teardown.delete_many(b1ddi, 
+                    ( (objpath, id, "{} {}".format(objpath, key)) 
+                      for key, id in stale.items() ), workers=workers)
+        counts['deleted'] = result['deleted']
+        counts['failed'] += result['failed']
+    if missing:
+        result = records.bulk_create(b1ddi, objpath, missing, window=workers)
+        counts['created'] = result['created']
+        counts['failed'] += result['failed']
+
+    return counts
+
+
+def reconcile(b1ddi, objpath, desired, keyfunc, fields, workers=8, 
+              **params):
+    '''
+    Reconcile one object type
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        objpath (str): Swagger object path
+        desired (iter): Iterable of (key, (label, body)) tuples
+        keyfunc (callable): Returns the comparison key for an object
+        fields (str): Comma separated fields needed by keyfunc
+        workers (int): Number of concurrent requests
+        **params: Query parameters selecting existing objects
+
+    Returns:
+        counts (dict): Numbers 'created', 'deleted' and 'failed'
+    '''
+    existing = fetch_existing(b1ddi, objpath, keyfunc, fields, **params)
+    missing, stale = diff(desired, existing)
+
+    return apply(b1ddi, objpath, missing, stale, workers=workers)
@@ -0,0 +1,145 @@
+'''
+
+ Description:
+
+    asyncio based bulk object creation engine, used to create large
+    numbers of DNS records with a bounded number of requests in flight
+
+ Requirements:
+   Python3 with asyncio and concurrent.futures modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import logging
+import concurrent.futures
+
+# Global Variables
+log = logging.getLogger(__name__)
+
+
+def _create(b1ddi, objpath, label, body):
+    '''
+    Blocking create of a single object, run in the executor
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        objpath (str): Swagger object path
+        label (str): Description of object for logging
+        body (str): JSON body
+
+    Returns:
+        bool: True if successful
+    '''
+    status = False
+    try:
+        response = b1ddi.create(objpath, body)
+    except Exception as err:
+        log.warning("Failed to create %s: %s", label, err)
+    else:
+        if response.status_code in b1ddi.return_codes_ok:
+            log.info("Created %s", label)
+            status = True
+        else:
+            log.warning("Failed to create %s", label)
+            log.debug("Return code: %s", response.status_code)
+            log.debug("Return body: %s", response.text)
+
+    return status
+
+
+async def create_objects(b1ddi, objpath, items, window=32):
+    '''
+    Create objects from a (streaming) iterable keeping at most window
+    requests in flight
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        objpath (str): Swagger object path, e.g. '/dns/record'
+        items (iter): Iterable of (label, body) tuples
+        window (int): Maximum number of requests in flight
+
+    Returns:
+        counts (dict): Number of objects 'created' and 'failed'
+    '''
+    import asyncio
+
+    counts = { 'created': 0, 'failed': 0 }
+    window = max(1, int(window))
+    loop = asyncio.get_running_loop()
+    pending = set()
+
+    def tally(done):
+        for task in done:
+            if task.result():
+                counts['created'] += 1
+            else:
+                counts['failed'] += 1
+        return
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=window) as executor:
+        # Items are pulled from the iterable only when there is room in
+        # the window so the full set of bodies is never held in memory
+        for label, body in items:
+            if len(pending) >= window:
+                done, pending = await asyncio.wait(pending, 
+                                return_when=asyncio.FIRST_COMPLETED)
+                tally(done)
+            pending.add(loop.run_in_executor(executor, _create, 
+                                             b1ddi, objpath, label, body))
+        if pending:
+            done, pending = await asyncio.wait(pending)
+            tally(done)
+
+    return counts
+
+
+def bulk_create(b1ddi, objpath, items, window=32):
+    '''
+    Synchronous wrapper for create_objects()
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        objpath (str): Swagger object path, e.g. '/dns/record'
+        items (iter): Iterable of (label, body) tuples
+        window (int): Maximum number of requests in flight
+
+    Returns:
+        counts (dict): Number of objects 'created' and 'failed'
+    '''
+    import asyncio
+
+    return asyncio.run(create_objects(b1ddi, objpath, items, window=window))
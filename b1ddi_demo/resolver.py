@@ -0,0 +1,451 @@
+'''
+
+ Description:
+
+    Name to ID resolution cache for the bloxone.b1ddi client. IDs are
+    cached from get_id() lookups and seeded from the responses to create
+    calls, several names can be resolved with a single filtered query and
+    the cache can be persisted between create and --remove runs
+
+ Requirements:
+   Python3 with json and threading modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import logging
+import json
+import os
+import threading
+
+# Global Variables
+log = logging.getLogger(__name__)
+
+# Objects whose create responses are used to seed the cache and the
+# keys (and scoping keys) they are looked up by
+SEED_KEYS = { '/ipam/ip_space': ('name',),
+              '/dns/view': ('name',),
+              '/dns/auth_nsg': ('name',),
+              '/dns/auth_zone': ('fqdn', 'view') }
+
+
+def short_id(id):
+    '''
+    Strip the object path from an id
+
+    Parameters:
+        id (str): Object id, with or without path
+
+    Returns:
+        id (str): Object id without path
+    '''
+    return id.rsplit('/', 1)[-1]
+
+
+def build_filter(filters, key='', values=()):
+    '''
+    Build an API _filter string
+
+    Parameters:
+        filters (dict): key/value pairs that must all match
+        key (str): Optional key to match against any of values
+        values (list): Values for key
+
+    Returns:
+        filter (str): Filter string
+    '''
+    terms = [ '(' + k + '=="' + v + '")' for k, v in sorted(filters.items()) ]
+    if values:
+        terms.append('(' + 'or'.join([ '(' + key + '=="' + v + '")' 
+                                       for v in values ]) + ')')
+
+    return 'and'.join(terms)
+
+
+class Resolver:
+    '''
+    Cache of object ids keyed by object path and the filter used to 
+    find them. All ids are stored with their path.
+    '''
+
+    def __init__(self, b1ddi, path=''):
+        '''
+        Parameters:
+            b1ddi (obj): bloxone.b1ddi object
+            path (str): Optional filename used by load() and save()
+        '''
+        self.b1ddi = b1ddi
+        self.path = path
+        self.ids = {}
+        self.keys = {}
+        self.persisted = set()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        # Keep references to the uncached client methods
+        self._get = b1ddi.get
+        self._get_id = b1ddi.get_id
+        self._create = b1ddi.create
+        self._delete = b1ddi.delete
+
+        return
+
+
+    def _key(self, objpath, filters):
+        return ( objpath, tuple(sorted(filters.items())) )
+
+
+    def add(self, objpath, id, **filters):
+        '''
+        Add an id to the cache
+
+        Parameters:
+            objpath (str): Swagger object path
+            id (str): Object id including path
+            **filters: key/value pairs identifying the object
+        '''
+        key = self._key(objpath, filters)
+        with self.lock:
+            self.ids[key] = id
+            self.keys.setdefault(short_id(id), set()).add(key)
+
+        return
+
+
+    def cached(self, objpath, **filters):
+        '''
+        Return a cached id without making an API call
+
+        Parameters:
+            objpath (str): Swagger object path
+            **filters: key/value pairs identifying the object
+
+        Returns:
+            id (str): Object id including path or ""
+        '''
+        with self.lock:
+            return self.ids.get(self._key(objpath, filters), "")
+
+
+    def forget(self, id):
+        '''
+        Remove all cache entries for an object id
+
+        Parameters:
+            id (str): Object id, with or without path
+
+        Returns:
+            keys (set): Cache keys that were removed
+        '''
+        with self.lock:
+            keys = self.keys.pop(short_id(id), set())
+            for key in keys:
+                self.ids.pop(key, None)
+                self.persisted.discard(key)
+
+        return keys
+
+
+    def lookup(self, objpath, **filters):
+        '''
+        Find a single object id matching all filters using the cache
+        where possible
+
+        Parameters:
+            objpath (str): Swagger object path
+            **filters: key/value pairs identifying the object
+
+        Returns:
+            id (str): Object id including path or ""
+        '''
+        id = self.cached(objpath, **filters)
+        if id:
+            self.hits += 1
+        else:
+            self.misses += 1
+            fields = ','.join(list(filters.keys()) + ['id'])
+            response = self._get(objpath, _filter=build_filter(filters), 
+                                 _fields=fields)
+            if response.status_code in self.b1ddi.return_codes_ok:
+                results = response.json().get('results', [])
+                if len(results) == 1:
+                    id = results[0]['id']
+                    self.add(objpath, id, **filters)
+                elif results:
+                    log.warning("%s objects in %s match %s",
+                                len(results), objpath, filters)
+            else:
+                log.debug("Lookup in %s failed, return code: %s",
+                          objpath, response.status_code)
+
+        return id
+
+
+    def get_id(self, objpath, *, key="", value="", include_path=False):
+        '''
+        Cached replacement for b1ddi.get_id()
+
+        Parameters:
+            objpath (str):  Swagger object path
+            key (str):      name of key to match
+            value (str):    value to match
+            include_path (bool): Include path to object id
+
+        Returns:
+            id (str):   object id or ""
+        '''
+        id = self.cached(objpath, **{ key: value })
+        if id:
+            self.hits += 1
+        else:
+            self.misses += 1
+            id = self._get_id(objpath, key=key, value=value, 
+                              include_path=True)
+            if id:
+                self.add(objpath, id, **{ key: value })
+        if id and not include_path:
+            id = short_id(id)
+
+        return id
+
+
+    def resolve_many(self, objpath, key, values, **filters):
+        '''
+        Resolve several names with a single filtered query
+
+        Parameters:
+            objpath (str): Swagger object path
+            key (str): Key to match, e.g. "name"
+            values (list): Values of key to resolve
+            **filters: Additional key/value pairs all objects must match
+
+        Returns:
+            ids (dict): Object ids, including path, keyed by value
+        '''
+        ids = {}
+        missing = []
+        for value in values:
+            id = self.cached(objpath, **dict(filters, **{ key: value }))
+            if id:
+                self.hits += 1
+                ids[value] = id
+            elif value not in missing:
+                missing.append(value)
+
+        if missing:
+            self.misses += len(missing)
+            fields = ','.join([key] + list(filters.keys()) + ['id'])
+            response = self._get(objpath, 
+                                 _filter=build_filter(filters, key, missing),
+                                 _fields=fields)
+            if response.status_code in self.b1ddi.return_codes_ok:
+                for obj in response.json().get('results', []):
+                    if obj.get(key) in missing:
+                        ids[obj[key]] = obj['id']
+                        self.add(objpath, obj['id'], 
+                                 **dict(filters, **{ key: obj[key] }))
+            else:
+                log.debug("Lookup in %s failed, return code: %s",
+                          objpath, response.status_code)
+
+        return ids
+
+
+    def seed(self, objpath, response):
+        '''
+        Add the id from a create response to the cache
+
+        Parameters:
+            objpath (str): Swagger object path
+            response (obj): requests response object
+        '''
+        keys = SEED_KEYS.get(objpath)
+        if keys and response.status_code in self.b1ddi.return_codes_ok:
+            try:
+                obj = response.json().get('result', {})
+            except ValueError:
+                obj = {}
+            if 'id' in obj and all(k in obj for k in keys):
+                self.add(objpath, obj['id'], **{ k: obj[k] for k in keys })
+
+        return
+
+
+    def create(self, objpath, body=""):
+        '''
+        Wrapper for b1ddi.create() seeding the cache from the response
+        '''
+        response = self._create(objpath, body)
+        self.seed(objpath, response)
+
+        return response
+
+
+    def delete(self, objpath, id=""):
+        '''
+        Wrapper for b1ddi.delete() that evicts deleted objects. Ids that
+        were loaded from disk and are no longer valid are looked up again
+        '''
+        response = self._delete(objpath, id=id)
+        if response.status_code == 404:
+            with self.lock:
+                persisted = set(self.persisted)
+            stale = [ k for k in self.forget(id) if k in persisted ]
+            for path, filters in stale:
+                fresh = self.lookup(path, **dict(filters))
+                if fresh and short_id(fresh) != short_id(id):
+                    log.debug("Stale cached id %s replaced by %s", id, fresh)
+                    if '/' not in id:
+                        fresh = short_id(fresh)
+                    response = self.delete(objpath, id=fresh)
+                    break
+        elif response.status_code in self.b1ddi.return_codes_ok:
+            self.forget(id)
+
+        return response
+
+
+    def load(self, path=''):
+        '''
+        Load persisted ids for the same API url from disk
+
+        Parameters:
+            path (str): Override filename
+        '''
+        path = path or self.path
+        if path and os.path.isfile(path):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (IOError, ValueError) as err:
+                log.warning("Unable to read id cache %s: %s", path, err)
+                data = {}
+            if data.get('url') == self.b1ddi.ddi_url:
+                for objpath, filters, id in data.get('ids', []):
+                    self.add(objpath, id, **filters)
+                    self.persisted.add(self._key(objpath, filters))
+                log.info("Loaded %s cached ids from %s",
+                         len(data.get('ids', [])), path)
+            elif data:
+                log.debug("Id cache %s is for a different tenant", path)
+
+        return
+
+
+    def save(self, path=''):
+        '''
+        Persist cached ids to disk
+
+        Parameters:
+            path (str): Override filename
+        '''
+        path = path or self.path
+        if path:
+            with self.lock:
+                ids = [ [ objpath, dict(filters), id ] 
+                        for (objpath, filters), id in self.ids.items() ]
+            try:
+                with open(path, 'w') as f:
+                    json.dump({ 'url': self.b1ddi.ddi_url, 'ids': ids }, f)
+                log.debug("Saved %s cached ids to %s", len(ids), path)
+            except IOError as err:
+                log.warning("Unable to save id cache %s: %s", path, err)
+
+        return
+
+
+def install_resolver(b1ddi, path=''):
+    '''
+    Install a Resolver on a bloxone.b1ddi object replacing get_id() and
+    wrapping create() and delete(). The resolver is available as
+    b1ddi.resolver
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        path (str): Optional filename to persist the cache to
+
+    Returns:
+        resolver (obj): Resolver object
+    '''
+    resolver = Resolver(b1ddi, path=path)
+    b1ddi.get_id = resolver.get_id
+    b1ddi.create = resolver.create
+    b1ddi.delete = resolver.delete
+    b1ddi.resolver = resolver
+
+    return resolver
+
+
+def resolve(b1ddi, objpath, **filters):
+    '''
+    Find a single object id matching all filters, using the installed
+    resolver if there is one
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        objpath (str): Swagger object path
+        **filters: key/value pairs identifying the object
+
+    Returns:
+        id (str): Object id including path or ""
+    '''
+    resolver = getattr(b1ddi, 'resolver', None)
+    if not isinstance(resolver, Resolver):
+        resolver = Resolver(b1ddi)
+
+    return resolver.lookup(objpath, **filters)
+
+
+def resolve_many(b1ddi, objpath, key, values, **filters):
+    '''
+    Find the ids of several objects with a single query, using the 
+    installed resolver if there is one
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        objpath (str): Swagger object path
+        key (str): Key to match, e.g. "name"
+        values (list): Values of key to resolve
+        **filters: Additional key/value pairs all objects must match
+
+    Returns:
+        ids (dict): Object ids, including path, keyed by value
+    '''
+    resolver = getattr(b1ddi, 'resolver', None)
+    if not isinstance(resolver, Resolver):
+        resolver = Resolver(b1ddi)
+
+    return resolver.resolve_many(objpath, key, values, **filters)
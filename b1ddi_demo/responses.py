@@ -0,0 +1,224 @@
+'''
+
+ Description:
+
+    Response handling for the bloxone client. Response bodies are parsed
+    once, however many times json() is called on a response.
+    
+    List results are parsed incrementally as the body is received, yielding
+    each object in turn, so neither the whole body nor the whole list of
+    objects is held in memory when walking large numbers of objects.
+
+ Requirements:
+   Python3 with codecs, json, logging and re modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import logging
+import codecs
+import json
+import re
+from b1ddi_demo import client
+
+# Global Variables
+log = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Whitespace and commas between array elements
+SEPARATORS = re.compile(r'[\s,]*')
+WHITESPACE = re.compile(r'\s*')
+
+
+def parse_once(response):
+    '''
+    Cache the result of json() on a response object
+
+    Parameters:
+        response (obj): requests response object
+
+    Returns:
+        response (obj): The same response object
+    '''
+    parse = response.json
+    cache = []
+
+    def cached_json(**kwargs):
+        if not cache:
+            cache.append(parse(**kwargs))
+        return cache[0]
+
+    response.json = cached_json
+
+    return response
+
+
+def install_json_cache(b1ddi):
+    '''
+    Parse the body of each response made by a bloxone object only once
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+    '''
+    def cached(method, call, url, *args, **kwargs):
+        return parse_once(call(url, *args, **kwargs))
+
+    client.wrap_api(b1ddi, cached)
+
+    return
+
+
+def iter_items(chunks, key='results'):
+    '''
+    Incrementally parse the array of a JSON object, such as
+    {"results": [ {...}, {...} ]}, yielding each element once it has
+    been received
+
+    Parameters:
+        chunks (iter): Iterable of bytes
+        key (str): Key of the array
+
+    Yields:
+        Each element of the array
+    '''
+    decode = json.JSONDecoder().raw_decode
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    start = re.compile(r'"' + re.escape(key) + r'"\s*:\s*\[')
+    chunks = iter(chunks)
+    buffer = ''
+    pos = 0
+
+    def more():
+        nonlocal buffer, pos
+        chunk = next(chunks, None)
+        if chunk is None:
+            return False
+        # Drop everything already parsed
+        buffer = buffer[pos:] + utf8.decode(chunk)
+        pos = 0
+        return True
+
+    # Find the start of the array
+    while True:
+        match = start.search(buffer, pos)
+        if match:
+            pos = match.end()
+            break
+        # Keep enough to match a key split across chunks
+        pos = max(pos, len(buffer) - len(key) - 64)
+        if not more():
+            return
+
+    while True:
+        pos = SEPARATORS.match(buffer, pos).end()
+        if pos >= len(buffer):
+            if not more():
+                raise ValueError("Response ended before end of " + key)
+            continue
+        if buffer[pos] == ']':
+            return
+        try:
+            item, end = decode(buffer, pos)
+        except ValueError:
+            # Element incomplete, wait for more of the body
+            if not more():
+                raise
+            continue
+        # A scalar split across chunks decodes early, e.g. 12 of 12345,
+        # so only accept an element once the next separator is buffered
+        after = WHITESPACE.match(buffer, end).end()
+        if after >= len(buffer) or buffer[after] not in ',]':
+            if more():
+                continue
+        pos = end
+        yield item
+
+
+def stream_results(response, key='results', chunk_size=CHUNK_SIZE):
+    '''
+    Yield the results of a streamed response as they are received, 
+    closing the response when done
+
+    Parameters:
+        response (obj): requests response object, requested with stream
+        key (str): Key of the results array
+        chunk_size (int): Bytes read at a time
+
+    Yields:
+        obj (dict): Each result
+    '''
+    import requests
+
+    try:
+        yield from iter_items(response.iter_content(chunk_size), key=key)
+    except (requests.exceptions.RequestException, ValueError) as err:
+        log.warning("--- Results from %s incomplete: %s", 
+                    client.endpoint(response.url), err)
+    finally:
+        response.close()
+
+    return
+
+
+def get_results(b1ddi, objpath, **params):
+    '''
+    List objects, streaming the results when the client has a transport
+    that supports it
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        objpath (str): Swagger object path
+        **params: Query parameters, e.g. _filter, _fields, _limit
+
+    Returns:
+        (response, results) tuple, results is an iterator over the
+        objects and is empty if the request failed
+    '''
+    if hasattr(b1ddi, 'transport'):
+        url = b1ddi._add_params(b1ddi.ddi_url + objpath, **params)
+        response = b1ddi._apiget(url, stream=True)
+    else:
+        response = b1ddi.get(objpath, **params)
+
+    if response.status_code not in b1ddi.return_codes_ok:
+        results = iter(())
+    elif getattr(response, 'streamed', False):
+        results = stream_results(response)
+    else:
+        results = iter(response.json().get('results', []))
+
+    return response, results
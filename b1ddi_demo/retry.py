@@ -0,0 +1,305 @@
+'''
+
+ Description:
+
+    Retry of failed API requests with jittered exponential backoff and
+    per endpoint circuit breakers.
+    
+    Only failures that are safe to retry are retried: for GET, PUT and
+    DELETE any connection error, timeout or 500/502/503/504 response; for
+    POST and PATCH only connection timeouts and 503 responses, where the
+    request cannot have been processed.
+    
+    Once an endpoint has failed repeatedly its circuit opens and requests
+    to it fail immediately, with a 503 response generated locally, until a
+    trial request succeeds after the reset timeout.
+
+ Requirements:
+   Python3 with random, threading, time and requests modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import logging
+import random
+import threading
+import time
+from b1ddi_demo import client
+
+# Global Variables
+log = logging.getLogger(__name__)
+
+IDEMPOTENT = [ 'GET', 'PUT', 'DELETE' ]
+RETRY_CODES = [ 500, 502, 503, 504 ]
+UNPROCESSED_CODES = [ 503 ]
+
+
+def error_response(message, status_code=503):
+    '''
+    Generate a response object without an API call, in the same way
+    as bloxone does for objects that are not found
+
+    Parameters:
+        message (str): Error message
+        status_code (int): HTTP status code
+
+    Returns:
+        requests response object
+    '''
+    import requests
+
+    err_msg = '{"error":[{"message":"' + message.replace('"', "'") + '"}]}'
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = str.encode(err_msg)
+
+    return response
+
+
+class RetryPolicy:
+    '''
+    Decide whether to retry and how long to wait
+    '''
+
+    def __init__(self, attempts=4, base=0.5, cap=10.0, deadline=60.0):
+        '''
+        Parameters:
+            attempts (int): Maximum attempts per request
+            base (float): Initial backoff in seconds
+            cap (float): Maximum backoff in seconds
+            deadline (float): Maximum seconds to spend on a request
+        '''
+        self.attempts = max(1, int(attempts))
+        self.base = float(base)
+        self.cap = float(cap)
+        self.deadline = float(deadline)
+        self.retries = 0
+        self.gave_up = 0
+
+        return
+
+
+    def retryable(self, method, response=None, error=None):
+        '''
+        Check whether a failed request may be retried
+
+        Parameters:
+            method (str): HTTP method
+            response (obj): requests response object, if any
+            error (Exception): Exception raised, if any
+
+        Returns:
+            bool
+        '''
+        if error is not None:
+            import requests
+            if method in IDEMPOTENT:
+                return isinstance(error, requests.exceptions.RequestException)
+            return isinstance(error, requests.exceptions.ConnectTimeout)
+        if method in IDEMPOTENT:
+            return response.status_code in RETRY_CODES
+        return response.status_code in UNPROCESSED_CODES
+
+
+    def backoff(self, attempt):
+        '''
+        Full jitter exponential backoff
+
+        Parameters:
+            attempt (int): Number of attempts made so far
+
+        Returns:
+            float: Seconds to wait
+        '''
+        return random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    '''
+    Circuit breaker for a single endpoint
+    '''
+
+    def __init__(self, threshold=10, reset=30.0):
+        '''
+        Parameters:
+            threshold (int): Consecutive failures that open the circuit
+            reset (float): Seconds before a trial request is allowed
+        '''
+        self.threshold = int(threshold)
+        self.reset = float(reset)
+        self.failures = 0
+        self.opened = 0.0
+        self.state = 'closed'
+        self.lock = threading.Lock()
+
+        return
+
+
+    def allow(self):
+        '''
+        Returns:
+            bool: True if a request may be made
+        '''
+        with self.lock:
+            if self.state == 'open':
+                if time.monotonic() - self.opened >= self.reset:
+                    # Let a single trial request through
+                    self.state = 'half-open'
+                    return True
+                return False
+            elif self.state == 'half-open':
+                return False
+            return True
+
+
+    def record(self, success):
+        '''
+        Record the outcome of a request
+
+        Parameters:
+            success (bool): Request succeeded
+        '''
+        with self.lock:
+            if success:
+                self.failures = 0
+                self.state = 'closed'
+            else:
+                self.failures += 1
+                if (self.state == 'half-open' or 
+                    self.failures >= self.threshold):
+                    if self.state != 'open':
+                        log.warning("Circuit opened after %s failures",
+                                    self.failures)
+                    self.state = 'open'
+                    self.opened = time.monotonic()
+
+        return
+
+
+class Breakers:
+    '''
+    Circuit breakers keyed by endpoint
+    '''
+
+    def __init__(self, threshold=10, reset=30.0):
+        self.threshold = threshold
+        self.reset = reset
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+        return
+
+
+    def get(self, endpoint):
+        with self.lock:
+            breaker = self.breakers.get(endpoint)
+            if not breaker:
+                breaker = CircuitBreaker(self.threshold, self.reset)
+                self.breakers[endpoint] = breaker
+        return breaker
+
+
+    def open_endpoints(self):
+        '''
+        Returns:
+            list: Endpoints whose circuit is not closed
+        '''
+        return [ e for e, b in self.breakers.items() if b.state != 'closed' ]
+
+
+def install_retry(b1ddi, policy, breakers):
+    '''
+    Retry failed requests made by a bloxone object and fail fast on 
+    endpoints whose circuit is open
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        policy (obj): RetryPolicy
+        breakers (obj): Breakers
+
+    Returns:
+        policy (obj): RetryPolicy
+    '''
+    import requests
+
+    def retried(method, call, url, *args, **kwargs):
+        path = client.endpoint(url)
+        breaker = breakers.get(path)
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                return error_response('Circuit open for ' + path)
+            error = None
+            response = None
+            failed = True
+            try:
+                response = call(url, *args, **kwargs)
+                failed = response.status_code >= 500
+            except requests.exceptions.RequestException as err:
+                error = err
+            finally:
+                # Always record the outcome, a half-open circuit only 
+                # lets one trial request through
+                breaker.record(not failed)
+            attempt += 1
+
+            if not failed or not policy.retryable(method, response, error):
+                break
+            delay = policy.backoff(attempt)
+            if (attempt >= policy.attempts or 
+                time.monotonic() + delay - start > policy.deadline):
+                policy.gave_up += 1
+                break
+            policy.retries += 1
+            if hasattr(b1ddi, 'metrics'):
+                b1ddi.metrics.retry(method, path)
+            log.debug("%s %s failed (%s), retry %s in %0.2fs",
+                      method, path, error or response.status_code, 
+                      attempt, delay)
+            time.sleep(delay)
+
+        if error is not None:
+            log.warning("%s %s failed: %s", method, path, error)
+            response = error_response(str(error))
+
+        return response
+
+    client.wrap_api(b1ddi, retried)
+    b1ddi.retry_policy = policy
+    b1ddi.breakers = breakers
+
+    return policy
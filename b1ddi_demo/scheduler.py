@@ -0,0 +1,242 @@
+'''
+
+ Description:
+
+    Dependency aware task scheduler used to run independent parts of the
+    demo (IPAM and DNS branches, sibling subnets) concurrently
+
+ Requirements:
+   Python3 with concurrent.futures and threading modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import logging
+import concurrent.futures
+
+# Global Variables
+log = logging.getLogger(__name__)
+
+
+class Result:
+    '''
+    Placeholder for the result of another task, substituted when the
+    task using it is started
+    '''
+
+    def __init__(self, name):
+        '''
+        Parameters:
+            name (str): Name of task whose result should be used
+        '''
+        self.name = name
+
+        return
+
+
+class Task:
+    '''
+    A node in the task graph
+    '''
+
+    def __init__(self, name, func, args=(), kwargs=None, 
+                 requires=(), after=()):
+        '''
+        Parameters:
+            name (str): Unique task name
+            func (callable): Function to call
+            args (tuple): Positional arguments for func
+            kwargs (dict): Keyword arguments for func
+            requires (list): Tasks that must complete successfully first
+            after (list): Tasks that must complete (in any state) first
+        '''
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.requires = list(requires)
+        self.after = list(after)
+        self.dependants = []
+        self.waiting = len(self.requires) + len(self.after)
+        self.state = 'pending'
+        self.result = None
+
+        return
+
+
+class Scheduler:
+    '''
+    Run a graph of tasks, starting each task as soon as the tasks it
+    depends on have finished, with at most 'workers' tasks running at
+    any one time.
+
+    Following the convention used throughout the demo script a task is
+    considered successful if it returns a truthy value. Tasks that
+    require a failed (or skipped) task are skipped.
+    '''
+
+    def __init__(self, workers=4):
+        '''
+        Parameters:
+            workers (int): Maximum number of concurrent tasks
+        '''
+        self.workers = max(1, int(workers))
+        self.tasks = {}
+
+        return
+
+
+    def add(self, name, func, *args, requires=(), after=(), **kwargs):
+        '''
+        Add a task to the graph
+
+        Parameters:
+            name (str): Unique task name
+            func (callable): Function to call with *args, **kwargs
+                             Result() placeholders in args/kwargs are
+                             replaced with the named task's result
+            requires (list): Names of tasks that must succeed first
+            after (list): Names of tasks that must finish first
+
+        Returns:
+            name (str): Task name, to simplify building dependencies
+        '''
+        if name in self.tasks:
+            raise ValueError('Duplicate task name: {}'.format(name))
+        for dep in list(requires) + list(after):
+            if dep not in self.tasks:
+                raise ValueError('Task {} depends on unknown task {}'
+                                 .format(name, dep))
+
+        task = Task(name, func, args=args, kwargs=kwargs, 
+                    requires=requires, after=after)
+        self.tasks[name] = task
+        for dep in task.requires + task.after:
+            self.tasks[dep].dependants.append(task)
+
+        return name
+
+
+    def result(self, name):
+        '''
+        Return the result of a completed task
+
+        Parameters:
+            name (str): Task name
+
+        Returns:
+            Return value of the task function or None
+        '''
+        return self.tasks[name].result
+
+
+    def _runnable(self, task):
+        # A task may run only if everything it requires succeeded
+        for dep in task.requires:
+            if self.tasks[dep].state != 'ok':
+                return False
+        return True
+
+
+    def _resolve(self, value):
+        # Substitute Result placeholders
+        if isinstance(value, Result):
+            value = self.tasks[value.name].result
+        return value
+
+
+    def _release(self, task, ready):
+        # Notify dependants that task has finished
+        for dependant in task.dependants:
+            dependant.waiting -= 1
+            if dependant.waiting == 0:
+                ready.append(dependant)
+
+        return
+
+
+    def run(self):
+        '''
+        Execute the task graph
+
+        Returns:
+            summary (dict): Lists of task names keyed by final state
+                            'ok', 'failed' and 'skipped'
+        '''
+        summary = { 'ok': [], 'failed': [], 'skipped': [] }
+        ready = [ t for t in self.tasks.values() if t.waiting == 0 ]
+        running = {}
+
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.workers) as executor:
+            while ready or running:
+                # Start (or skip) everything that is ready
+                while ready:
+                    task = ready.pop(0)
+                    if self._runnable(task):
+                        task.state = 'running'
+                        args = [ self._resolve(a) for a in task.args ]
+                        kwargs = { k: self._resolve(v) 
+                                   for k, v in task.kwargs.items() }
+                        future = executor.submit(task.func, *args, **kwargs)
+                        running[future] = task
+                    else:
+                        log.debug("Skipping task %s", task.name)
+                        task.state = 'skipped'
+                        summary['skipped'].append(task.name)
+                        self._release(task, ready)
+
+                if not running:
+                    continue
+
+                done, _ = concurrent.futures.wait(running, 
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    try:
+                        task.result = future.result()
+                    except Exception as err:
+                        log.error("Task %s raised %s: %s",
+                                  task.name, type(err).__name__, err)
+                        task.result = None
+                    if task.result:
+                        task.state = 'ok'
+                    else:
+                        task.state = 'failed'
+                    summary[task.state].append(task.name)
+                    self._release(task, ready)
+
+        return summary
@@ -0,0 +1,109 @@
+'''
+
+ Description:
+
+    Sharded execution across processes. Work is split into contiguous
+    ranges of subnets and records and each range is run in its own worker
+    process, so JSON encoding, TLS and logging are spread across cores.
+
+ Requirements:
+   Python3 with concurrent.futures and multiprocessing modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import logging
+import concurrent.futures
+import multiprocessing
+
+# Global Variables
+log = logging.getLogger(__name__)
+
+
+def partition(total, shards):
+    '''
+    Split a number of items into contiguous ranges of near equal size
+
+    Parameters:
+        total (int): Number of items
+        shards (int): Number of ranges
+
+    Returns:
+        list: (start, stop) tuple for each shard
+    '''
+    ranges = []
+    size, extra = divmod(int(total), max(1, int(shards)))
+    start = 0
+    for n in range(max(1, int(shards))):
+        stop = start + size + (1 if n < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+
+    return ranges
+
+
+def run(func, jobs, processes=0, initializer=None, initargs=()):
+    '''
+    Run func once for each job in a pool of worker processes. Workers are
+    started, rather than forked, so they do not inherit the threads and
+    connections of the parent; func and its arguments must be picklable.
+
+    Parameters:
+        func (callable): Module level function
+        jobs (list): Tuple of arguments for each call
+        processes (int): Worker processes, 0 for one per job
+        initializer (callable): Module level function called once in 
+                                each worker before its first job
+        initargs (tuple): Arguments for initializer
+
+    Returns:
+        list: Result of each job in order, None if the job raised
+    '''
+    results = [ None ] * len(jobs)
+    context = multiprocessing.get_context('spawn')
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=(processes or len(jobs) or 1), mp_context=context,
+            initializer=initializer, initargs=initargs) as pool:
+        futures = { pool.submit(func, *args): n 
+                    for n, args in enumerate(jobs) }
+        for future in concurrent.futures.as_completed(futures):
+            n = futures[future]
+            try:
+                results[n] = future.result()
+            except Exception as err:
+                log.error("Shard %s failed: %s", n, err)
+
+    return results
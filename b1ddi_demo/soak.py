@@ -0,0 +1,481 @@
+'''
+
+ Description:
+
+    Open-loop load generation (soak) against a demo. Address and DNS
+    record creates, updates and deletes are issued at a fixed rate, to a
+    schedule that does not wait for slow responses, and latency is measured
+    from when each operation was due rather than when it was sent so that
+    queueing behind slow responses is not hidden (coordinated omission).
+
+ Requirements:
+   Python3 with collections, concurrent.futures, random, threading and time modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import logging
+import collections
+import concurrent.futures
+import random
+import threading
+import time
+from b1ddi_demo import addressing
+from b1ddi_demo import metrics
+from b1ddi_demo import payloads
+from b1ddi_demo import profiles
+from b1ddi_demo import resolver
+from b1ddi_demo import teardown
+
+# Global Variables
+log = logging.getLogger(__name__)
+
+OBJPATHS = { 'address': '/ipam/address', 'record': '/dns/record' }
+OPERATIONS = [ 'create_address', 'create_record', 
+               'update_address', 'update_record',
+               'delete_address', 'delete_record' ]
+DEFAULT_MIX = ('create_record=40,create_address=20,update_record=15,'
+               'update_address=10,delete_record=10,delete_address=5')
+
+
+def parse_mix(text):
+    '''
+    Parse an operation mix, e.g. create_record=60,delete_record=40
+
+    Parameters:
+        text (str): Comma separated operation=weight pairs
+
+    Returns:
+        mix (dict): Operation weights
+    '''
+    mix = {}
+    for item in (text or DEFAULT_MIX).split(','):
+        if not item.strip():
+            continue
+        op, _, weight = item.partition('=')
+        op = op.strip()
+        if op not in OPERATIONS:
+            raise ValueError('Unknown soak operation: ' + op)
+        mix[op] = float(weight or 1)
+        if mix[op] < 0:
+            raise ValueError('Negative weight for ' + op)
+    if not sum(mix.values()):
+        raise ValueError('Soak mix has no operations')
+
+    return mix
+
+
+def parse_slo(text):
+    '''
+    Parse latency and error objectives, e.g. p99=0.5,p50=0.1,errors=0.01
+
+    Parameters:
+        text (str): Comma separated pNN=seconds and errors=fraction pairs
+
+    Returns:
+        slo (dict): Objectives
+    '''
+    slo = {}
+    for item in (text or '').split(','):
+        if not item.strip():
+            continue
+        key, _, value = item.partition('=')
+        key = key.strip()
+        if key != 'errors' and not (key[:1] == 'p' and 
+                                    0 < float(key[1:] or 0) <= 100):
+            raise ValueError('Unknown objective: ' + key)
+        slo[key] = float(value)
+
+    return slo
+
+
+def free_addresses(config):
+    '''
+    Generate the addresses in the demo subnets that the demo does not
+    use, between the reservations and the DHCP range
+
+    Parameters:
+        config (dict): Config dictionary
+
+    Yields:
+        str: IPv4 address
+    '''
+    if config['profile']:
+        subnets = ( (s.network, profiles.reservation_count(s) + 1) 
+                    for s in profiles.layout(config) )
+    else:
+        nets = min(int(config['no_of_networks']),
+                   addressing.subnet_count(config['base_net'], 
+                                           config['container_cidr'],
+                                           config['cidr']))
+        subnets = ( (n, addressing.reservation_count(n, config['no_of_ips']))
+                    for n in addressing.iter_subnets(config['base_net'],
+                                                     config['container_cidr'],
+                                                     config['cidr'], 0, nets) )
+    for network, reserved in subnets:
+        first = int(network.network_address) + reserved + 1
+        last = addressing.ip_to_int(addressing.range_bounds(network)[0])
+        for n in range(first, last):
+            yield addressing.int_to_ip(n)
+
+
+class Soak:
+    '''
+    Open-loop load generator for a demo
+    '''
+
+    def __init__(self, b1ddi, config, rate=10.0, duration=60.0, mix=None,
+                 workers=16, poisson=False, seed=None):
+        '''
+        Parameters:
+            b1ddi (obj): bloxone.b1ddi object
+            config (dict): Config dictionary
+            rate (float): Operations per second
+            duration (float): Seconds to run for
+            mix (dict): Operation weights, as parse_mix()
+            workers (int): Maximum operations in flight
+            poisson (bool): Randomise the gaps between operations
+            seed (int): Random seed for the operation sequence
+        '''
+        self.b1ddi = b1ddi
+        self.config = config
+        self.rate = float(rate)
+        self.duration = float(duration)
+        self.mix = mix or parse_mix(DEFAULT_MIX)
+        self.workers = max(1, int(workers))
+        self.poisson = poisson
+        self.random = random.Random(seed)
+        self.builder = payloads.get_builder(config)
+        self.run_id = '%x' % int(time.time())
+        self.space = ''
+        self.zone = ''
+        self.network = None
+        self.addresses = free_addresses(config)
+        self.freed = collections.deque()
+        self.created = { kind: [] for kind in OBJPATHS }
+        self.sequence = 0
+        self.lock = threading.Lock()
+        # Results
+        self.latency = collections.defaultdict(metrics.Histogram)
+        self.service = collections.defaultdict(metrics.Histogram)
+        self.counts = collections.defaultdict(collections.Counter)
+        self.max_lag = 0.0
+        self.elapsed = 0.0
+
+        return
+
+
+    def prepare(self):
+        '''
+        Find the IP space, zone and first subnet of the demo
+
+        Returns:
+            bool: True if the demo exists
+        '''
+        self.space = resolver.resolve(self.b1ddi, '/ipam/ip_space', 
+                                      name=self.config['ip_space'])
+        view = resolver.resolve(self.b1ddi, '/dns/view', 
+                                name=self.config['dns_view'])
+        if view:
+            self.zone = resolver.resolve(self.b1ddi, '/dns/auth_zone', 
+                                         fqdn=self.config['dns_domain'],
+                                         view=view)
+        if not self.space or not self.zone:
+            log.error("Demo IP space %s or zone %s not found, "
+                      "create the demo before a soak", 
+                      self.config['ip_space'], self.config['dns_domain'])
+            return False
+        if self.config['profile']:
+            self.network = next(profiles.layout(self.config)).network
+        else:
+            self.network = next(addressing.iter_subnets(
+                self.config['base_net'], self.config['container_cidr'],
+                self.config['cidr'], 0, 1))
+
+        return True
+
+
+    def choose(self, op):
+        '''
+        Substitute an operation that can be carried out, an update or 
+        delete needs a created object and an address create a free address
+
+        Parameters:
+            op (str): Requested operation
+
+        Returns:
+            (op, kind, item) tuple, item is checked out to the caller
+        '''
+        action, kind = op.split('_', 1)
+        with self.lock:
+            objects = self.created[kind]
+            if action != 'create' and not objects:
+                action = 'create'
+            if action == 'create':
+                self.sequence += 1
+                if kind == 'address':
+                    item = self.freed.popleft() if self.freed else \
+                           next(self.addresses, None)
+                    if item is None and objects:
+                        action = 'delete'
+                else:
+                    item = self.sequence
+            if action != 'create':
+                # Check out a random object so no other operation uses it
+                index = self.random.randrange(len(objects))
+                objects[index], objects[-1] = objects[-1], objects[index]
+                item = objects.pop()
+
+        return action + '_' + kind, kind, item
+
+
+    def execute(self, op):
+        '''
+        Carry out one operation
+
+        Parameters:
+            op (str): Operation from the mix
+
+        Returns:
+            (op, ok) tuple, op is the operation carried out
+        '''
+        op, kind, item = self.choose(op)
+        objpath = OBJPATHS[kind]
+        if item is None:
+            log.debug("No free address for %s", op)
+            return op, False
+        if op == 'create_address':
+            label = item
+        elif op == 'create_record':
+            label = 'soak-{}-{}'.format(self.run_id, item)
+        else:
+            id, label = item
+        response = None
+        try:
+            if op == 'create_address':
+                response = self.b1ddi.create(objpath, 
+                    self.builder.address(item, self.space))
+            elif op == 'create_record':
+                address = addressing.host_address(self.network, 
+                              2 + item % (self.network.num_addresses - 3))
+                response = self.b1ddi.create(objpath, 
+                    self.builder.a_record(label, self.zone, address))
+            elif op.startswith('update'):
+                response = self.b1ddi.replace(objpath, 
+                    id=id.rsplit('/', 1)[-1],
+                    body='{"comment": "Soak update %s"}' % time.time())
+            else:
+                response = self.b1ddi.delete(objpath, 
+                                             id=id.rsplit('/', 1)[-1])
+        finally:
+            # Return the checked out item even if the request raised
+            self.check_in(op, kind, item, label, response)
+
+        ok = response.status_code in self.b1ddi.return_codes_ok
+        if not ok:
+            log.debug("%s %s failed: %s %s", op, label, 
+                      response.status_code, response.text)
+
+        return op, ok
+
+
+    def check_in(self, op, kind, item, label, response):
+        '''
+        Return an item checked out by choose(), or add the object 
+        created, for use by later operations
+
+        Parameters:
+            op (str): Operation carried out
+            kind (str): Object kind, 'address' or 'record'
+            item: Item returned by choose()
+            label (str): Description of the object
+            response (obj): requests response object, None if the 
+                            request raised
+        '''
+        status = response.status_code if response is not None else None
+        ok = status in self.b1ddi.return_codes_ok
+        with self.lock:
+            if op.startswith('create'):
+                if ok:
+                    id = response.json()['result']['id']
+                    self.created[kind].append((id, label))
+                elif kind == 'address':
+                    self.freed.append(item)
+            elif status == 404:
+                # Already gone, forget it
+                if kind == 'address':
+                    self.freed.append(label)
+            elif op.startswith('update') or not ok:
+                self.created[kind].append(item)
+            elif kind == 'address':
+                self.freed.append(label)
+
+        return
+
+
+    def run(self):
+        '''
+        Issue operations to schedule for the duration. Each operation's
+        latency is measured from the time it was due, so that operations
+        delayed waiting for a free worker include the wait.
+
+        Returns:
+            summary (dict): As summary()
+        '''
+        ops = list(self.mix)
+        weights = [ self.mix[op] for op in ops ]
+        slots = threading.BoundedSemaphore(self.workers)
+
+        def timed(op, due):
+            begin = time.monotonic()
+            try:
+                op, ok = self.execute(op)
+            except Exception as err:
+                log.debug("%s failed: %s", op, err)
+                ok = False
+            finally:
+                slots.release()
+            done = time.monotonic()
+            self.record(op, done - due, done - begin, ok)
+            return
+
+        log.info("Soak at %0.1f ops/s for %0.0fs, %s workers", 
+                 self.rate, self.duration, self.workers)
+        start = time.monotonic()
+        end = start + self.duration
+        due = start
+        count = 0
+        with concurrent.futures.ThreadPoolExecutor(self.workers) as pool:
+            while due < end:
+                delay = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                slots.acquire()
+                self.max_lag = max(self.max_lag, time.monotonic() - due)
+                op = self.random.choices(ops, weights)[0]
+                pool.submit(timed, op, due)
+                count += 1
+                if self.poisson:
+                    due += self.random.expovariate(self.rate)
+                else:
+                    due = start + count / self.rate
+        self.elapsed = time.monotonic() - start
+
+        return self.summary()
+
+
+    def record(self, op, latency, service, ok):
+        '''
+        Parameters:
+            op (str): Operation carried out
+            latency (float): Seconds from when the operation was due
+            service (float): Seconds from when the operation was sent
+            ok (bool): Succeeded
+        '''
+        with self.lock:
+            for key in [ op, 'all' ]:
+                self.latency[key].record(latency)
+                self.service[key].record(service)
+                self.counts[key]['ok' if ok else 'failed'] += 1
+        if hasattr(self.b1ddi, 'metrics'):
+            self.b1ddi.metrics.operation('soak ' + op, latency, ok)
+
+        return
+
+
+    def summary(self):
+        '''
+        Returns:
+            summary (dict): Rates and, for each operation and 'all', 
+                            counts, latency and service time
+        '''
+        total = self.counts['all']
+        elapsed = self.elapsed or 1.0
+        operations = {}
+        with self.lock:
+            for op in sorted(self.latency):
+                operations[op] = { 'ok': self.counts[op]['ok'],
+                                   'failed': self.counts[op]['failed'],
+                                   'latency': self.latency[op].to_dict(),
+                                   'service': self.service[op].to_dict() }
+
+        return { 'target_rate': self.rate,
+                 'achieved_rate': sum(total.values()) / elapsed,
+                 'duration': self.elapsed,
+                 'max_lag': self.max_lag,
+                 'operations': operations }
+
+
+    def breaches(self, slo):
+        '''
+        Check the results against objectives
+
+        Parameters:
+            slo (dict): Objectives, as parse_slo()
+
+        Returns:
+            list: Description of each objective missed
+        '''
+        missed = []
+        latency = self.latency['all']
+        total = sum(self.counts['all'].values())
+        for key, target in sorted(slo.items()):
+            if key == 'errors':
+                value = self.counts['all']['failed'] / total if total else 0.0
+            else:
+                value = latency.percentile(float(key[1:]))
+            if value > target:
+                missed.append('{} {:0.4f} > {}'.format(key, value, target))
+
+        return missed
+
+
+    def clean_up(self):
+        '''
+        Delete the objects created by the soak that remain
+
+        Returns:
+            counts (dict): Number of objects 'deleted' and 'failed'
+        '''
+        objects = [ (OBJPATHS[kind], id, label) 
+                    for kind in [ 'record', 'address' ]
+                    for id, label in self.created[kind] ]
+        counts = teardown.delete_many(self.b1ddi, objects, 
+                                      workers=self.workers)
+        for kind in self.created:
+            self.created[kind] = []
+
+        return counts
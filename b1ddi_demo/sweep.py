@@ -0,0 +1,283 @@
+'''
+
+ Description:
+
+    Paginated discovery of objects and a tag based sweep that removes
+    all demo objects (for example orphans of interrupted runs) one page at
+    a time so memory use is constant however many objects exist
+
+ Requirements:
+   Python3 with logging and time modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import logging
+import time
+from b1ddi_demo import logs
+from b1ddi_demo import responses
+from b1ddi_demo import scheduler
+from b1ddi_demo import teardown
+
+# Global Variables
+log = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+
+# Field used to describe each object type in log messages
+LABEL_KEYS = { '/ipam/ip_space': 'name',
+               '/ipam/address_block': 'address',
+               '/ipam/subnet': 'address',
+               '/ipam/range': 'start',
+               '/ipam/address': 'address',
+               '/dns/view': 'name',
+               '/dns/auth_zone': 'fqdn',
+               '/dns/record': 'name_in_zone' }
+
+# Deletion order for each branch. Parents are removed first where the
+# API cascades the delete, leaving only orphans for the later types.
+# DNS Views can only be removed once their zones have gone.
+IPAM_ORDER = [ '/ipam/ip_space', '/ipam/address_block', '/ipam/subnet',
+               '/ipam/range', '/ipam/address' ]
+DNS_ORDER = [ '/dns/auth_zone', '/dns/record', '/dns/view' ]
+# Types whose deletes must complete before the next type is drained
+WAIT_FOR = [ '/dns/auth_zone' ]
+
+
+def tag_filter(usage='AUTOMATION DEMO', **tags):
+    '''
+    Build a _tfilter string for the demo tags
+
+    Parameters:
+        usage (str): Value of the Usage tag
+        **tags: Additional tag key/value pairs, e.g. Owner="user"
+
+    Returns:
+        tfilter (str): Tag filter string
+    '''
+    tags = dict(tags, Usage=usage)
+    terms = [ '(' + k + '=="' + v + '")' for k, v in sorted(tags.items()) if v ]
+
+    return 'and'.join(terms)
+
+
+def iter_objects(b1ddi, objpath, page_size=PAGE_SIZE, **params):
+    '''
+    Iterate over all objects of a type, requesting one page at a time
+    using _offset and _limit. Each page is streamed, objects are yielded
+    as they are received.
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        objpath (str): Swagger object path
+        page_size (int): Number of objects per request
+        **params: Additional query parameters e.g. _filter, _fields
+
+    Yields:
+        obj (dict): Each object
+    '''
+    offset = 0
+    while True:
+        response, results = responses.get_results(b1ddi, objpath, 
+                                                  _offset=str(offset), 
+                                                  _limit=str(page_size), 
+                                                  **params)
+        if response.status_code not in b1ddi.return_codes_ok:
+            log.warning("--- Unable to retrieve %s at offset %s",
+                        objpath, offset)
+            log.debug("Return code: %s", response.status_code)
+            log.debug("Return body: %s", response.text)
+            break
+        count = 0
+        for obj in results:
+            count += 1
+            yield obj
+        if count < page_size:
+            break
+        offset += count
+
+    return
+
+
+def iter_tagged(b1ddi, objpaths, tfilter, page_size=PAGE_SIZE):
+    '''
+    Stream every tagged object of the given types in a form that can be
+    passed directly to teardown.delete_many()
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        objpaths (list): Swagger object paths
+        tfilter (str): Tag filter
+        page_size (int): Number of objects per request
+
+    Yields:
+        (objpath, id, label) tuples
+    '''
+    for objpath in objpaths:
+        key = LABEL_KEYS.get(objpath, 'id')
+        for obj in iter_objects(b1ddi, objpath, page_size=page_size,
+                                _tfilter=tfilter, _fields='id,' + key):
+            yield objpath, obj['id'], objpath + ' ' + str(obj.get(key))
+
+    return
+
+
+def none_left(b1ddi, objpath, **params):
+    '''
+    Check whether all matching objects have gone
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        objpath (str): Swagger object path
+        **params: Query parameters selecting the objects
+
+    Returns:
+        bool: True if no matching objects were returned
+    '''
+    # An error response says nothing about the objects, keep waiting
+    response = b1ddi.get(objpath, _fields='id', _limit='1', **params)
+    if response.status_code not in b1ddi.return_codes_ok:
+        log.debug("%s check failed, return code: %s",
+                  objpath, response.status_code)
+        return False
+
+    return not response.json().get('results')
+
+
+def drain(b1ddi, objpath, workers=8, page_size=PAGE_SIZE, **params):
+    '''
+    Delete all matching objects of a type. Each page is deleted before the
+    next is requested; as deleted objects drop out of the results the
+    next page is requested from an offset equal to the number of objects
+    that could not be deleted.
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        objpath (str): Swagger object path
+        workers (int): Number of concurrent deletes
+        page_size (int): Number of objects per request
+        **params: Query parameters selecting the objects, _filter 
+                  and/or _tfilter
+
+    Returns:
+        counts (dict): Number of objects 'deleted' and 'failed'
+    '''
+    counts = { 'deleted': 0, 'failed': 0 }
+    key = LABEL_KEYS.get(objpath, 'id')
+    previous = set()
+
+    while True:
+        response, results = responses.get_results(b1ddi, objpath, 
+                                _fields='id,' + key,
+                                _offset=str(counts['failed']), 
+                                _limit=str(page_size), **params)
+        if response.status_code not in b1ddi.return_codes_ok:
+            log.warning("--- Unable to retrieve %s", objpath)
+            log.debug("Return code: %s", response.status_code)
+            counts['failed'] += 1
+            break
+        # Only the id and label of each object are kept
+        page = [ (obj['id'], objpath + ' ' + str(obj.get(key))) 
+                 for obj in results ]
+        if not page:
+            break
+
+        ids = set(id for id, label in page)
+        if ids <= previous:
+            # Deletes not yet complete on the server
+            if not teardown.wait_for(lambda: not ids & set(
+                    obj['id'] for obj in responses.get_results(b1ddi, 
+                        objpath, _fields='id', _offset=str(counts['failed']),
+                        _limit=str(page_size), **params)[1])):
+                log.warning("--- Deleted %s objects still present", objpath)
+                break
+            continue
+        previous = ids
+
+        result = teardown.delete_many(b1ddi, 
+            ( (objpath, id, label) for id, label in page if id ), 
+            workers=workers)
+        counts['deleted'] += result['deleted']
+        counts['failed'] += result['failed']
+        log.info("~~~~ %s: %s deleted, %s failed ~~~~",
+                 objpath, counts['deleted'], counts['failed'])
+
+    return counts
+
+
+def sweep(b1ddi, tfilter, workers=8, page_size=PAGE_SIZE):
+    '''
+    Remove all tagged demo objects, the IPAM and DNS branches are swept
+    concurrently
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        tfilter (str): Tag filter
+        workers (int): Number of concurrent deletes per branch
+        page_size (int): Number of objects per request
+
+    Returns:
+        counts (dict): Number of objects 'deleted' and 'failed'
+    '''
+    totals = { 'deleted': 0, 'failed': 0 }
+
+    def sweep_branch(objpaths):
+        counts = { 'deleted': 0, 'failed': 0 }
+        for objpath in objpaths:
+            result = drain(b1ddi, objpath, workers=workers, 
+                           page_size=page_size, _tfilter=tfilter)
+            for k in counts:
+                counts[k] += result[k]
+            # Zone deletion completes asynchronously, the view can only
+            # be removed once they have all gone
+            if objpath in WAIT_FOR and not teardown.wait_for(
+                    lambda: none_left(b1ddi, objpath, _tfilter=tfilter)):
+                log.warning("--- Tagged %s objects still present", objpath)
+        return counts
+
+    log.info("~~~~ Sweeping objects matching %s ~~~~", tfilter)
+    start = time.perf_counter()
+    tasks = scheduler.Scheduler(workers=2)
+    tasks.add('ipam', sweep_branch, IPAM_ORDER)
+    tasks.add('dns', sweep_branch, DNS_ORDER)
+    tasks.run()
+    for branch in ('ipam', 'dns'):
+        for k in totals:
+            totals[k] += (tasks.result(branch) or {}).get(k, 0)
+    log.log(logs.SUMMARY, "+++ Sweep deleted %s objects in %0.2fS, %s failed",
+            totals['deleted'], time.perf_counter() - start, totals['failed'])
+
+    return totals
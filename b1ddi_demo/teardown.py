@@ -0,0 +1,179 @@
+'''
+
+ Description:
+
+    Teardown engine: deletes independent objects concurrently and waits
+    for deletes that the API completes asynchronously
+
+ Requirements:
+   Python3 with concurrent.futures and time modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import logging
+import concurrent.futures
+import time
+
+# Global Variables
+log = logging.getLogger(__name__)
+
+POLL_INTERVAL = 1
+POLL_TIMEOUT = 60
+
+
+def wait_for(check, timeout=POLL_TIMEOUT, interval=POLL_INTERVAL):
+    '''
+    Poll until check() returns True or the timeout expires
+
+    Parameters:
+        check (callable): Function returning True when done
+        timeout (int): Maximum number of seconds to wait
+        interval (float): Initial seconds between polls, doubled on
+                          each poll up to 8 times the initial value
+
+    Returns:
+        bool: True if check() succeeded within the timeout
+    '''
+    deadline = time.monotonic() + timeout
+    delay = interval
+    while True:
+        if check():
+            return True
+        if time.monotonic() + delay > deadline:
+            return False
+        time.sleep(delay)
+        delay = min(delay * 2, interval * 8)
+
+
+def is_deleted(b1ddi, objpath, id):
+    '''
+    Check whether an object no longer exists
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        objpath (str): Swagger object path
+        id (str): Object id, with or without path
+
+    Returns:
+        bool: True if the object is not found
+    '''
+    response = b1ddi.get(objpath, id=id.rsplit('/', 1)[-1], _fields='id')
+
+    return response.status_code == 404
+
+
+def delete_object(b1ddi, objpath, id, label='', wait=False, 
+                  timeout=POLL_TIMEOUT):
+    '''
+    Delete an object, optionally waiting for the delete to complete
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        objpath (str): Swagger object path
+        id (str): Object id, with or without path
+        label (str): Description of object for logging
+        wait (bool): Poll until the object has gone
+        timeout (int): Maximum seconds to wait
+
+    Returns:
+        bool: True if successful
+    '''
+    status = False
+    label = label or id
+    id = id.rsplit('/', 1)[-1]
+    try:
+        response = b1ddi.delete(objpath, id=id)
+    except Exception as err:
+        log.warning("--- %s not deleted: %s", label, err)
+        return status
+
+    if response.status_code in b1ddi.return_codes_ok:
+        if wait and not wait_for(lambda: is_deleted(b1ddi, objpath, id),
+                                 timeout=timeout):
+            log.warning("--- %s still present after %ss", label, timeout)
+        else:
+            log.info("+++ %s deleted", label)
+            status = True
+    elif response.status_code == 404:
+        log.info("%s already deleted", label)
+        status = True
+    else:
+        log.warning("--- %s not deleted", label)
+        log.debug("Return code: %s", response.status_code)
+        log.debug("Return body: %s", response.text)
+
+    return status
+
+
+def delete_many(b1ddi, objects, workers=8, wait=False):
+    '''
+    Delete objects concurrently. Objects are consumed from the iterable
+    as workers become free so it may be a generator of any size.
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        objects (iter): Iterable of (objpath, id, label) tuples
+        workers (int): Number of concurrent deletes
+        wait (bool): Poll until each object has gone
+
+    Returns:
+        counts (dict): Number of objects 'deleted' and 'failed'
+    '''
+    counts = { 'deleted': 0, 'failed': 0 }
+    workers = max(1, int(workers))
+    pending = set()
+
+    def tally(done):
+        for future in done:
+            if future.result():
+                counts['deleted'] += 1
+            else:
+                counts['failed'] += 1
+        return
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        for objpath, id, label in objects:
+            if len(pending) >= workers * 2:
+                done, pending = concurrent.futures.wait(pending,
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                tally(done)
+            pending.add(executor.submit(delete_object, b1ddi, objpath, id, 
+                                        label=label, wait=wait))
+        done, pending = concurrent.futures.wait(pending)
+        tally(done)
+
+    return counts
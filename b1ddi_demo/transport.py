@@ -0,0 +1,195 @@
+'''
+
+ Description:
+
+    HTTP transport for the bloxone client using a shared session with a
+    sized connection pool so that connections, and their TLS sessions, are
+    kept alive and reused across requests and worker threads.
+    
+    Compression is requested only for GET responses, where list results
+    can be large; create and delete responses are small and are sent
+    uncompressed. Successful GET responses may be streamed, leaving the
+    body to be read by the caller.
+
+ Requirements:
+   Python3 with threading and requests modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import logging
+import threading
+
+# Global Variables
+log = logging.getLogger(__name__)
+
+POOL_SIZE = 10
+TIMEOUT = (10, 120)
+
+
+class Transport:
+    '''
+    Shared keep-alive session for API requests
+    '''
+
+    def __init__(self, pool_size=POOL_SIZE, compress=True, timeout=TIMEOUT):
+        '''
+        Parameters:
+            pool_size (int): Connections kept open per host
+            compress (bool): Request gzip for GET responses
+            timeout (tuple): Connect and read timeouts in seconds
+        '''
+        import requests
+        import requests.adapters
+
+        self.pool_size = max(1, int(pool_size))
+        self.compress = compress
+        self.timeout = timeout
+        self.adapter = requests.adapters.HTTPAdapter(
+            pool_connections=4, pool_maxsize=self.pool_size)
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        self.session.headers['Accept-Encoding'] = 'identity'
+        self.requests = 0
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+        return
+
+
+    def request(self, method, url, headers, body=None, stream=False):
+        '''
+        Make an API request
+
+        Parameters:
+            method (str): HTTP method
+            url (str): Request URL
+            headers (dict): Request headers
+            body (str): Request body
+            stream (bool): Leave the body of a successful response unread,
+                           the response is marked as streamed
+
+        Returns:
+            requests response object
+        '''
+        import requests
+
+        if self.compress and method == 'GET':
+            headers = dict(headers, **{'Accept-Encoding': 'gzip'})
+        try:
+            response = self.session.request(method, url, headers=headers,
+                                            data=body, timeout=self.timeout,
+                                            stream=stream)
+        except requests.exceptions.RequestException as err:
+            log.error(err)
+            log.debug("url: %s", url)
+            raise
+
+        # Error bodies are small and read by the retry and rate layers
+        response.streamed = stream and response.status_code < 300
+        with self.lock:
+            self.requests += 1
+            if not response.streamed:
+                self.bytes += len(response.content)
+
+        return response
+
+
+    def pool_stats(self):
+        '''
+        Connection pool statistics
+
+        Returns:
+            dict: requests made, connections opened, requests that reused
+                  an open connection, bytes received and pool size
+        '''
+        connections = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool:
+                connections += pool.num_connections
+        stats = { 'requests': self.requests,
+                  'connections': connections,
+                  'reused': max(0, self.requests - connections),
+                  'bytes': self.bytes,
+                  'pool_size': self.pool_size }
+
+        return stats
+
+
+    def close(self):
+        self.session.close()
+        return
+
+
+def install_transport(b1ddi, transport):
+    '''
+    Send the requests of a bloxone object through the transport. This
+    replaces the request methods so must be installed before any layers
+    that wrap them.
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        transport (obj): Transport
+
+    Returns:
+        transport (obj): Transport
+    '''
+    def _apiget(url, stream=False):
+        return transport.request('GET', url, b1ddi.headers, stream=stream)
+
+    def _apipost(url, body, headers=""):
+        return transport.request('POST', url, headers or b1ddi.headers, body)
+
+    def _apidelete(url, body=""):
+        return transport.request('DELETE', url, b1ddi.headers, body)
+
+    def _apiput(url, body):
+        return transport.request('PUT', url, b1ddi.headers, body)
+
+    def _apipatch(url, body):
+        return transport.request('PATCH', url, b1ddi.headers, body)
+
+    b1ddi._apiget = _apiget
+    b1ddi._apipost = _apipost
+    b1ddi._apidelete = _apidelete
+    b1ddi._apiput = _apiput
+    b1ddi._apipatch = _apipatch
+    b1ddi.transport = transport
+
+    return transport
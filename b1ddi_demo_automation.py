@@ -11,7 +11,7 @@
 
  Author: Chris Marrison
 
- Date Last Updated: 20210509
+ Date Last Updated: 20261017
 
  Todo:
 
@@ -49,18 +49,43 @@ __author_email__ = 'chris@infoblox.com'
 import logging
 import os
 import sys
-import json
-import bloxone
 import argparse
 import configparser
 import datetime
 import ipaddress
 import random
+import shutil
 import time
+from b1ddi_demo import scheduler
+from b1ddi_demo import records as records_engine
+from b1ddi_demo import resolver
+from b1ddi_demo import teardown
+from b1ddi_demo import sweep
+from b1ddi_demo import payloads
+from b1ddi_demo import addressing
+from b1ddi_demo import plan
+from b1ddi_demo import reconcile
+from b1ddi_demo import ratelimit
+from b1ddi_demo import retry
+from b1ddi_demo import transport
+from b1ddi_demo import metrics
+from b1ddi_demo import logs
+from b1ddi_demo import progress
+from b1ddi_demo import batch
+from b1ddi_demo import profiles
+from b1ddi_demo import export
+from b1ddi_demo import client
+from b1ddi_demo import responses
+from b1ddi_demo import soak
+from b1ddi_demo import inventory
+from b1ddi_demo import shards
+from b1ddi_demo import hedge
 
 
 # Global Variables
 log = logging.getLogger(__name__)
+# Log listener of a shard worker process, set up by init_shard()
+shard_listener = None
 # console_handler = logging.StreamHandler(sys.stdout)
 # log.addHandler(console_handler)
 
@@ -83,41 +108,144 @@ def parseargs():
                         help="Enable debug messages")
     parse.add_argument('-r', '--remove', action='store_true', 
                         help="Clean-up demo data")
+    parse.add_argument('-s', '--sweep', action='store_true', 
+                        help="Clean-up all demo data tagged with owner")
+    parse.add_argument('-n', '--dry-run', action='store_true', 
+                        help="Compile plan and report, no API calls")
+    parse.add_argument('-p', '--plan', action='store_true', 
+                        help="Create demo data from compiled plan")
+    parse.add_argument('--plan-cache', type=str, default='',
+                        help="Directory for compiled plans")
+    parse.add_argument('--reconcile', action='store_true', 
+                        help="Create or remove only what has changed")
+    parse.add_argument('-w', '--workers', type=int, default=0,
+                        help="Number of concurrent API workers")
+    parse.add_argument('--record-window', type=int, default=0,
+                        help="Maximum DNS record creates in flight")
+    parse.add_argument('--rate', type=float, default=None,
+                        help="Initial API requests per second, 0 disables")
+    parse.add_argument('--max-rate', type=float, default=None,
+                        help="Maximum API requests per second")
+    parse.add_argument('--retries', type=int, default=None,
+                        help="Maximum attempts for failed API requests, "
+                             "0 disables retries")
+    parse.add_argument('--pool-size', type=int, default=0,
+                        help="Number of HTTP connections kept open")
+    parse.add_argument('--metrics', type=str, default='',
+                        help="Write request metrics to file, - for stdout")
+    parse.add_argument('--metrics-format', type=str, default='',
+                        choices=['json', 'prometheus'],
+                        help="Metrics file format")
+    parse.add_argument('-v', '--verbosity', type=str, default='',
+                        choices=['info', 'summary'],
+                        help="Log each object or only totals per phase")
+    parse.add_argument('--log-format', type=str, default='',
+                        choices=['text', 'json'],
+                        help="Log as text or JSON lines")
+    parse.add_argument('--progress', action='store_true',
+                        help="Report progress, rate and ETA of each phase")
+    parse.add_argument('--profile', type=str, 
+                        choices=list(profiles.PROFILES),
+                        help="Generate data using a scale profile")
+    parse.add_argument('--seed', type=str,
+                        help="Seed for scale profile generation")
+    parse.add_argument('-e', '--export', type=str, metavar='DIR',
+                        help="Write demo data as bulk import files to DIR")
+    parse.add_argument('--export-format', type=str, default='csv',
+                        choices=['csv', 'json'],
+                        help="Bulk import file format")
+    parse.add_argument('--export-rows', type=int, default=0,
+                        help="Maximum objects per export file, 0 for no limit")
+    parse.add_argument('--upload-url', type=str, default='',
+                        help="Upload export files to this bulk import URL")
+    parse.add_argument('-b', '--batch', type=str, nargs='+', default=[],
+                        metavar='INI',
+                        help="Run the demos in these ini files concurrently")
+    parse.add_argument('--batch-workers', type=int, default=0,
+                        help="Demos run at once in batch mode, 0 for all")
+    parse.add_argument('--max-inflight', type=int, default=64,
+                        help="Batch requests in flight, 0 for no limit")
+    parse.add_argument('--tenant-inflight', type=int, default=16,
+                        help="Batch requests in flight per tenant")
+    parse.add_argument('--global-rate', type=float, default=0,
+                        help="Batch requests per second, 0 for no limit")
+    parse.add_argument('--hedge', action='store_true',
+                        help="Resend slow reads, using the first response")
+    parse.add_argument('--hedge-percentile', type=float, default=None,
+                        help="Latency percentile to resend reads after")
+    parse.add_argument('--hedge-budget', type=float, default=None,
+                        help="Maximum resent reads as a fraction of reads")
+    parse.add_argument('--shards', type=int, default=0,
+                        help="Worker processes to split the create across")
+    parse.add_argument('--soak', action='store_true',
+                        help="Run an open-loop load test against the demo")
+    parse.add_argument('--soak-rate', type=float, default=None,
+                        help="Soak operations per second")
+    parse.add_argument('--soak-duration', type=float, default=None,
+                        help="Soak duration in seconds")
+    parse.add_argument('--soak-mix', type=str, default='',
+                        help="Soak operation weights, e.g. create_record=60,"
+                             "delete_record=40")
+    parse.add_argument('--soak-slo', type=str, default='',
+                        help="Soak objectives, e.g. p99=0.5,errors=0.01")
+    parse.add_argument('--soak-workers', type=int, default=0,
+                        help="Maximum soak operations in flight")
+    parse.add_argument('--soak-poisson', action='store_true',
+                        help="Randomise the gaps between soak operations")
+    parse.add_argument('--soak-keep', action='store_true',
+                        help="Leave the objects created by the soak")
+    parse.add_argument('--inventory', type=str, default=None,
+                        help="SQLite inventory of created objects")
+    parse.add_argument('--inventory-report', action='store_true',
+                        help="Report the objects created by each run")
+    parse.add_argument('--run', type=str, default='',
+                        help="Limit --remove or the report to one run id")
+    parse.add_argument('--subnet', type=str, default='',
+                        help="Limit --remove to one subnet, e.g. 10.0.1.0/24")
+    parse.add_argument('--id-cache', type=str, default='',
+                        help="File to persist object ids between runs")
 
     return parse.parse_args()
 
 
-def setup_logging(debug=False, usefile=False):
+def setup_logging(debug=False, usefile=False, logfile='', verbosity='info',
+                  json_lines=False):
     '''
-     Set up logging
+     Set up logging, records are formatted and written by a background
+     thread
 
      Parameters:
-        advanced (bool): True or False.
+        debug (bool): Enable debug messages
+        usefile (bool): Use full log format
+        logfile (str): Also log to this file
+        verbosity (str): 'info', or 'summary' for per phase totals only
+        json_lines (bool): Log as JSON lines
 
      Returns:
-        None.
+        listener (obj): logs.QueueListener
 
     '''
-
-    # Set advanced level
-    # if level == "advanced":
-     #    logging.addLevelName(15, "advanced")
-      #   logging.basicConfig(level=advanced,
-       #                      format='%(asctime)s %(levelname)s: %(message)s')
     if debug:
-        logging.basicConfig(level=logging.DEBUG,
-                            format='%(asctime)s %(levelname)s: %(message)s')
+        level = logging.DEBUG
     else:
-        if usefile:
-            # Full log format
-            logging.basicConfig(level=logging.INFO,
-                                format='%(asctime)s %(levelname)s: %(message)s')
-        else:
-            # Simple log format
-            logging.basicConfig(level=logging.INFO,
-                                format='%(levelname)s: %(message)s')
+        level = logs.LEVELS.get(verbosity, logging.INFO)
 
-    return
+    if json_lines:
+        formatter = logs.JSONFormatter()
+    elif debug or usefile:
+        # Full log format
+        formatter = logging.Formatter('%(asctime)s %(levelname)s: %(message)s')
+    else:
+        # Simple log format
+        formatter = logging.Formatter('%(levelname)s: %(message)s')
+
+    handlers = [ logs.ConsoleHandler() ]
+    if logfile:
+        handlers.append(logging.FileHandler(logfile))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    return logs.start(handlers, level)
 
 
 def open_file(filename):
@@ -134,34 +262,36 @@ def open_file(filename):
         backup = filename+".bak"
         try:
             shutil.move(filename, backup)
-            log.info("Outfile exists moved to {}".format(backup))
+            log.info("Outfile exists moved to %s", backup)
             try:
                 handler = open(filename, mode='w')
-                log.info("Successfully opened output file {}.".format(filename))
+                log.info("Successfully opened output file %s.", filename)
             except IOError as err:
-                log.error("{}".format(err))
+                log.error("%s", err)
                 handler = False
         except:
-            logging.warning("Could not back up existing file {}, exiting.".format(filename))
+            logging.warning("Could not back up existing file %s, exiting.",
+                            filename)
             handler = False
     else:
         try:
             handler = open(filename, mode='w')
-            log.info("Opened file {} for invalid lines.".format(filename))
+            log.info("Opened file %s for invalid lines.", filename)
         except IOError as err:
-            log.error("{}".format(err))
+            log.error("%s", err)
             handler = False
 
     return handler
 
 
 
-def read_demo_ini(ini_filename):
+def read_demo_ini(ini_filename, section='B1DDI_Demo'):
     '''
     Open and parse ini file
 
     Parameters:
         ini_filename (str): name of inifile
+        section (str): demo section to read
 
     Returns:
         config (dict): Dictionary of BloxOne configuration elements
@@ -174,6 +304,21 @@ def read_demo_ini(ini_filename):
                 'tld', 'dns_view', 'dns_domain', 'nsg', 'no_of_records', 
                 'ip_space', 'base_net', 'no_of_networks', 'no_of_ips', 
                 'container_cidr', 'cidr', 'net_comments']
+    # Optional performance tuning keys and their defaults
+    opt_keys = { 'workers': '1', 'record_window': '1', 'id_cache': '',
+                 'plan_cache': '.b1ddi_plans', 'rate': '0', 'max_rate': '0',
+                 'rate_increase': '5', 'retries': '0', 
+                 'breaker_threshold': '10', 
+                 'breaker_reset': '30', 'pool_size': '0', 
+                 'compress': 'true', 'metrics': '', 'metrics_format': 'json',
+                 'verbosity': 'info', 'log_format': 'text', 
+                 'progress': 'false', 'profile': '', 'seed': '0',
+                 'soak_rate': '10', 'soak_duration': '60', 'soak_mix': '',
+                 'soak_slo': '', 'soak_workers': '16', 
+                 'soak_poisson': 'false', 
+                 'inventory': '', 'shards': '1',
+                 'hedge': 'false', 'hedge_percentile': '95', 
+                 'hedge_budget': '0.05', 'hedge_delay': '0.1' }
 
     # Attempt to read api_key from ini file
     try:
@@ -182,17 +327,22 @@ def read_demo_ini(ini_filename):
         logging.error(err)
 
     # Look for demo section
-    if 'B1DDI_Demo' in cfg:
+    if section in cfg:
         for key in ini_keys:
             # Check for key in BloxOne section
-            if key in cfg['B1DDI_Demo']:
-                config[key] = cfg['B1DDI_Demo'][key].strip("'\"")
-                logging.debug('Key {} found in {}: {}'.format(key, ini_filename, config[key]))
+            if key in cfg[section]:
+                config[key] = cfg[section][key].strip("'\"")
+                logging.debug("Key %s found in %s: %s",
+                              key, ini_filename, config[key])
             else:
-                logging.warning('Key {} not found in B1DDI_demo section.'.format(key))
+                logging.warning("Key %s not found in %s section.", 
+                                key, section)
                 config[key] = ''
+        for key, default in opt_keys.items():
+            config[key] = cfg[section].get(key, default).strip("'\"")
     else:
-        logging.warning('No B1DDI_demo Section in config file: {}'.format(ini_filename))
+        logging.warning("No %s Section in config file: %s",
+                        section, ini_filename)
 
     return config
 
@@ -208,30 +358,13 @@ def create_tag_body(config, **params):
     Returns:
         tags (str): JSON string to append to body
     '''
-    now = datetime.datetime.now()  
-    # datestamp = now.isoformat()
-    datestamp = now.strftime('%Y-%m-%dT%H:%MZ')
-    owner = config['owner']
-    location = config['location']
-
-    tags = {}
-    tags.update({"Owner": owner})
-    tags.update({"Location": location})
-    tags.update({"Usage": "AUTOMATION DEMO"})
-    tags.update({"Created": datestamp})
-
-
-    if params:
-        tags.update(**params)
-        tag_body = '"tags":' + json.dumps(tags) 
-    else:
-        tag_body = '"tags":' + json.dumps(tags) 
-    
-    log.debug("Tag body: {}".format(tag_body))
+    tag_body = payloads.tag_body(config, **params)
+    log.debug("Tag body: %s", tag_body)
 
     return tag_body
 
 
+@metrics.operation('ip_space')
 def ip_space(b1ddi, config):
     '''
     Create IP Space
@@ -248,25 +381,133 @@ def ip_space(b1ddi, config):
     # Check for existence
     if not b1ddi.get_id('/ipam/ip_space', key="name", value=config['ip_space']):
         log.info("---- Create IP Space ----")
-        tag_body = create_tag_body(config)
-        body = '{ "name": "' + config['ip_space'] + '",' + tag_body +' }'
-        log.debug("Body:{}".format(body))
+        body = payloads.get_builder(config).ip_space(config['ip_space'])
+        log.debug("Body:%s", body)
 
-        log.info("Creating IP_Space {}".format(config['ip_space']))
+        log.info("Creating IP_Space %s", config['ip_space'])
         response = b1ddi.create('/ipam/ip_space', body=body)
         if response.status_code in b1ddi.return_codes_ok:
-            log.info("IP_Space {} Created".format(config['ip_space']))
+            log.info("IP_Space %s Created", config['ip_space'])
             status = True
         else:
-            log.warning("IP Space {} not created".format(config['ip_space']))
-            log.debug("Return code: {}".format(response.status_code))
-            log.debug("Return body: {}".format(response.text))
+            log.warning("IP Space %s not created", config['ip_space'])
+            log.debug("Return code: %s", response.status_code)
+            log.debug("Return body: %s", response.text)
     else:
-        log.warning("IP Space {} already exists".format(config['ip_space']))
+        log.warning("IP Space %s already exists", config['ip_space'])
     
     return status
 
 
+@metrics.operation('address_block')
+def create_address_block(b1ddi, config, space):
+    '''
+    Create Address Block for the demo subnets
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        config (obj): ini config object
+        space (str): IP Space id including path
+    
+    Returns:
+        status (bool): True if successful
+    '''
+    status = False
+    base_net = config['base_net']
+    cidr = config['container_cidr']
+
+    body = payloads.get_builder(config).address_block(base_net, cidr, space)
+    log.debug("Body:%s", body)
+    log.info("~~~~ Creating Addresses block %s/%s~~~~ ", base_net, cidr)
+    response = b1ddi.create('/ipam/address_block', body=body)
+
+    if response.status_code in b1ddi.return_codes_ok:
+        log.info("+++ Address block %s/%s created", base_net, cidr)
+        status = True
+    else:
+        log.warning("--- Address Block %s/%s not created", base_net, cidr)
+        log.debug("Return code: %s", response.status_code)
+        log.debug("Return body: %s", response.text)
+
+    return status
+
+
+def demo_subnet_count(config):
+    '''
+    Determine the number of subnets to create within the address block
+
+    Parameters:
+        config (obj): ini config object
+    
+    Returns:
+        nets (int): Number of subnets
+    '''
+    nets = addressing.subnet_count(config['base_net'], 
+                                   config['container_cidr'], config['cidr'])
+    if nets < int(config['no_of_networks']):
+        log.warning("Address block only supports %s subnets", nets)
+    else:
+        nets = int(config['no_of_networks'])
+
+    return nets
+
+
+def demo_subnets(config, start=0, stop=None):
+    '''
+    Generate the subnets to create within the address block
+
+    Parameters:
+        config (obj): ini config object
+        start (int): Index of first subnet
+        stop (int): Index after last subnet, default demo_subnet_count()
+    
+    Yields:
+        network (obj): ipaddress.IPv4Network
+    '''
+    if stop is None:
+        stop = demo_subnet_count(config)
+
+    yield from addressing.iter_subnets(config['base_net'], 
+                                       config['container_cidr'],
+                                       config['cidr'], start, stop)
+
+
+@metrics.operation('subnet')
+def create_subnet(b1ddi, config, space, network):
+    '''
+    Create a single subnet with a random comment
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        config (obj): ini config object
+        space (str): IP Space id including path
+        network (obj): ipaddress.IPv4Network of subnet
+    
+    Returns:
+        status (bool): True if successful
+    '''
+    status = False
+    net_comments = config['net_comments'].split(',')
+    address = str(network.network_address)
+    cidr = config['cidr']
+
+    comment = net_comments[random.randrange(0,len(net_comments))]
+    body = payloads.get_builder(config).subnet(address, cidr, space, comment)
+    log.debug("Body:%s", body)
+    log.info("Creating Subnet %s/%s", address, cidr)
+    response = b1ddi.create('/ipam/subnet', body=body)
+
+    if response.status_code in b1ddi.return_codes_ok:
+        log.info("+++ Subnet %s/%s successfully created", address, cidr)
+        status = True
+    else:
+        log.warning("--- Subnet %s/%s not created", address, cidr)
+        log.debug("Return code: %s", response.status_code)
+        log.debug("Return body: %s", response.text)
+
+    return status
+
+
 def create_networks(b1ddi, config):
     '''
     Create Subnets
@@ -279,86 +520,41 @@ def create_networks(b1ddi, config):
         status (bool): True if successful
     '''
     status = False
-    net_comments = config['net_comments'].split(',')
 
     # Get id of ip_space
     log.info("---- Create Address Block and subnets ----")
     space = b1ddi.get_id('/ipam/ip_space', key="name", 
                         value=config['ip_space'], include_path=True)
     if space:
-        log.info("IP Space id found: {}".format(space))
-
-        tag_body = create_tag_body(config)
-        base_net = config['base_net']
-
-        # Create subnets
-        cidr = config['container_cidr']
-        body = ( '{ "address": "' + base_net + '", '
-                + '"cidr": "' + cidr + '", '
-                + '"space": "' + space + '", '
-                + '"comment": "Internal Address Allocation", '
-                + tag_body + ' }' )
-        log.debug("Body:{}".format(body))
-        log.info("~~~~ Creating Addresses block {}/{}~~~~ "
-                .format(base_net, cidr))
-        response = b1ddi.create('/ipam/address_block', body=body)
-
-        if response.status_code in b1ddi.return_codes_ok:
-            log.info("+++ Address block {}/{} created".format(base_net, cidr))
+        log.info("IP Space id found: %s", space)
 
+        if create_address_block(b1ddi, config, space):
             # Create subnets
-            network = ipaddress.ip_network(base_net + '/' + cidr)
-            # Reset cidr for subnets
-            cidr = config['cidr']
-            subnet_list = list(network.subnets(new_prefix=int(cidr)))
-            if len(subnet_list) < int(config['no_of_networks']):
-                nets = len(subnet_list)
-                log.warning("Address block only supports {} subnets".format(nets))
-            else:
-                nets = int(config['no_of_networks'])
-            log.info("~~~~ Creating {} subnets ~~~~".format(nets))
-            for n in range(nets):
-                address = str(subnet_list[n].network_address)
-                comment = net_comments[random.randrange(0,len(net_comments))]
-                body = ( '{ "address": "' + address + '", '
-                        + '"cidr": "' + cidr + '", '
-                        + '"space": "' + space + '", '
-                        + '"comment": "' + comment + '", '
-                        + tag_body + ' }' )
-                log.debug("Body:{}".format(body))
-                log.info("Creating Subnet {}/{}".format(address, cidr))
-                response = b1ddi.create('/ipam/subnet', body=body)
-
-                if response.status_code in b1ddi.return_codes_ok:
-                    log.info("+++ Subnet {}/{} successfully created".format(address, cidr))
-                    if populate_network(b1ddi, config, space, subnet_list[n]):
+            nets = demo_subnet_count(config)
+            log.info("~~~~ Creating %s subnets ~~~~", nets)
+            for network in demo_subnets(config, stop=nets):
+                if create_subnet(b1ddi, config, space, network):
+                    if populate_network(b1ddi, config, space, network):
                         log.info("+++ Network populated.")
                         status = True
                     else:
                         log.warning("--- Issues populating network")
-                else:
-                    log.warning("--- Subnet {}/{} not created".format(network, cidr))
-                    log.debug("Return code: {}".format(response.status_code))
-                    log.debug("Return body: {}".format(response.text))
-
-        else:
-            log.warning("--- Address Block {}/{} not created".format(base_net, cidr))
-            log.debug("Return code: {}".format(response.status_code))
-            log.debug("Return body: {}".format(response.text))
     else:
-        log.warning("IP Space {} does not exist".format(config['ip_space']))
+        log.warning("IP Space %s does not exist", config['ip_space'])
 
     return status
 
 
-def populate_network(b1ddi, config, space, network):
+@metrics.operation('range')
+def create_range(b1ddi, config, space, network):
     '''
-    Create DHCP Range and IPs
+    Create DHCP Range in the top half of the network
 
     Parameters:
         b1ddi (obj): bloxone.b1ddi object
         config (obj): ini config object
-        network (str): Network base address
+        space (str): IP Space id including path
+        network (obj): ipaddress.IPv4Network of subnet
     
     Returns:
         status (bool): True if successful
@@ -366,56 +562,81 @@ def populate_network(b1ddi, config, space, network):
     status = False
 
     log.info("~~~~ Creating Range ~~~~")
-    tag_body = create_tag_body(config)
 
-    net_size = network.num_addresses
-    range_size = int(net_size / 2)
-    broadcast = network.broadcast_address
-    start_ip = str(broadcast - (range_size + 1))
-    end_ip = str(broadcast - 1)
+    start_ip, end_ip = addressing.range_bounds(network)
 
-    body = ( '{ "start": "' + start_ip + '", "end": "' + end_ip +
-            '", "space": "' + space + '", '  + tag_body + ' }' )
-    log.debug("Body:{}".format(body))
+    body = payloads.get_builder(config).range(start_ip, end_ip, space)
+    log.debug("Body:%s", body)
 
-    log.info("Creating Range start: {}, end: {}".format(start_ip, end_ip))
+    log.info("Creating Range start: %s, end: %s", start_ip, end_ip)
     response = b1ddi.create('/ipam/range', body=body)
     if response.status_code in b1ddi.return_codes_ok:
-        log.info("+++ Range created in network {}".format(str(network)))
+        log.info("+++ Range created in network %s", network)
         status = True
     else:
-        log.warning("--- Range for network {} not created".format(str(network)))
-        log.debug("Return code: {}".format(response.status_code))
-        log.debug("Return body: {}".format(response.text))
-
-    # Add reservations
-
-    no_of_ips = int(range_size / 2)
-    # If number requested is lt than caluculated use configured
-    if int(config['no_of_ips']) < no_of_ips:
-        no_of_ips = int(config['no_of_ips'])
-    log.info("~~~~ Creating {} IPs ~~~~".format(no_of_ips))
-    ips = list(network.hosts())
-    for ip in range(1, no_of_ips):
-        address = str(ips[ip])
-        body = ( '{ "address": "' + address + '", "space": "' 
-                + space + '", '  + tag_body + ' }' )
-        log.debug("Body:{}".format(body))
-
-        log.info("Creating IP Reservation: {}".format(address))
+        log.warning("--- Range for network %s not created", network)
+        log.debug("Return code: %s", response.status_code)
+        log.debug("Return body: %s", response.text)
+
+    return status
+
+
+@metrics.operation('reservations')
+def create_reservations(b1ddi, config, space, network):
+    '''
+    Create IP reservations in the bottom of the network
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        config (obj): ini config object
+        space (str): IP Space id including path
+        network (obj): ipaddress.IPv4Network of subnet
+    
+    Returns:
+        status (bool): True if all reservations were successful
+    '''
+    status = True
+    builder = payloads.get_builder(config)
+
+    # Use the smaller of configured and a quarter of the network
+    no_of_ips = addressing.reservation_count(network, config['no_of_ips'])
+    log.info("~~~~ Creating %s IPs ~~~~", no_of_ips)
+    for address in addressing.reservation_addresses(network, no_of_ips):
+        body = builder.address(address, space)
+        log.debug("Body:%s", body)
+
+        log.info("Creating IP Reservation: %s", address)
         response = b1ddi.create('/ipam/address', body=body)
         if response.status_code in b1ddi.return_codes_ok:
-            log.info("+++ IP {} created".format(address))
-            status = True
+            log.info("+++ IP %s created", address)
         else:
-            log.warning("--- IP {} not created".format(address))
-            log.debug("Return code: {}".format(response.status_code))
-            log.debug("Return body: {}".format(response.text))
+            log.warning("--- IP %s not created", address)
+            log.debug("Return code: %s", response.status_code)
+            log.debug("Return body: %s", response.text)
             status = False
 
     return status
 
 
+def populate_network(b1ddi, config, space, network):
+    '''
+    Create DHCP Range and IPs
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        config (obj): ini config object
+        network (str): Network base address
+    
+    Returns:
+        status (bool): True if successful
+    '''
+    status = create_range(b1ddi, config, space, network)
+    if not create_reservations(b1ddi, config, space, network):
+        status = False
+
+    return status
+
+
 def populate_dns(b1ddi, config):
     '''
     Populate DNS View with zones/records
@@ -455,6 +676,92 @@ def create_hosts(b1ddi, config):
     return status
 
 
+def reverse_zone(config):
+    '''
+    Work out the reverse /16 zone for the base network
+
+    Parameters:
+        config (obj): ini config object
+    
+    Returns:
+        zone (str): Reverse zone fqdn
+    '''
+    return addressing.reverse_zone(addressing.ip_to_int(config['base_net']))
+
+
+def find_zones(b1ddi, config, view):
+    '''
+    Get the ids of the forward and reverse demo zones with a single query
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        config (obj): ini config object
+        view (str): DNS View id including path
+
+    Returns:
+        (zone_id, reverse_id) tuple, "" for a zone that is not found
+    '''
+    zones = [ config['dns_domain'], reverse_zone(config) ]
+    ids = resolver.resolve_many(b1ddi, '/dns/auth_zone', 'fqdn', zones, 
+                                view=view)
+
+    return ids.get(zones[0], ''), ids.get(zones[1], '')
+
+
+@metrics.operation('zone')
+def create_zone(b1ddi, config, view, nsg, zone):
+    '''
+    Create an authoritative DNS Zone
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        config (obj): ini config object
+        view (str): DNS View id including path
+        nsg (str): Name Server Group id including path
+        zone (str): Zone fqdn
+    
+    Returns:
+        status (bool): True if successful
+    '''
+    status = False
+    body = payloads.get_builder(config).zone(zone, view, nsg)
+    log.debug("Body:%s", body)
+
+    response = b1ddi.create('/dns/auth_zone', body)
+    if response.status_code in b1ddi.return_codes_ok:
+        log.info("+++ Zone %s created in view", zone)
+        status = True
+    else:
+        # Log error
+        log.warning("--- Zone %s in view %s not created",
+                    zone, config['dns_view'])
+        log.debug("Return code: %s", response.status_code)
+        log.debug("Return body: %s", response.text)
+
+    return status
+
+
+def find_nsg(b1ddi, config):
+    '''
+    Get the id of the Name Server Group used for the demo zones
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        config (obj): ini config object
+    
+    Returns:
+        nsg (str): NSG id including path or ""
+    '''
+    nsg = b1ddi.get_id('/dns/auth_nsg', 
+                        key="name", 
+                        value=config['nsg'],
+                        include_path=True)
+    if not nsg:
+        log.warning("NSG %s not found. Cannot create zones.", config['nsg'])
+
+    return nsg
+
+
 def create_zones(b1ddi, config):
     '''
     Create DNS Zones
@@ -473,51 +780,13 @@ def create_zones(b1ddi, config):
     view = b1ddi.get_id('/dns/view', key="name", 
                         value=config['dns_view'], include_path=True)
     if view:
-        log.info("DNS View id found: {}".format(view))
+        log.info("DNS View id found: %s", view)
         # Check for NSG
-        nsg = b1ddi.get_id('/dns/auth_nsg', 
-                            key="name", 
-                            value=config['nsg'],
-                            include_path=True)
+        nsg = find_nsg(b1ddi, config)
         if nsg:
-            # Prepare Body
-            tag_body = create_tag_body(config)
-            zone = config['dns_domain']
-            body = ( '{ "fqdn": "' + zone + '", "view": "' + view + '", ' 
-                    + '"nsgs": ["' + nsg + '"], '
-                    + '"primary_type": "cloud", '
-                    + tag_body + ' }' )
-            # Create zone
-            response = b1ddi.create('/dns/auth_zone', body)
-            if response.status_code in b1ddi.return_codes_ok:
-                log.info("+++ Zone {} created in view".format(zone))
-            else:
-                # Log error
-                log.warning("--- Zone {} in view {} not created"
-                            .format(zone, config['dns_view']))
-                log.debug("Return code: {}".format(response.status_code))
-                log.debug("Return body: {}".format(response.text))
-
-            # Work out reverse /16 for network  
-            r_network = bloxone.utils.reverse_labels(config['base_net'])
-            # Remove "last" two octets
-            r_network = bloxone.utils.get_domain(r_network, no_of_labels=2)
-            zone = r_network + '.in-addr.arpa.'
-            body = ( '{ "fqdn": "' + zone + '", "view": "' + view + '", ' 
-                    + '"nsgs": ["' + nsg + '"], '
-                    + '"primary_type": "cloud", '
-                    + tag_body + ' }' )
-
-            # Create reverse zone
-            response = b1ddi.create('/dns/auth_zone', body)
-            if response.status_code in b1ddi.return_codes_ok:
-                log.info("+++ Zone {} created in view".format(zone))
-            else:
-                # Log error
-                log.warning("--- Zone {} in view {} not created"
-                            .format(zone, config['dns_view']))
-                log.debug("Return code: {}".format(response.status_code))
-                log.debug("Return body: {}".format(response.text))
+            # Create forward and reverse zones
+            create_zone(b1ddi, config, view, nsg, config['dns_domain'])
+            create_zone(b1ddi, config, view, nsg, reverse_zone(config))
 
             # Add Records to zones
             if add_records(b1ddi, config):
@@ -527,13 +796,12 @@ def create_zones(b1ddi, config):
                 log.warning("--- Failed to add records")
                 status = False
         else:
-            log.warning("NSG {} not found. Cannot create zones."
-                        .format(config['nsg']))
             status = False
 
     return status
 
 
+@metrics.operation('dns_view')
 def create_dnsview(b1ddi, config):
     '''
     Create DNS Hosts
@@ -550,25 +818,50 @@ def create_dnsview(b1ddi, config):
     # Check for existence
     if not b1ddi.get_id('/dns/view', key="name", value=config['dns_view']):
         log.info("---- Create DNS View ----")
-        tag_body = create_tag_body(config)
-        body = '{ "name": "' + config['dns_view'] + '",' + tag_body +' }'
-        log.debug("Body:{}".format(body))
+        body = payloads.get_builder(config).dns_view(config['dns_view'])
+        log.debug("Body:%s", body)
 
-        log.info("Creating DNS View {}".format(config['dns_view']))
+        log.info("Creating DNS View %s", config['dns_view'])
         response = b1ddi.create('/dns/view', body=body)
         if response.status_code in b1ddi.return_codes_ok:
-            log.info("DNS View {} Created".format(config['dns_view']))
+            log.info("DNS View %s Created", config['dns_view'])
             status = True
         else:
-            log.warning("DNS View {} not created".format(config['dns_view']))
-            log.debug("Return code: {}".format(response.status_code))
-            log.debug("Return body: {}".format(response.text))
+            log.warning("DNS View %s not created", config['dns_view'])
+            log.debug("Return code: %s", response.status_code)
+            log.debug("Return body: %s", response.text)
     else:
-        log.warning("DNS View {} already exists".format(config['dns_view']))
+        log.warning("DNS View %s already exists", config['dns_view'])
    
     return status
 
 
+def record_bodies(config, zone_id, network, no_of_records, builder=None,
+                  start=0):
+    '''
+    Generate A record bodies for the zone, one at a time
+
+    Parameters:
+        config (obj): ini config object
+        zone_id (str): Zone id including path
+        network (obj): ipaddress.IPv4Network to take addresses from
+        no_of_records (int): number of records to generate
+        builder (obj): Optional payloads.PayloadBuilder
+        start (int): Number of records to skip, e.g. for a shard
+    
+    Yields:
+        (hostname, address, body) tuples
+    '''
+    if not builder:
+        builder = payloads.get_builder(config)
+
+    for n in range(start + 1, (no_of_records + 1)):
+        hostname = "host" + str(n)
+        address = addressing.host_address(network, n)
+        yield hostname, address, builder.a_record(hostname, zone_id, address)
+
+
+@metrics.operation('records')
 def add_records(b1ddi, config):
     '''
     Add records to zone
@@ -590,29 +883,13 @@ def add_records(b1ddi, config):
     view = b1ddi.get_id('/dns/view', key="name", 
                         value=config['dns_view'], include_path=True)
     if view:
-        filter = ( '(fqdn=="' + zone + '")and(view=="' + view + '")' )
-        # Get zone id
-        response  = b1ddi.get('/dns/auth_zone', 
-                                _filter=filter, 
-                                _fields="fqdn,id") 
-        if response.status_code in b1ddi.return_codes_ok:
-            if 'results' in response.json().keys():
-                zones = response.json()['results']
-                if len(zones) == 1:
-                    zone_id = zones[0]['id']
-                    log.debug("Zone ID: {} Found".format(zone_id))
-                else:
-                    log.warning("Too many results returned for zone {}"
-                                .format(zone))
-            else:
-                log.warning("No results returned for zone {}"
-                            .format(zone))
-                log.debug("Return code: {}".format(response.status_code))
-                log.debug("Return body: {}".format(response.text))
+        # Get zone ids
+        zone_id, reverse_id = find_zones(b1ddi, config, view)
+        if zone_id:
+            log.debug("Zone ID: %s Found, reverse zone ID: %s", 
+                      zone_id, reverse_id)
         else:
-            log.error("--- Request for zone {} failed".format(zone))
-            log.debug("Return code: {}".format(response.status_code))
-            log.debug("Return body: {}".format(response.text))
+            log.warning("No unique zone %s found in view", zone)
 
         # Create Records
         if zone_id:
@@ -625,48 +902,47 @@ def add_records(b1ddi, config):
             else:
                 no_of_records = int(config['no_of_records'])
 
-            tag_body = create_tag_body(config)
-
             # Generate records and add to zone
-            for n in range(1, (no_of_records + 1)):
-                hostname = "host" + str(n)
-                address = str(network.network_address + n)
-                body = ( '{"name_in_zone":"' + hostname + '",' +
-                         '"zone": "' + zone_id + '",' +
-                         '"type": "A", ' +
-                         '"rdata": {"address": "' + address + '"}, ' +
-                         '"options": {"create_ptr": true},' + 
-                         '"inheritance_sources": ' +
-                         '{"ttl": {"action": "inherit"}}, ' +
-                         tag_body + ' }' )
-                log.debug("Body: {}".format(body))         
-                response = b1ddi.create('/dns/record', body)
-                if response.status_code in b1ddi.return_codes_ok:
-                    log.info("Created record: {}.{} with IP {}"
-                             .format(hostname, zone, address))
-                    record_count += 1
-                else:
-                    log.warning("Failed to create record {}.{}"
-                                .format(hostname, zone))
-                    log.debug("Return code: {}".format(response.status_code))
-                    log.debug("Return body: {}".format(response.text))
+            records = record_bodies(config, zone_id, network, no_of_records)
+            if int(config['record_window']) > 1:
+                log.info("~~~~ Creating %s records, %s in flight ~~~~",
+                         no_of_records, config['record_window'])
+                items = ( ("record: {}.{} with IP {}"
+                           .format(hostname, zone, address), body)
+                          for hostname, address, body in records )
+                counts = records_engine.bulk_create(b1ddi, '/dns/record', 
+                            items, window=int(config['record_window']))
+                record_count = counts['created']
+                if counts['failed']:
+                    log.warning("--- %s DNS Records failed", counts['failed'])
+            else:
+                for hostname, address, body in records:
+                    log.debug("Body: %s", body)
+                    response = b1ddi.create('/dns/record', body)
+                    if response.status_code in b1ddi.return_codes_ok:
+                        log.info("Created record: %s.%s with IP %s",
+                                 hostname, zone, address)
+                        record_count += 1
+                    else:
+                        log.warning("Failed to create record %s.%s",
+                                    hostname, zone)
+                        log.debug("Return code: %s", response.status_code)
+                        log.debug("Return body: %s", response.text)
             if record_count == no_of_records:
-                log.info("+++ Successfully created {} DNS Records"
-                         .format(record_count))
+                log.log(logs.SUMMARY, 
+                        "+++ Successfully created %s DNS Records", record_count)
                 status = True
             else:
-                log.info("--- Only {} DNS Records created".format(record_count))
+                log.log(logs.SUMMARY, 
+                        "--- Only %s DNS Records created", record_count)
                 status = False
         else:
-            log.warning("--- Unable to add records to zone {} in view {}"
-                        .format(zone,view))
+            log.warning("--- Unable to add records to zone %s in view %s",
+                        zone, view)
             status = False
 
     else:
-        log.error("--- Request for id of view {} failed"
-                  .format(config['dns_view']))
-        log.debug("Return code: {}".format(response.status_code))
-        log.debug("Return body: {}".format(response.text))
+        log.error("--- Request for id of view %s failed", config['dns_view'])
 
     return status
 
@@ -685,14 +961,21 @@ def create_demo(b1ddi, config):
     '''
     exitcode = 0
 
+    if int(config['shards']) > 1:
+        return create_demo_sharded(b1ddi, config)
+    if config['profile']:
+        return create_demo_from_profile(b1ddi, config)
+    if int(config['workers']) > 1:
+        return create_demo_concurrent(b1ddi, config)
+
     # Create IP Space
     if ip_space(b1ddi, config):
         # Create network structure
         if create_networks(b1ddi, config):
-            log.info("+++ Successfully Populated IP Space")
+            log.log(logs.SUMMARY, "+++ Successfully Populated IP Space")
         else:
-            log.error("--- Failed to create networks in {}"
-                    .format(config['ip_space']))
+            log.error("--- Failed to create networks in %s",
+                      config['ip_space'])
             exitcode = 1
     else:
         exitcode = 1
@@ -700,10 +983,9 @@ def create_demo(b1ddi, config):
     # Create DNS View 
     if create_dnsview(b1ddi, config):
         if populate_dns(b1ddi, config):
-            log.info("+++ Successfully Populated DNS View")
+            log.log(logs.SUMMARY, "+++ Successfully Populated DNS View")
         else:
-            log.error("--- Failed to create zones in {}"
-                    .format(config['dns_view']))
+            log.error("--- Failed to create zones in %s", config['dns_view'])
             exitcode = 1
     else:
         exitcode = 1
@@ -711,6 +993,632 @@ def create_demo(b1ddi, config):
     return exitcode
 
 
+def create_demo_concurrent(b1ddi, config):
+    '''
+    Create the demo data, running independent steps concurrently
+
+    The IPAM and DNS branches, and the subnets within the address block,
+    do not depend on each other so are scheduled as a task graph:
+
+        ip_space -> address_block -> subnets -> ranges/reservations
+        dns_view -> zones -> records
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        config (obj): ini config object
+    
+    Returns:
+        exitcode (int): 0 if successful
+
+    '''
+    exitcode = 0
+    tasks = scheduler.Scheduler(workers=int(config['workers']))
+    space = scheduler.Result('space_id')
+    view = scheduler.Result('view_id')
+    nsg = scheduler.Result('nsg_id')
+
+    # IPAM branch
+    tasks.add('ip_space', ip_space, b1ddi, config)
+    tasks.add('space_id', b1ddi.get_id, '/ipam/ip_space', key="name",
+              value=config['ip_space'], include_path=True, 
+              requires=['ip_space'])
+    tasks.add('address_block', create_address_block, b1ddi, config, space,
+              requires=['space_id'])
+    nets = demo_subnet_count(config)
+    log.info("~~~~ Scheduling %s subnets ~~~~", nets)
+    for n, network in enumerate(demo_subnets(config, stop=nets)):
+        subnet = tasks.add('subnet_{}'.format(n), create_subnet, 
+                           b1ddi, config, space, network, 
+                           requires=['address_block'])
+        tasks.add('range_{}'.format(n), create_range, 
+                  b1ddi, config, space, network, requires=[subnet])
+        tasks.add('reservations_{}'.format(n), create_reservations,
+                  b1ddi, config, space, network, requires=[subnet])
+
+    # DNS branch
+    tasks.add('dns_view', create_dnsview, b1ddi, config)
+    tasks.add('view_id', b1ddi.get_id, '/dns/view', key="name",
+              value=config['dns_view'], include_path=True,
+              requires=['dns_view'])
+    tasks.add('nsg_id', find_nsg, b1ddi, config)
+    tasks.add('forward_zone', create_zone, b1ddi, config, view, nsg,
+              config['dns_domain'], requires=['view_id', 'nsg_id'])
+    tasks.add('reverse_zone', create_zone, b1ddi, config, view, nsg,
+              reverse_zone(config), requires=['view_id', 'nsg_id'])
+    tasks.add('records', add_records, b1ddi, config, 
+              requires=['forward_zone'], after=['reverse_zone'])
+
+    log.info("~~~~ Running %s tasks with %s workers ~~~~",
+             len(tasks.tasks), tasks.workers)
+    summary = tasks.run()
+    log.log(logs.SUMMARY, 
+            "+++ %s tasks completed successfully", len(summary['ok']))
+    if summary['failed'] or summary['skipped']:
+        log.error("--- %s tasks failed, %s skipped",
+                  len(summary['failed']), len(summary['skipped']))
+        log.debug("Failed tasks: %s", summary['failed'])
+        exitcode = 1
+
+    return exitcode
+
+
+def plan_demo(config, subnets=None, hosts=None, shared=True):
+    '''
+    Compile the demo into plan entries describing the same objects as
+    create_demo(), see b1ddi_demo.plan for the format. A shard of the 
+    demo is compiled by giving ranges of subnets and records, only the
+    entries in those ranges are generated.
+
+    Parameters:
+        config (obj): ini config object
+        subnets (tuple): (start, stop) subnet indexes, default all
+        hosts (tuple): (start, stop) record indexes, default all
+        shared (bool): Include the IP Space, address block, DNS View 
+                       and zones
+    
+    Yields:
+        entry (dict): Plan entries
+    '''
+    # Created tag is set when the plan is executed
+    builder = payloads.PayloadBuilder(config, Created=plan.NOW)
+    if config['profile']:
+        yield from profiles.entries(config, builder=builder, 
+                                    subnets=subnets, shared=shared)
+        return
+    # Seed comment selection so a config always compiles to the same plan
+    rng = random.Random(plan.config_hash(config))
+    net_comments = config['net_comments'].split(',')
+    space = plan.ref('space')
+    cidr = config['cidr']
+    first, last = subnets or (0, demo_subnet_count(config))
+    # Skip the comments of earlier subnets so a shard compiles the same
+    # entries as the whole plan
+    for n in range(first):
+        rng.randrange(0,len(net_comments))
+
+    # IPAM
+    if shared:
+        yield { 'op': 'create', 'objpath': '/ipam/ip_space', 'ref': 'space',
+                'label': "IP_Space {}".format(config['ip_space']),
+                'body': builder.ip_space(config['ip_space']) }
+        yield { 'op': 'create', 'objpath': '/ipam/address_block', 
+                'ref': 'block',
+                'label': "Address block {}/{}".format(config['base_net'],
+                                                      config['container_cidr']),
+                'body': builder.address_block(config['base_net'], 
+                                              config['container_cidr'], 
+                                              space) }
+    for network in demo_subnets(config, first, last):
+        address = str(network.network_address)
+        comment = net_comments[rng.randrange(0,len(net_comments))]
+        yield { 'op': 'create', 'objpath': '/ipam/subnet', 
+                'requires': [ 'block' ],
+                'label': "Subnet {}/{}".format(address, cidr),
+                'body': builder.subnet(address, cidr, space, comment) }
+    yield { 'op': 'barrier', 'objpath': '' }
+    for network in demo_subnets(config, first, last):
+        start_ip, end_ip = addressing.range_bounds(network)
+        yield { 'op': 'create', 'objpath': '/ipam/range', 
+                'requires': [ 'block' ],
+                'label': "Range {}-{}".format(start_ip, end_ip),
+                'body': builder.range(start_ip, end_ip, space) }
+        no_of_ips = addressing.reservation_count(network, config['no_of_ips'])
+        for address in addressing.reservation_addresses(network, no_of_ips):
+            yield { 'op': 'create', 'objpath': '/ipam/address', 
+                    'requires': [ 'block' ],
+                    'label': "IP {}".format(address),
+                    'body': builder.address(address, space) }
+
+    # DNS
+    view = plan.ref('view')
+    nsg = plan.ref('nsg')
+    if shared:
+        yield { 'op': 'create', 'objpath': '/dns/view', 'ref': 'view',
+                'label': "DNS View {}".format(config['dns_view']),
+                'body': builder.dns_view(config['dns_view']) }
+        yield { 'op': 'lookup', 'objpath': '/dns/auth_nsg', 'ref': 'nsg',
+                'label': "NSG {}".format(config['nsg']),
+                'key': 'name', 'value': config['nsg'] }
+        yield { 'op': 'create', 'objpath': '/dns/auth_zone', 'ref': 'zone',
+                'label': "Zone {}".format(config['dns_domain']),
+                'body': builder.zone(config['dns_domain'], view, nsg) }
+        yield { 'op': 'create', 'objpath': '/dns/auth_zone', 
+                'ref': 'reverse_zone',
+                'label': "Zone {}".format(reverse_zone(config)),
+                'body': builder.zone(reverse_zone(config), view, nsg) }
+    network = ipaddress.ip_network(config['base_net'] + '/' + config['cidr'])
+    no_of_records = min(int(config['no_of_records']), 
+                        network.num_addresses - 2)
+    first, last = hosts or (0, no_of_records)
+    for hostname, address, body in record_bodies(config, plan.ref('zone'), 
+                                                 network, last,
+                                                 builder=builder,
+                                                 start=first):
+        yield { 'op': 'create', 'objpath': '/dns/record',
+                'label': "record: {}.{} with IP {}"
+                         .format(hostname, config['dns_domain'], address),
+                'body': body }
+
+
+def dry_run(config):
+    '''
+    Compile (or reuse the cached) plan and report what would be created,
+    no API calls are made
+
+    Parameters:
+        config (obj): ini config object
+    
+    Returns:
+        exitcode (int): 0 if successful
+    '''
+    path = plan.cached_plan(plan_demo, config, config['plan_cache'], 
+                            version=__version__)
+    counts = plan.summarise(plan.read_plan(path))
+    for key, count in sorted(counts.items()):
+        log.info("%10s  %s", count, key)
+    log.log(logs.SUMMARY, "Total of %s API calls planned, see %s",
+            sum(counts.values()), path)
+
+    return 0
+
+
+def export_demo(config, directory, format='csv', rows_per_file=0,
+                upload_url='', b1inifile=''):
+    '''
+    Write the demo data as bulk import files, and optionally upload them,
+    rather than creating each object with an API call
+
+    Parameters:
+        config (obj): ini config object
+        directory (str): Output directory
+        format (str): csv or json
+        rows_per_file (int): Maximum objects per file, 0 for no limit
+        upload_url (str): Bulk import URL, files are not uploaded if ''
+        b1inifile (str): bloxone ini file used for the upload
+
+    Returns:
+        exitcode (int): 0 if successful
+    '''
+    exitcode = 0
+    start_timer = time.perf_counter()
+    files = export.export(plan_demo(config), directory, format=format,
+                          rows_per_file=rows_per_file, 
+                          now=payloads.datestamp())
+    end_timer = time.perf_counter() - start_timer
+    for objpath, filename, rows in files:
+        log.info("%10s  %s", rows, filename)
+    log.log(logs.SUMMARY, "Exported %s objects to %s files in %0.2fS",
+            sum([ f[2] for f in files ]), len(files), end_timer)
+
+    if upload_url:
+        b1ddi = client.connect(b1inifile)
+        setup_client(b1ddi, config)
+        log.log(logs.SUMMARY, "------ Uploading Export Files ------")
+        uploaded = export.upload(b1ddi, files, upload_url, format=format)
+        log.log(logs.SUMMARY, "+++ %s of %s files uploaded", 
+                uploaded, len(files))
+        if uploaded < len(files):
+            exitcode = 1
+
+    return exitcode
+
+
+def soak_demo(b1ddi, config, keep=False):
+    '''
+    Run an open-loop load test of address and record operations against
+    an existing demo and report latency against the objectives
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        config (obj): ini config object
+        keep (bool): Leave the objects created by the soak
+
+    Returns:
+        exitcode (int): 0 if all operations succeeded within objectives
+    '''
+    exitcode = 0
+    try:
+        mix = soak.parse_mix(config['soak_mix'])
+        slo = soak.parse_slo(config['soak_slo'])
+    except ValueError as err:
+        log.error("%s", err)
+        return 3
+    rate = float(config['soak_rate'])
+    if float(config['rate']) and float(config['rate']) < rate:
+        log.warning("API rate %s/s is below the soak rate, use --rate 0 "
+                    "to disable the rate limiter", config['rate'])
+
+    runner = soak.Soak(b1ddi, config, rate=rate,
+                       duration=float(config['soak_duration']), mix=mix,
+                       workers=int(config['soak_workers']),
+                       poisson=(config['soak_poisson'].lower() 
+                                in [ 'true', 'yes', '1' ]),
+                       seed=config['seed'])
+    if not runner.prepare():
+        return 1
+    summary = runner.run()
+
+    log.log(logs.SUMMARY, "-" * 51)
+    log.log(logs.SUMMARY, "%-16s %8s %7s %9s %9s %9s %9s", 'Operation', 
+            'ok', 'failed', 'p50', 'p95', 'p99', 'max')
+    for op, result in summary['operations'].items():
+        latency = result['latency']
+        log.log(logs.SUMMARY, "%-16s %8s %7s %8.1fms %8.1fms %8.1fms %8.1fms",
+                op, result['ok'], result['failed'], latency['p50'] * 1000,
+                latency['p95'] * 1000, latency['p99'] * 1000,
+                latency['max'] * 1000)
+    service = summary['operations'].get('all', {}).get('service', {})
+    log.log(logs.SUMMARY, "Achieved %0.1f of %0.1f ops/s, service time p99 "
+            "%0.1fms, max schedule lag %0.1fms", summary['achieved_rate'],
+            summary['target_rate'], service.get('p99', 0.0) * 1000,
+            summary['max_lag'] * 1000)
+    missed = runner.breaches(slo)
+    for breach in missed:
+        log.log(logs.SUMMARY, "--- Objective missed: %s", breach)
+    if slo and not missed:
+        log.log(logs.SUMMARY, "+++ All objectives met")
+    if missed or summary['operations'].get('all', {}).get('failed'):
+        exitcode = 1
+
+    if not keep:
+        counts = runner.clean_up()
+        log.log(logs.SUMMARY, "Removed %s soak objects, %s failed",
+                counts['deleted'], counts['failed'])
+
+    return exitcode
+
+
+def create_demo_from_plan(b1ddi, config):
+    '''
+    Create the demo data by executing the compiled (or cached) plan
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        config (obj): ini config object
+    
+    Returns:
+        exitcode (int): 0 if successful
+    '''
+    exitcode = 0
+    path = plan.cached_plan(plan_demo, config, config['plan_cache'], 
+                            version=__version__)
+    executor = plan.Executor(b1ddi, workers=int(config['workers']))
+    counts = executor.run(plan.read_plan(path))
+    log.log(logs.SUMMARY, "+++ %s objects created", counts['created'])
+    if counts['failed'] or counts['skipped']:
+        log.error("--- %s objects failed, %s skipped",
+                  counts['failed'], counts['skipped'])
+        exitcode = 1
+
+    return exitcode
+
+
+def create_demo_from_profile(b1ddi, config):
+    '''
+    Create the demo data for a scale profile, executing the plan entries
+    as they are generated
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        config (obj): ini config object
+    
+    Returns:
+        exitcode (int): 0 if successful
+    '''
+    exitcode = 0
+    log.info("~~~~ Generating %s profile with seed %s ~~~~", 
+             config['profile'], config['seed'])
+    executor = plan.Executor(b1ddi, workers=int(config['workers']))
+    counts = executor.run(profiles.entries(config))
+    log.log(logs.SUMMARY, "+++ %s objects created", counts['created'])
+    if counts['failed'] or counts['skipped']:
+        log.error("--- %s objects failed, %s skipped",
+                  counts['failed'], counts['skipped'])
+        exitcode = 1
+
+    return exitcode
+
+
+def init_shard(debug=False, verbosity='info', json_lines=False):
+    '''
+    Set up logging once in each shard worker process
+
+    Parameters:
+        debug (bool): Enable debug messages
+        verbosity (str): 'info', or 'summary' for per phase totals only
+        json_lines (bool): Log as JSON lines
+    '''
+    global shard_listener
+    shard_listener = setup_logging(debug=debug, verbosity=verbosity,
+                                   json_lines=json_lines)
+
+    return
+
+
+def create_shard(config, ids, subnets, hosts, run_id=''):
+    '''
+    Create the objects for a range of subnets and records in a worker
+    process, with its own bloxone client
+
+    Parameters:
+        config (obj): ini config object for the shard
+        ids (dict): Ids of the shared objects by plan ref
+        subnets (tuple): (start, stop) subnet indexes
+        hosts (tuple): (start, stop) record indexes
+        run_id (str): Inventory run
+
+    Returns:
+        (exitcode, counts, metrics, seconds) tuple
+    '''
+    # Restart the listener stopped at the end of the previous job
+    shard_listener.start()
+    try:
+        start_timer = time.perf_counter()
+        b1ddi = client.connect(config['b1inifile'])
+        setup_client(b1ddi, config, run_id=run_id)
+        executor = plan.Executor(b1ddi, workers=int(config['workers']), 
+                                 ids=ids)
+        counts = executor.run(plan_demo(config, subnets=subnets, hosts=hosts,
+                                        shared=False))
+        if hasattr(b1ddi, 'inventory'):
+            b1ddi.inventory.close()
+        if hasattr(b1ddi, 'hedger'):
+            b1ddi.hedger.close()
+        exitcode = 1 if counts['failed'] or counts['skipped'] else 0
+        end_timer = time.perf_counter() - start_timer
+    finally:
+        # Write out the shard's log records before its result is returned
+        shard_listener.stop()
+
+    return exitcode, counts, b1ddi.metrics, end_timer
+
+
+def create_demo_sharded(b1ddi, config):
+    '''
+    Create the demo data using worker processes. The IP Space, address 
+    block, DNS View and zones are created first, then the subnets and
+    records are split into contiguous ranges, one per worker, and the
+    workers' metrics merged into b1ddi.metrics.
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        config (obj): ini config object
+    
+    Returns:
+        exitcode (int): 0 if successful
+    '''
+    exitcode = 0
+    count = int(config['shards'])
+    if config['profile']:
+        nets = sum([ 1 for subnet in profiles.layout(config) ])
+        hosts = 0
+    else:
+        nets = demo_subnet_count(config)
+        hosts = planned_totals(config)['records']
+
+    log.log(logs.SUMMARY, "~~~~ Creating shared objects ~~~~")
+    executor = plan.Executor(b1ddi, workers=int(config['workers']))
+    counts = executor.run(plan_demo(config, subnets=(0, 0), hosts=(0, 0)))
+    if counts['failed'] or counts['skipped']:
+        log.error("--- %s shared objects failed, %s skipped",
+                  counts['failed'], counts['skipped'])
+        return 1
+
+    # Each worker gets an equal share of the request rate
+    shard_config = dict(config, progress='false',
+                        rate=str(float(config['rate']) / count),
+                        max_rate=str(float(config['max_rate']) / count),
+                        rate_increase=str(float(config['rate_increase']) 
+                                          / count))
+    run_id = b1ddi.inventory.run_id if hasattr(b1ddi, 'inventory') else ''
+    if run_id:
+        b1ddi.inventory.flush()
+    debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+    jobs = [ (shard_config, executor.ids, subnets, records, run_id)
+             for subnets, records in zip(shards.partition(nets, count),
+                                         shards.partition(hosts, count)) ]
+    log.log(logs.SUMMARY, "~~~~ Creating %s subnets and %s records in %s "
+            "shards ~~~~", nets, hosts, count)
+    results = shards.run(create_shard, jobs, processes=count, 
+                         initializer=init_shard, 
+                         initargs=(debug, config['verbosity'],
+                                   config['log_format'] == 'json'))
+
+    created = counts['created']
+    for n, result in enumerate(results):
+        subnets, records = jobs[n][2], jobs[n][3]
+        if result is None:
+            exitcode = 1
+            continue
+        code, counts, shard_metrics, seconds = result
+        log.log(logs.SUMMARY, "Shard %s subnets %s-%s records %s-%s: %s "
+                "created, %s failed, %s skipped in %0.2fS, exit %s", n, 
+                subnets[0], subnets[1], records[0], records[1],
+                counts['created'], counts['failed'], counts['skipped'],
+                seconds, code)
+        created += counts['created']
+        b1ddi.metrics.merge(shard_metrics)
+        exitcode = max(exitcode, code)
+    log.log(logs.SUMMARY, "+++ %s objects created", created)
+
+    return exitcode
+
+
+def reconcile_demo(b1ddi, config):
+    '''
+    Bring existing demo data in line with the config. Existing objects 
+    are bulk read and compared with the desired objects, then only the
+    missing objects are created and stale objects deleted.
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        config (obj): ini config object
+    
+    Returns:
+        exitcode (int): 0 if successful
+    '''
+    if config['profile']:
+        log.error("Reconcile is not supported with scale profiles")
+        return 3
+
+    exitcode = 0
+    workers = int(config['workers'])
+    builder = payloads.get_builder(config)
+    tfilter = sweep.tag_filter()
+    cidr = config['cidr']
+    totals = { 'created': 0, 'deleted': 0, 'failed': 0 }
+
+    def tally(counts):
+        for k in totals:
+            totals[k] += counts[k]
+        return
+
+    # IPAM
+    log.info("---- Reconcile IP Space ----")
+    space = b1ddi.get_id('/ipam/ip_space', key="name", 
+                         value=config['ip_space'], include_path=True)
+    if not space and ip_space(b1ddi, config):
+        space = b1ddi.get_id('/ipam/ip_space', key="name", 
+                             value=config['ip_space'], include_path=True)
+    if space:
+        in_space = 'space=="' + space + '"'
+        nets = demo_subnet_count(config)
+        net_comments = config['net_comments'].split(',')
+        # Seeded as plan_demo() so comments match the compiled plan
+        rng = random.Random(plan.config_hash(config))
+        block = config['base_net'] + '/' + config['container_cidr']
+        blocks = reconcile.fetch_existing(b1ddi, '/ipam/address_block',
+                    lambda o: '{}/{}'.format(o['address'], o['cidr']),
+                    'address,cidr', _filter=in_space, _tfilter=tfilter)
+        new_blocks, old_blocks = reconcile.diff(
+            [ (block, ("Address block " + block, 
+                       builder.address_block(config['base_net'],
+                           config['container_cidr'], space))) ], blocks)
+
+        subnets = reconcile.fetch_existing(b1ddi, '/ipam/subnet',
+                    lambda o: '{}/{}'.format(o['address'], o['cidr']),
+                    'address,cidr', _filter=in_space, _tfilter=tfilter)
+        new_subnets, old_subnets = reconcile.diff(
+            ( (str(n.network_address) + '/' + cidr, 
+               ("Subnet {}/{}".format(n.network_address, cidr),
+                builder.subnet(str(n.network_address), cidr, space,
+                    net_comments[rng.randrange(0,len(net_comments))])))
+              for n in demo_subnets(config, stop=nets) ), subnets)
+
+        ranges = reconcile.fetch_existing(b1ddi, '/ipam/range',
+                    lambda o: '{}-{}'.format(o['start'], o['end']),
+                    'start,end', _filter=in_space, _tfilter=tfilter)
+        new_ranges, old_ranges = reconcile.diff(
+            ( ('{}-{}'.format(*addressing.range_bounds(n)),
+               ("Range {}-{}".format(*addressing.range_bounds(n)),
+                builder.range(*addressing.range_bounds(n), space)))
+              for n in demo_subnets(config, stop=nets) ), ranges)
+
+        addresses = reconcile.fetch_existing(b1ddi, '/ipam/address',
+                    lambda o: o['address'], 'address', 
+                    _filter=in_space, _tfilter=tfilter)
+        new_addresses, old_addresses = reconcile.diff(
+            ( (ip, ("IP {}".format(ip), builder.address(ip, space)))
+              for n in demo_subnets(config, stop=nets)
+              for ip in addressing.reservation_addresses(n, 
+                  addressing.reservation_count(n, config['no_of_ips'])) ),
+            addresses)
+
+        # Objects in stale subnets go when the subnet is deleted
+        old_ranges = { k: v for k, v in old_ranges.items() 
+                       if addressing.parent_subnet(k.split('-')[0], cidr) 
+                       not in old_subnets }
+        old_addresses = { k: v for k, v in old_addresses.items() 
+                          if addressing.parent_subnet(k, cidr) 
+                          not in old_subnets }
+
+        # Delete children first, create parents first
+        tally(reconcile.apply(b1ddi, '/ipam/address', [], old_addresses, 
+                              workers=workers))
+        tally(reconcile.apply(b1ddi, '/ipam/range', [], old_ranges, 
+                              workers=workers))
+        tally(reconcile.apply(b1ddi, '/ipam/subnet', [], old_subnets, 
+                              workers=workers))
+        tally(reconcile.apply(b1ddi, '/ipam/address_block', new_blocks, 
+                              old_blocks, workers=workers))
+        tally(reconcile.apply(b1ddi, '/ipam/subnet', new_subnets, {}, 
+                              workers=workers))
+        tally(reconcile.apply(b1ddi, '/ipam/range', new_ranges, {}, 
+                              workers=workers))
+        tally(reconcile.apply(b1ddi, '/ipam/address', new_addresses, {}, 
+                              workers=workers))
+    else:
+        exitcode = 1
+
+    # DNS
+    log.info("---- Reconcile DNS View ----")
+    view = b1ddi.get_id('/dns/view', key="name", 
+                        value=config['dns_view'], include_path=True)
+    if not view and create_dnsview(b1ddi, config):
+        view = b1ddi.get_id('/dns/view', key="name", 
+                            value=config['dns_view'], include_path=True)
+    nsg = find_nsg(b1ddi, config)
+    if view and nsg:
+        zone = config['dns_domain']
+        zones = [ (fqdn, ("Zone " + fqdn, builder.zone(fqdn, view, nsg)))
+                  for fqdn in (zone, reverse_zone(config)) ]
+        tally(reconcile.reconcile(b1ddi, '/dns/auth_zone', zones,
+                                  lambda o: o['fqdn'], 'fqdn', 
+                                  workers=workers,
+                                  _filter='view=="' + view + '"',
+                                  _tfilter=tfilter))
+
+        zone_id, reverse_id = find_zones(b1ddi, config, view)
+        if zone_id:
+            network = ipaddress.ip_network(config['base_net'] + '/' + cidr)
+            no_of_records = min(int(config['no_of_records']), 
+                                network.num_addresses - 2)
+            desired = ( ('{} {}'.format(hostname, address),
+                         ("record: {}.{} with IP {}"
+                          .format(hostname, zone, address), body))
+                        for hostname, address, body in record_bodies(config,
+                            zone_id, network, no_of_records) )
+            tally(reconcile.reconcile(b1ddi, '/dns/record', desired,
+                        lambda o: '{} {}'.format(o['name_in_zone'],
+                                                 o['rdata'].get('address')),
+                        'name_in_zone,rdata', workers=workers,
+                        _filter='(zone=="' + zone_id + '")and(type=="A")',
+                        _tfilter=tfilter))
+        else:
+            log.warning("--- Zone %s not available", zone)
+            exitcode = 1
+    else:
+        exitcode = 1
+
+    log.log(logs.SUMMARY, "+++ Reconciled: %s created, %s deleted",
+            totals['created'], totals['deleted'])
+    if totals['failed']:
+        log.error("--- %s changes failed", totals['failed'])
+        exitcode = 1
+
+    return exitcode
+
+
 def clean_up(b1ddi, config):
     '''
     Clean Up Demo Data
@@ -723,93 +1631,273 @@ def clean_up(b1ddi, config):
         bool: True if successful
     '''
     exitcode = 0
+    progress.expect(b1ddi, 'teardown', planned_deletes(config))
+
+    if int(config['workers']) > 1:
+        return clean_up_concurrent(b1ddi, config)
 
     # Check for existence
     id = b1ddi.get_id('/ipam/ip_space', key="name", value=config['ip_space'])
     if id:
-        log.info("Deleting IP_Space {}".format(config['ip_space']))
+        log.info("Deleting IP_Space %s", config['ip_space'])
         response = b1ddi.delete('/ipam/ip_space', id=id)
         if response.status_code in b1ddi.return_codes_ok:
-            log.info("+++ IP_Space {} deleted".format(config['ip_space']))
+            log.log(logs.SUMMARY, 
+                    "+++ IP_Space %s deleted", config['ip_space'])
         else:
-            log.warning("--- IP Space {} not deleted due to error".format(config['ip_space']))
-            log.debug("Return code: {}".format(response.status_code))
-            log.debug("Return body: {}".format(response.text))
+            log.warning("--- IP Space %s not deleted due to error",
+                        config['ip_space'])
+            log.debug("Return code: %s", response.status_code)
+            log.debug("Return body: %s", response.text)
             exitcode = 1
     else:
-        log.warning("IP Space {} not fonud.".format(config['ip_space'])) 
+        log.warning("IP Space %s not fonud.", config['ip_space']) 
         exitcode = 1 
 
-    # Check for existence
-    id = b1ddi.get_id('/dns/view', key="name", value=config['dns_view'])
+    # Check for existence, zones refer to the view by its full id
+    id = b1ddi.get_id('/dns/view', key="name", value=config['dns_view'],
+                      include_path=True)
     if id:
-        log.info("Cleaning up Zones for DNS View {}".format(config['dns_view']))
+        log.info("Cleaning up Zones for DNS View %s", config['dns_view'])
         if clean_up_zones(b1ddi, id):
-            log.info("Deleting DNS View {}".format(config['dns_view']))
-            response = b1ddi.delete('/dns/view', id=id)
+            log.info("Deleting DNS View %s", config['dns_view'])
+            response = b1ddi.delete('/dns/view', id=id.rsplit('/', 1)[-1])
             if response.status_code in b1ddi.return_codes_ok:
-                log.info("+++ DNS View {} deleted".format(config['dns_view']))
+                log.log(logs.SUMMARY, 
+                        "+++ DNS View %s deleted", config['dns_view'])
             else:
-                log.warning("--- DNS View {} not deleted due to error".format(config['dns_view']))
-                log.debug("Return code: {}".format(response.status_code))
-                log.debug("Return body: {}".format(response.text))
+                log.warning("--- DNS View %s not deleted due to error",
+                            config['dns_view'])
+                log.debug("Return code: %s", response.status_code)
+                log.debug("Return body: %s", response.text)
                 exitcode = 1
         else:
-            log.warning("Unable to clean-up zones in view {}".format(config['dns_view']))
+            log.warning("Unable to clean-up zones in view %s",
+                        config['dns_view'])
             exitcode = 1
     else:
-        log.warning("DNS View {} not fonud.".format(config['dns_view'])) 
+        log.warning("DNS View %s not fonud.", config['dns_view']) 
         exitcode = 1 
 
     return exitcode
 
 
+def find_object(b1ddi, objpath, name, label):
+    '''
+    Get the id of a named object, logging if it is not found
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        objpath (str): Swagger object path
+        name (str): Name of object
+        label (str): Object type for logging, e.g. "IP Space"
+
+    Returns:
+        id (str): Object id including path or ""
+    '''
+    id = b1ddi.get_id(objpath, key="name", value=name, include_path=True)
+    if not id:
+        log.warning("%s %s not found.", label, name) 
+
+    return id
+
+
+@metrics.operation('delete_zones')
+def delete_zones(b1ddi, config, view_id):
+    '''
+    Delete all zones in a view concurrently and wait until they are gone
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        config (obj): ini config object
+        view_id (str): DNS View id including path
+
+    Returns:
+        bool: True if successful
+    '''
+    status = False
+    filter = 'view=="' + view_id + '"'
+
+    log.info("~~~~ Deleting zones ~~~~")
+    counts = sweep.drain(b1ddi, '/dns/auth_zone', 
+                         workers=int(config['workers']), _filter=filter)
+    if not counts['failed']:
+        # Zone deletion completes asynchronously, the view can only
+        # be removed once they have all gone
+        status = teardown.wait_for(lambda: sweep.none_left(b1ddi, 
+                                       '/dns/auth_zone', _filter=filter))
+        if not status:
+            log.warning("--- Zones still present in view %s",
+                        config['dns_view'])
+
+    return status
+
+
+def clean_up_concurrent(b1ddi, config):
+    '''
+    Clean Up Demo Data, deleting the IP Space and DNS View (and its 
+    zones) concurrently
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        config (obj): ini config object
+    
+    Returns:
+        exitcode (int): 0 if successful
+    '''
+    exitcode = 0
+    tasks = scheduler.Scheduler(workers=2)
+    space = scheduler.Result('space_id')
+    view = scheduler.Result('view_id')
+
+    # IPAM branch, deleting the space removes everything in it
+    tasks.add('space_id', find_object, b1ddi, '/ipam/ip_space',
+              config['ip_space'], "IP Space")
+    tasks.add('delete_space', teardown.delete_object, b1ddi, 
+              '/ipam/ip_space', space, 
+              label="IP_Space {}".format(config['ip_space']),
+              requires=['space_id'])
+
+    # DNS branch, zones must be removed before the view
+    tasks.add('view_id', find_object, b1ddi, '/dns/view',
+              config['dns_view'], "DNS View")
+    tasks.add('delete_zones', delete_zones, b1ddi, config, view,
+              requires=['view_id'])
+    tasks.add('delete_view', teardown.delete_object, b1ddi, '/dns/view', 
+              view, label="DNS View {}".format(config['dns_view']),
+              requires=['delete_zones'])
+
+    summary = tasks.run()
+    if summary['failed'] or summary['skipped']:
+        log.debug("Failed tasks: %s", summary['failed'])
+        exitcode = 1
+
+    return exitcode
+
+
+@metrics.operation('delete_zones')
 def clean_up_zones(b1ddi, view_id):
     '''
     Clean up zones for specified view id
 
     Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        view_id (str): DNS View id including path
 
     Returns:
         bool: True if successful
     '''
     status = False
     filter = 'view=="' + view_id + '"'
-    response = b1ddi.get('/dns/auth_zone', _filter=filter, _fields="fqdn,id")
 
-    if response.status_code in b1ddi.return_codes_ok:
-        if 'results' in response.json().keys():
-            zones = response.json()['results']
-            if len(zones):
-                for zone in zones:
-                    id = zone['id'].split('/')[2]
-                    log.info("Deleting zone {}".format(zone['fqdn']))
-                    r = b1ddi.delete('/dns/auth_zone', id=id)
-                    if r.status_code in b1ddi.return_codes_ok:
-                        log.info("+++ Zone {} deleted successfully"
-                                 .format(zone['fqdn']))
-                        status = True
-                    else:
-                        log.info("--- Zone {} not deleted".format(zone['fqdn']))
-                        log.debug("Return code: {}"
-                                  .format(response.status_code))
-                        log.debug("Return body: {}".format(response.text))
-                        status = False
-            else:
-                log.info("No zones present")
-                status = True
+    # Zones are retrieved and deleted a page at a time
+    counts = sweep.drain(b1ddi, '/dns/auth_zone', workers=1, _filter=filter)
+    if counts['deleted'] or counts['failed']:
+        log.log(logs.SUMMARY, "%s zones deleted", counts['deleted'])
+        if not counts['failed']:
+            status = True
         else:
-            log.info("No results for view")
+            log.log(logs.SUMMARY, 
+                    "--- %s zones not deleted", counts['failed'])
     else:
-        log.info("--- Unable to retrieve zones for view id = {}"
-                 .format(view_id))
-        log.debug("Return code: {}".format(response.status_code))
-        log.debug("Return body: {}".format(response.text))
-        status = False
+        log.info("No zones present")
+        status = True
     
     return status
 
 
+def remove_demo(b1ddi, config, run_id='', subnet=''):
+    '''
+    Clean Up Demo Data, deleting the objects recorded in the inventory 
+    by id when it holds the demo's IP Space and DNS View, otherwise 
+    finding them by name. A single run or subnet can be removed using
+    the inventory.
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        config (obj): ini config object
+        run_id (str): Only remove objects created by this run
+        subnet (str): Only remove this subnet, its ranges and addresses
+
+    Returns:
+        exitcode (int): 0 if successful
+    '''
+    store = getattr(b1ddi, 'inventory', None)
+    if not store:
+        if run_id or subnet:
+            log.error("Removing a run or subnet requires an inventory")
+            return 3
+        return clean_up(b1ddi, config)
+
+    try:
+        objects = store.select(config, run_id=run_id, subnet=subnet)
+    except ValueError as err:
+        log.error("Subnet not valid: %s", err)
+        return 3
+    if not run_id and not subnet:
+        types = set([ o[0] for o in objects ])
+        if '/ipam/ip_space' not in types or '/dns/view' not in types:
+            log.info("Demo not found in inventory %s", config['inventory'])
+            return clean_up(b1ddi, config)
+    if not objects:
+        log.warning("No objects found in inventory %s", config['inventory'])
+        return 1
+
+    # Objects the API removes with their parent are not deleted directly
+    plan = inventory.teardown_plan(objects)
+    deletes = sum([ len(items) for objpath, items in plan ])
+    progress.expect(b1ddi, 'teardown', deletes)
+    log.log(logs.SUMMARY, "Removing %s objects with %s deletes using "
+            "inventory %s", len(objects), deletes, config['inventory'])
+    counts = inventory.delete(b1ddi, plan, workers=int(config['workers']))
+    log.log(logs.SUMMARY, "+++ %s objects deleted", counts['deleted'])
+    if counts['failed']:
+        log.log(logs.SUMMARY, "--- %s objects not deleted", counts['failed'])
+
+    return 1 if counts['failed'] else 0
+
+
+def report_inventory(config, run_id=''):
+    '''
+    Log the objects created, and still present, for each run in the
+    inventory
+
+    Parameters:
+        config (obj): ini config object
+        run_id (str): Only report this run
+
+    Returns:
+        exitcode (int): 0 if successful
+    '''
+    if not config['inventory']:
+        log.error("No inventory configured, set inventory or use --inventory")
+        return 2
+    if not os.path.isfile(config['inventory']):
+        log.error("No inventory found: %s", config['inventory'])
+        return 2
+
+    store = inventory.Inventory(config['inventory'])
+    runs = store.report(run_id=run_id)
+    store.close()
+    log.log(logs.SUMMARY, "%-20s %-19s %-16s %8s %8s %5s", 'Run', 'Started',
+            'Customer', 'Created', 'Present', 'Exit')
+    for run in runs:
+        started = datetime.datetime.fromtimestamp(run['started'])
+        log.log(logs.SUMMARY, "%-20s %-19s %-16s %8s %8s %5s", 
+                run['run_id'], started.strftime('%Y-%m-%d %H:%M:%S'),
+                run['customer'], sum(run['created'].values()), 
+                sum(run['live'].values()), 
+                '' if run['exitcode'] is None else run['exitcode'])
+        for objpath, count in sorted(run['created'].items()):
+            log.info("    %-24s %8s %8s", objpath, count, 
+                     run['live'][objpath])
+    if run_id and not runs:
+        log.warning("Run %s not found", run_id)
+        return 1
+
+    return 0
+
+
 def check_config(config):
     '''
     Perform some basic network checks on config
@@ -824,26 +1912,339 @@ def check_config(config):
     container = int(config['container_cidr'])
     subnet = int(config['cidr'])
 
-    if not bloxone.utils.validate_ip(config['base_net']):
-        log.error("Base network not valid: {}".format(config['base_net']))
+    if not addressing.validate_ip(config['base_net']):
+        log.error("Base network not valid: %s", config['base_net'])
         config_ok = False
     elif container < 8 or container > 28:
-        log.error("Container CIDR should be between 8 and 28: {}"
-                  .format(container))
+        log.error("Container CIDR should be between 8 and 28: %s", container)
         config_ok = False
     elif container >= subnet:
-        log.error("Container prefix does not contain subnet prefix: {} vs {}"
-                  .format(container, subnet))
+        log.error("Container prefix does not contain subnet prefix: %s vs %s",
+                  container, subnet)
         config_ok = False
     elif subnet > 29:
-        log.error("Subnet CIDR should be /29 or shorter: {}".format(subnet))
+        log.error("Subnet CIDR should be /29 or shorter: %s", subnet)
         config_ok = False
     elif  not config['no_of_ips']:
         log.error("Key: no_of_ips not declared")
         config_ok = False
+    elif config['profile'] and config['profile'] not in profiles.PROFILES:
+        log.error("Unknown scale profile: %s", config['profile'])
+        config_ok = False
 
     return config_ok
 
+def planned_totals(config):
+    '''
+    Number of objects each phase of create_demo() will create
+
+    Parameters:
+        config (obj): ini config object
+
+    Returns:
+        totals (dict): Objects for the ipam, zones and records phases
+    '''
+    if config['profile']:
+        return profiles.totals(config)
+    nets = demo_subnet_count(config)
+    ips = 0
+    for network in demo_subnets(config, stop=min(nets, 1)):
+        # Reservations are network + 2 ... network + no_of_ips
+        ips = max(0, addressing.reservation_count(network, 
+                                                  config['no_of_ips']) - 1)
+    # Records are limited to the size of a subnet, as add_records()
+    network = ipaddress.ip_network(config['base_net'] + '/' + config['cidr'])
+    records = min(int(config['no_of_records']), network.num_addresses - 2)
+    # IP Space, address block and a subnet, range and IPs per network
+    totals = { 'ipam': 2 + nets * (2 + ips),
+               'zones': 3,
+               'records': records }
+
+    return totals
+
+
+def planned_deletes(config):
+    '''
+    Number of deletes clean_up() or a sweep of the demo will make, the
+    API removes the other objects with their IP Space or zone
+
+    Parameters:
+        config (obj): ini config object
+
+    Returns:
+        int: Deletes of the IP Space, DNS View and zones
+    '''
+    return 1 + planned_totals(config)['zones']
+
+
+def setup_client(b1ddi, config, remove=False, runner=None, reporter=None,
+                 run_id=''):
+    '''
+    Install the performance layers on the bloxone client
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        config (obj): ini config object
+        remove (bool): Client will be used to clean up demo data
+        runner (obj): batch.Batch providing shared transport and budgets
+        reporter (obj): Shared progress.Progress
+        run_id (str): Inventory run to add to, e.g. in a shard
+
+    Returns:
+        b1ddi (obj): bloxone.b1ddi object
+    '''
+    # Reuse connections, enough for every worker and record in flight
+    if runner:
+        transport.install_transport(b1ddi, runner.transport)
+    else:
+        pool_size = (int(config['pool_size']) or 
+                     max(transport.POOL_SIZE, int(config['workers']), 
+                         int(config['record_window']), 
+                         int(config['soak_workers'])))
+        transport.install_transport(b1ddi, 
+            transport.Transport(pool_size=pool_size,
+                compress=(config['compress'].lower() in [ 'true', 'yes', '1' ])))
+    responses.install_json_cache(b1ddi)
+
+    # Measure every request attempt
+    metrics.install_metrics(b1ddi, metrics.Metrics())
+
+    # Time reads for hedging as they are sent, after any rate limiting
+    hedger = None
+    if config['hedge'].lower() in [ 'true', 'yes', '1' ]:
+        hedger = hedge.Hedger(percentile=float(config['hedge_percentile']),
+                              budget=float(config['hedge_budget']),
+                              delay=float(config['hedge_delay']),
+                              workers=2 * max(16, int(config['workers']),
+                                              int(config['record_window']),
+                                              int(config['soak_workers'])))
+        hedge.install_timer(b1ddi, hedger)
+
+    # Adapt request rate to API throttling, in a batch the tenant's rate
+    # is shared by all its demos
+    controller = None
+    if runner:
+        tenant = runner.tenant(config)
+        batch.install_budget(b1ddi, runner, tenant)
+        controller = tenant.controller
+    else:
+        controller = ratelimit.from_config(config)
+    if controller:
+        ratelimit.install_rate_limiter(b1ddi, controller)
+
+    # Resend slow reads, outside the rate limiter so that hedges are 
+    # rate limited too
+    if hedger:
+        hedge.install_hedging(b1ddi, hedger)
+
+    # Retry transient failures, outside the rate limiter so that each
+    # attempt is rate limited, and fail fast on failing endpoints
+    if int(config['retries']):
+        retry.install_retry(b1ddi, 
+            retry.RetryPolicy(attempts=int(config['retries'])),
+            retry.Breakers(threshold=int(config['breaker_threshold']),
+                           reset=float(config['breaker_reset'])))
+
+    # Record every object created, and deleted, in the local inventory
+    if config['inventory']:
+        inventory.install_inventory(b1ddi, 
+            inventory.Inventory(config['inventory']), config, run_id=run_id)
+
+    # Count each request, once, towards the progress of its phase
+    if reporter:
+        progress.install_progress(b1ddi, reporter)
+    elif config['progress'].lower() in [ 'true', 'yes', '1' ]:
+        progress.install_progress(b1ddi, 
+                                  progress.Progress(planned_totals(config)))
+
+    # Cache name to id lookups, reusing ids from a previous run for clean up
+    ids = resolver.install_resolver(b1ddi, path=config['id_cache'])
+    if remove:
+        ids.load()
+
+    return b1ddi
+
+
+def apply_overrides(config, args):
+    '''
+    Apply command line overrides to the tuning keys
+
+    Parameters:
+        config (obj): ini config object
+        args (obj): parsed command line arguments
+
+    Returns:
+        config (obj): ini config object
+    '''
+    if args.workers:
+        config['workers'] = str(args.workers)
+    if args.record_window:
+        config['record_window'] = str(args.record_window)
+    if args.id_cache:
+        config['id_cache'] = args.id_cache
+    if args.rate is not None:
+        config['rate'] = str(args.rate)
+    if args.max_rate is not None:
+        config['max_rate'] = str(args.max_rate)
+    if args.retries is not None:
+        config['retries'] = str(args.retries)
+    if args.pool_size:
+        config['pool_size'] = str(args.pool_size)
+    if args.metrics:
+        config['metrics'] = args.metrics
+    if args.metrics_format:
+        config['metrics_format'] = args.metrics_format
+    if args.verbosity:
+        config['verbosity'] = args.verbosity
+    if args.log_format:
+        config['log_format'] = args.log_format
+    if args.progress:
+        config['progress'] = 'true'
+    if args.plan_cache:
+        config['plan_cache'] = args.plan_cache
+    if args.profile:
+        config['profile'] = args.profile
+    if args.seed is not None:
+        config['seed'] = args.seed
+    if args.soak_rate is not None:
+        config['soak_rate'] = str(args.soak_rate)
+    if args.soak_duration is not None:
+        config['soak_duration'] = str(args.soak_duration)
+    if args.soak_mix:
+        config['soak_mix'] = args.soak_mix
+    if args.soak_slo:
+        config['soak_slo'] = args.soak_slo
+    if args.soak_workers:
+        config['soak_workers'] = str(args.soak_workers)
+    if args.soak_poisson:
+        config['soak_poisson'] = 'true'
+    if args.inventory is not None:
+        config['inventory'] = args.inventory
+    if args.shards:
+        config['shards'] = str(args.shards)
+    if args.hedge:
+        config['hedge'] = 'true'
+    if args.hedge_percentile is not None:
+        config['hedge_percentile'] = str(args.hedge_percentile)
+    if args.hedge_budget is not None:
+        config['hedge_budget'] = str(args.hedge_budget)
+
+    return config
+
+
+def run_demo(b1ddi, config, args):
+    '''
+    Create, sweep or clean up the demo data for one config
+
+    Parameters:
+        b1ddi (obj): bloxone.b1ddi object
+        config (obj): ini config object
+        args (obj): parsed command line arguments
+
+    Returns:
+        exitcode (int): 0 if successful
+    '''
+    if args.sweep:
+        progress.expect(b1ddi, 'teardown', planned_deletes(config))
+        counts = sweep.sweep(b1ddi, sweep.tag_filter(Owner=config['owner']),
+                             workers=int(config['workers']))
+        exitcode = 1 if counts['failed'] else 0
+    elif args.remove:
+        exitcode = remove_demo(b1ddi, config, run_id=args.run, 
+                               subnet=args.subnet)
+    elif args.soak:
+        exitcode = soak_demo(b1ddi, config, keep=args.soak_keep)
+    elif not check_config(config):
+        exitcode = 3
+    elif args.reconcile:
+        exitcode = reconcile_demo(b1ddi, config)
+    elif args.plan:
+        exitcode = create_demo_from_plan(b1ddi, config)
+    else:
+        exitcode = create_demo(b1ddi, config)
+
+    return exitcode
+
+
+def run_batch(args):
+    '''
+    Run the demos in each ini file, and each demo section of the ini 
+    files, concurrently within global and per tenant budgets
+
+    Parameters:
+        args (obj): parsed command line arguments
+
+    Returns:
+        exitcode (int): 0 if all demos were successful
+    '''
+    exitcode = 0
+    demos = []
+    for filename in args.batch:
+        sections = batch.demo_sections(filename)
+        if not sections:
+            log.error("No demo sections found in %s", filename)
+            exitcode = 2
+        for section in sections:
+            config = apply_overrides(read_demo_ini(filename, section), args)
+            if not config['b1inifile']:
+                config['b1inifile'] = filename
+            demos.append((batch.demo_label(filename, section), config))
+
+    runner = batch.Batch(transport.Transport(
+                             pool_size=(args.max_inflight or 
+                                        transport.POOL_SIZE * len(demos))),
+                         inflight=args.max_inflight, rate=args.global_rate,
+                         tenant_inflight=args.tenant_inflight)
+    reporter = None
+    if args.progress:
+        totals = {}
+        for label, config in demos:
+            for phase, count in planned_totals(config).items():
+                totals[phase] = totals.get(phase, 0) + count
+        reporter = progress.Progress(totals)
+        reporter.start()
+    merged = metrics.Metrics()
+
+    def run(label, config):
+        b1ddi = client.connect(config['b1inifile'])
+        setup_client(b1ddi, config, remove=(args.remove or args.sweep),
+                     runner=runner, reporter=reporter)
+        exitcode = 99
+        try:
+            exitcode = run_demo(b1ddi, config, args)
+            return exitcode
+        finally:
+            merged.merge(b1ddi.metrics)
+            b1ddi.resolver.save()
+            if hasattr(b1ddi, 'inventory'):
+                b1ddi.inventory.finish_run(exitcode)
+                b1ddi.inventory.close()
+            if hasattr(b1ddi, 'hedger'):
+                b1ddi.hedger.close()
+
+    log.log(logs.SUMMARY, "------ Running %s demos for %s tenants ------",
+            len(demos), len(set([ c['b1inifile'] for l, c in demos ])))
+    start_timer = time.perf_counter()
+    results = runner.run(demos, run, workers=args.batch_workers)
+    end_timer = time.perf_counter() - start_timer
+    if reporter:
+        reporter.stop()
+
+    log.log(logs.SUMMARY, "-" * 51)
+    for label, (code, seconds) in sorted(results.items()):
+        log.log(logs.SUMMARY, "%-40s exit %s in %0.2fS", label, code, seconds)
+        exitcode = max(exitcode, code)
+    log.log(logs.SUMMARY, "Batch of %s demos completed in %0.2fS", 
+            len(demos), end_timer)
+    merged.log_operations(log, logs.SUMMARY)
+    if args.metrics:
+        merged.log_summary(log, logs.SUMMARY)
+        merged.write(args.metrics, args.metrics_format or 'json')
+        log.log(logs.SUMMARY, "Metrics written to %s", args.metrics)
+
+    return exitcode
+
+
 def main():
     '''
     Core Logic
@@ -855,6 +2256,15 @@ def main():
     inifile = args.config
     debug = args.debug
 
+    if args.batch:
+        setup_logging(debug=debug, usefile=args.output, 
+                      logfile=('batch.log' if args.output else ''),
+                      verbosity=(args.verbosity or 'info'),
+                      json_lines=(args.log_format == 'json'))
+        log.log(logs.SUMMARY, 
+                "====== B1DDI Automation Demo Version %s ======", __version__)
+        return run_batch(args)
+
     # Read inifile
     config = read_demo_ini(inifile)
     if config['b1inifile']:
@@ -864,6 +2274,10 @@ def main():
         b1inifile = inifile
 
     if len(config) > 0:
+        # Command line overrides for tuning keys
+        apply_overrides(config, args)
+        config['b1inifile'] = b1inifile
+
         # Check for file output
         if args.output:
             outputprefix = config['customer']
@@ -871,51 +2285,132 @@ def main():
 
         if usefile:
             logfn = outputprefix + ".log"
-            hdlr = logging.FileHandler(logfn)
-            log.addHandler(hdlr)
-
-        if debug:
-            log.setLevel(logging.DEBUG)
-            setup_logging(debug=True, usefile=usefile)
         else:
-            log.setLevel(logging.INFO)
-            setup_logging(debug=False, usefile=usefile)
+            logfn = ''
 
-        log.info("====== B1DDI Automation Demo Version {} ======"
-                .format(__version__))
+        setup_logging(debug=debug, usefile=usefile, logfile=logfn,
+                      verbosity=config['verbosity'],
+                      json_lines=(config['log_format'] == 'json'))
 
-        # Instatiate bloxone 
-        b1ddi = bloxone.b1ddi(b1inifile)
+        log.log(logs.SUMMARY, 
+                "====== B1DDI Automation Demo Version %s ======", __version__)
 
-        if not args.remove:
+        if args.dry_run:
+            # No API client required
             log.info("Checking config...")
             if check_config(config):
-                log.info("Config checked out proceeding...")
-                log.info("------ Creating Demo Data ------")
-                start_timer = time.perf_counter()
-                exitcode = create_demo(b1ddi, config)
-                end_timer = time.perf_counter() - start_timer
-                log.info("---------------------------------------------------")
-                log.info(f'Demo data created in {end_timer:0.2f}S')
-                log.info("Please remember to clean up when you have finished:")
-                command = '$ ' + ' '.join(sys.argv) + " --remove"
-                log.info("{}".format(command)) 
+                log.log(logs.SUMMARY, 
+                        "------ Planning Demo Data (dry run) ------")
+                exitcode = dry_run(config)
+            else:
+                log.error("Config %s contains errors", inifile)
+                exitcode = 3
+        elif args.export:
+            log.info("Checking config...")
+            if check_config(config):
+                log.log(logs.SUMMARY, "------ Exporting Demo Data ------")
+                exitcode = export_demo(config, args.export, 
+                                       format=args.export_format,
+                                       rows_per_file=args.export_rows,
+                                       upload_url=args.upload_url,
+                                       b1inifile=b1inifile)
             else:
-                log.error("Config {} contains errors".format(inifile))
+                log.error("Config %s contains errors", inifile)
                 exitcode = 3
-        elif args.remove:
-            log.info("------ Cleaning Up Demo Data ------")
-            start_timer = time.perf_counter()
-            exitcode = clean_up(b1ddi, config)
-            end_timer = time.perf_counter() - start_timer
-            log.info("---------------------------------------------------")
-            log.info(f'Demo data removed in {end_timer:0.2f}S')
+        elif args.inventory_report:
+            log.log(logs.SUMMARY, "------ Inventory Report ------")
+            exitcode = report_inventory(config, run_id=args.run)
         else:
-            log.error("Script Error - something seriously wrong")
-            exitcode = 99
+            # Instatiate bloxone 
+            b1ddi = client.connect(b1inifile)
+            setup_client(b1ddi, config, remove=(args.remove or args.sweep))
+            if hasattr(b1ddi, 'progress'):
+                b1ddi.progress.start()
+
+            if args.soak and not args.remove and not args.sweep:
+                log.log(logs.SUMMARY, "------ Soaking Demo Data ------")
+                exitcode = soak_demo(b1ddi, config, keep=args.soak_keep)
+            elif not args.remove and not args.sweep:
+                log.info("Checking config...")
+                if check_config(config):
+                    log.info("Config checked out proceeding...")
+                    log.log(logs.SUMMARY, "------ Creating Demo Data ------")
+                    start_timer = time.perf_counter()
+                    if args.reconcile:
+                        exitcode = reconcile_demo(b1ddi, config)
+                    elif args.plan:
+                        exitcode = create_demo_from_plan(b1ddi, config)
+                    else:
+                        exitcode = create_demo(b1ddi, config)
+                    end_timer = time.perf_counter() - start_timer
+                    log.log(logs.SUMMARY, "-" * 51)
+                    log.log(logs.SUMMARY, 'Demo data created in %0.2fS', end_timer)
+                    log.log(logs.SUMMARY, 
+                            "Please remember to clean up when you have finished:")
+                    command = '$ ' + ' '.join(sys.argv) + " --remove"
+                    log.log(logs.SUMMARY, "%s", command)
+                else:
+                    log.error("Config %s contains errors", inifile)
+                    exitcode = 3
+            elif args.sweep:
+                log.log(logs.SUMMARY, 
+                        "------ Sweeping Tagged Demo Data ------")
+                start_timer = time.perf_counter()
+                tfilter = sweep.tag_filter(Owner=config['owner'])
+                progress.expect(b1ddi, 'teardown', planned_deletes(config))
+                counts = sweep.sweep(b1ddi, tfilter, 
+                                     workers=int(config['workers']))
+                if counts['failed']:
+                    exitcode = 1
+                end_timer = time.perf_counter() - start_timer
+                log.log(logs.SUMMARY, "-" * 51)
+                log.log(logs.SUMMARY, 'Demo data removed in %0.2fS', end_timer)
+            elif args.remove:
+                log.log(logs.SUMMARY, "------ Cleaning Up Demo Data ------")
+                start_timer = time.perf_counter()
+                exitcode = remove_demo(b1ddi, config, run_id=args.run,
+                                       subnet=args.subnet)
+                end_timer = time.perf_counter() - start_timer
+                log.log(logs.SUMMARY, "-" * 51)
+                log.log(logs.SUMMARY, 'Demo data removed in %0.2fS', end_timer)
+            else:
+                log.error("Script Error - something seriously wrong")
+                exitcode = 99
+
+            if hasattr(b1ddi, 'progress'):
+                b1ddi.progress.stop()
+            if hasattr(b1ddi, 'rate_controller'):
+                log.debug("Final rate %0.1f/s, %s requests throttled",
+                          b1ddi.rate_controller.rate, 
+                          b1ddi.rate_controller.throttled)
+            if hasattr(b1ddi, 'hedger'):
+                log.debug("Hedged %s of %s reads, %s hedges faster",
+                          b1ddi.hedger.hedged, b1ddi.hedger.requests,
+                          b1ddi.hedger.wins)
+                b1ddi.hedger.close()
+            if hasattr(b1ddi, 'retry_policy'):
+                log.debug("Retries: %s, gave up: %s, open circuits: %s",
+                          b1ddi.retry_policy.retries, 
+                          b1ddi.retry_policy.gave_up,
+                          b1ddi.breakers.open_endpoints())
+            log.debug("Connection pool: %s", b1ddi.transport.pool_stats())
+            b1ddi.metrics.log_operations(log, logs.SUMMARY)
+            if config['metrics']:
+                b1ddi.metrics.log_summary(log, logs.SUMMARY)
+                b1ddi.metrics.write(config['metrics'], 
+                                    config['metrics_format'])
+                log.log(logs.SUMMARY, 
+                        "Metrics written to %s", config['metrics'])
+            log.debug("Id cache hits: %s, misses: %s",
+                      b1ddi.resolver.hits, b1ddi.resolver.misses)
+            b1ddi.resolver.save()
+            if hasattr(b1ddi, 'inventory'):
+                b1ddi.inventory.finish_run(exitcode)
+                b1ddi.inventory.close()
+                log.debug("Inventory run %s", b1ddi.inventory.run_id)
 
     else:
-        logging.error("No config found in {}".format(inifile))
+        logging.error("No config found in %s", inifile)
         exitcode = 2
 
     return exitcode
@@ -0,0 +1,518 @@
+#!/usr/local/bin/python3
+#vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4
+'''
+
+ Description:
+
+    Local stand in for the B1DDI API, implementing the endpoints used by
+    the demo script so that create and clean up can be measured without a
+    live tenant.
+    
+    Objects are kept in memory. Latency, server errors and throttling can
+    be injected. Deleting an IP Space removes everything within it and
+    deleting a zone removes its records, as the API does.
+    
+        Usage: python3 bench/b1ddi_sim.py [--port PORT] [--latency SECS]
+                                          [--error-rate P] [--throttle-rate P]
+                                          [--rate-limit RPS] [--slow-rate P]
+                                          [--slow-latency SECS]
+    
+    Point a bloxone ini file at http://127.0.0.1:PORT with any 32
+    character api_key to run the demo script against it.
+    
+    GET /_sim/stats returns request and object counts and POST /_sim/reset
+    removes all objects.
+
+ Requirements:
+   Python3 with http.server, json and threading modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import argparse
+import collections
+import gzip
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Object types and the fields that must be unique for each
+OBJECT_KEYS = { '/ipam/ip_space': ('name',),
+                '/ipam/address_block': ('space', 'address', 'cidr'),
+                '/ipam/subnet': ('space', 'address', 'cidr'),
+                '/ipam/range': ('space', 'start', 'end'),
+                '/ipam/address': ('space', 'address'),
+                '/dns/view': ('name',),
+                '/dns/auth_nsg': ('name',),
+                '/dns/auth_zone': ('view', 'fqdn'),
+                '/dns/record': () }
+
+# Reference fields that must point to an existing object
+REFERENCES = [ 'space', 'view', 'zone' ]
+
+# Objects removed when their parent is deleted, by reference field
+CHILDREN = { '/ipam/ip_space': ('space', [ '/ipam/address_block', 
+                                           '/ipam/subnet', '/ipam/range',
+                                           '/ipam/address' ]),
+             '/dns/view': ('view', [ '/dns/auth_zone' ]),
+             '/dns/auth_zone': ('zone', [ '/dns/record' ]) }
+
+API_PREFIX = '/api/ddi/'
+NSG = 'b1ddi-auto-demo'
+COMPRESS_MIN = 1024
+
+TOKEN = re.compile(r'\s*(?:(\()|(\))|(and|or)\b|'
+                   r'([\w.]+)\s*(==|!=)\s*"([^"]*)")', re.IGNORECASE)
+
+
+def parse_filter(text):
+    '''
+    Parse an API _filter or _tfilter string of quoted comparisons 
+    combined with and/or and brackets
+
+    Parameters:
+        text (str): Filter string
+
+    Returns:
+        match (func): Called with an object dict, returns bool
+    '''
+    tokens = []
+    pos = 0
+    text = text.strip()
+    if not text:
+        return lambda o: True
+    while pos < len(text):
+        m = TOKEN.match(text, pos)
+        if not m:
+            raise ValueError('Invalid filter at: ' + text[pos:])
+        tokens.append(m.groups())
+        pos = m.end()
+
+    def expression(i):
+        match, i = term(i)
+        while i < len(tokens) and tokens[i][2]:
+            op = tokens[i][2].lower()
+            right, i = term(i + 1)
+            if op == 'and':
+                match = (lambda l, r: lambda o: l(o) and r(o))(match, right)
+            else:
+                match = (lambda l, r: lambda o: l(o) or r(o))(match, right)
+        return match, i
+
+    def term(i):
+        if i >= len(tokens):
+            raise ValueError('Incomplete filter: ' + text)
+        opening, _, _, key, op, value = tokens[i]
+        if opening:
+            match, i = expression(i + 1)
+            if i >= len(tokens) or not tokens[i][1]:
+                raise ValueError('Unbalanced brackets: ' + text)
+            return match, i + 1
+        if key:
+            if op == '==':
+                return (lambda o: str(o.get(key, '')) == value), i + 1
+            return (lambda o: str(o.get(key, '')) != value), i + 1
+        raise ValueError('Invalid filter: ' + text)
+
+    match, i = expression(0)
+    if i != len(tokens):
+        raise ValueError('Invalid filter: ' + text)
+
+    return match
+
+
+class Simulator:
+    '''
+    In memory object store with fault injection
+    '''
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, 
+                 throttle_rate=0.0, rate_limit=0.0, retry_after=1, nsg=NSG,
+                 slow_rate=0.0, slow_latency=1.0):
+        '''
+        Parameters:
+            latency (float): Seconds added to each request
+            jitter (float): Maximum random seconds added to latency
+            slow_rate (float): Probability of a slow (tail latency) response
+            slow_latency (float): Seconds added to slow responses
+            error_rate (float): Probability of a 503 response
+            throttle_rate (float): Probability of a 429 response
+            rate_limit (float): Requests per second allowed, 0 unlimited
+            retry_after (int): Retry-After seconds on 429 responses
+            nsg (str): Name of the Name Server Group to provide
+        '''
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.nsg = nsg
+        self.lock = threading.Lock()
+        self.tokens = rate_limit
+        self.refilled = time.monotonic()
+        self.reset()
+
+        return
+
+
+    def reset(self):
+        '''
+        Remove all objects and counters
+        '''
+        with self.lock:
+            self.objects = { objpath: {} for objpath in OBJECT_KEYS }
+            self.index = { objpath: set() for objpath in OBJECT_KEYS }
+            self.requests = collections.Counter()
+            self.status = collections.Counter()
+            self.first_request = 0.0
+        self.create('/dns/auth_nsg', { 'name': self.nsg })
+
+        return
+
+
+    def stats(self):
+        with self.lock:
+            return { 'requests': dict(self.requests),
+                     'status': { str(k): v for k, v in self.status.items() },
+                     'objects': { k: len(v) for k, v in self.objects.items() },
+                     'total': sum([ len(v) for v in self.objects.values() ]),
+                     'first_request': self.first_request }
+
+
+    def inject(self):
+        '''
+        Apply injected throttling, latency and errors
+
+        Returns:
+            status (int): Status code to fail with or 0
+        '''
+        if self.rate_limit:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.rate_limit, self.tokens + 
+                                  (now - self.refilled) * self.rate_limit)
+                self.refilled = now
+                if self.tokens < 1:
+                    return 429
+                self.tokens -= 1
+        if self.throttle_rate and random.random() < self.throttle_rate:
+            return 429
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+        if self.slow_rate and random.random() < self.slow_rate:
+            time.sleep(self.slow_latency)
+        if self.error_rate and random.random() < self.error_rate:
+            return 503
+
+        return 0
+
+
+    def create(self, objpath, obj):
+        '''
+        Returns:
+            (status, body) tuple
+        '''
+        for field in REFERENCES:
+            if field in obj and not self.find(obj[field]):
+                return 400, error(field + ' ' + str(obj[field]) + ' not found')
+        for nsg in obj.get('nsgs', []):
+            if not self.find(nsg):
+                return 400, error('nsg ' + nsg + ' not found')
+        key = tuple([ str(obj.get(k)) for k in OBJECT_KEYS[objpath] ])
+        with self.lock:
+            if key and key in self.index[objpath]:
+                return 409, error('Object already exists: ' + ','.join(key))
+            obj['id'] = objpath.strip('/') + '/' + str(uuid.uuid4())
+            if key:
+                self.index[objpath].add(key)
+            self.objects[objpath][obj['id']] = obj
+
+        return 201, { 'result': obj }
+
+
+    def find(self, id):
+        objpath = '/' + id.rsplit('/', 1)[0]
+        return self.objects.get(objpath, {}).get(id)
+
+
+    def get(self, objpath, id, params):
+        fields = [ f for f in params.get('_fields', '').split(',') if f ]
+        if id:
+            obj = self.objects[objpath].get(id)
+            if not obj:
+                return 404, error('Object not found: ' + id)
+            return 200, { 'result': select(obj, fields) }
+
+        try:
+            match = parse_filter(params.get('_filter', ''))
+            tmatch = parse_filter(params.get('_tfilter', ''))
+        except ValueError as err:
+            return 400, error(str(err))
+        offset = int(params.get('_offset', 0))
+        limit = int(params.get('_limit', 0)) or None
+        with self.lock:
+            objs = list(self.objects[objpath].values())
+        results = [ select(o, fields) for o in objs
+                    if match(o) and tmatch(o.get('tags') or {}) ]
+        end = offset + limit if limit else None
+
+        return 200, { 'results': results[offset:end] }
+
+
+    def update(self, objpath, id, fields):
+        with self.lock:
+            obj = self.objects[objpath].get(id)
+            if not obj:
+                return 404, error('Object not found: ' + id)
+            fields.pop('id', None)
+            obj.update(fields)
+
+        return 200, { 'result': obj }
+
+
+    def delete(self, objpath, id):
+        with self.lock:
+            if not self.remove(objpath, id):
+                return 404, error('Object not found: ' + id)
+
+        return 200, {}
+
+
+    def remove(self, objpath, id):
+        obj = self.objects[objpath].pop(id, None)
+        if obj:
+            key = tuple([ str(obj.get(k)) for k in OBJECT_KEYS[objpath] ])
+            self.index[objpath].discard(key)
+            field, children = CHILDREN.get(objpath, (None, []))
+            for child in children:
+                for cid in [ c['id'] for c in self.objects[child].values()
+                             if c.get(field) == id ]:
+                    self.remove(child, cid)
+
+        return obj
+
+
+def error(message):
+    return { 'error': [ { 'message': message } ] }
+
+
+def select(obj, fields):
+    if fields:
+        return { k: obj[k] for k in fields if k in obj }
+    return obj
+
+
+class Handler(BaseHTTPRequestHandler):
+    '''
+    Route requests to the simulator
+    '''
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, avoid delayed ACK stalls
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        return
+
+
+    def reply(self, status, body=None):
+        sim = self.server.sim
+        data = json.dumps(body).encode() if body is not None else b''
+        headers = { 'Content-Type': 'application/json' }
+        if status == 429:
+            headers['Retry-After'] = str(sim.retry_after)
+        if (len(data) >= COMPRESS_MIN and 
+            'gzip' in self.headers.get('Accept-Encoding', '')):
+            data = gzip.compress(data, compresslevel=1)
+            headers['Content-Encoding'] = 'gzip'
+        headers['Content-Length'] = str(len(data))
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+        with sim.lock:
+            sim.status[status] += 1
+
+        return
+
+
+    def route(self, method):
+        sim = self.server.sim
+        url = urllib.parse.urlsplit(self.path)
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b''
+
+        # Simulator control
+        if url.path == '/_sim/stats':
+            return self.reply(200, sim.stats())
+        elif url.path == '/_sim/reset':
+            sim.reset()
+            return self.reply(200, {})
+
+        # /api/ddi/<version>/<area>/<object>[/<id>]
+        parts = url.path.split(API_PREFIX, 1)[-1].split('/')
+        objpath = '/' + '/'.join(parts[1:3])
+        if not url.path.startswith(API_PREFIX) or objpath not in OBJECT_KEYS:
+            return self.reply(404, error('Unknown endpoint: ' + url.path))
+        id = objpath.strip('/') + '/' + parts[3] if len(parts) > 3 else ''
+        with sim.lock:
+            sim.requests[method + ' ' + objpath] += 1
+            if not sim.first_request:
+                # Wall clock, to compare with the client's start time
+                sim.first_request = time.time()
+
+        status = sim.inject()
+        if status:
+            return self.reply(status, error('Injected failure'))
+
+        if method == 'GET':
+            params = { k: v[0] for k, v in 
+                       urllib.parse.parse_qs(url.query).items() }
+            return self.reply(*sim.get(objpath, id, params))
+        elif method == 'POST' and not id:
+            try:
+                obj = json.loads(body)
+            except ValueError:
+                return self.reply(400, error('Invalid JSON body'))
+            return self.reply(*sim.create(objpath, obj))
+        elif method == 'PATCH' and id:
+            try:
+                fields = json.loads(body)
+            except ValueError:
+                return self.reply(400, error('Invalid JSON body'))
+            return self.reply(*sim.update(objpath, id, fields))
+        elif method == 'DELETE' and id:
+            return self.reply(*sim.delete(objpath, id))
+
+        return self.reply(405, error('Method not supported'))
+
+
+    def do_GET(self):
+        self.route('GET')
+
+    def do_POST(self):
+        self.route('POST')
+
+    def do_PATCH(self):
+        self.route('PATCH')
+
+    def do_DELETE(self):
+        self.route('DELETE')
+
+
+def make_server(port=0, host='127.0.0.1', **options):
+    '''
+    Create a simulator server
+
+    Parameters:
+        port (int): Port to listen on, 0 for any free port
+        host (str): Address to listen on
+        **options: Simulator options, e.g. latency=0.05
+
+    Returns:
+        server (obj): ThreadingHTTPServer with a sim attribute
+    '''
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.sim = Simulator(**options)
+
+    return server
+
+
+def serve(port=0, ready=None, **options):
+    '''
+    Run a simulator until interrupted
+
+    Parameters:
+        port (int): Port to listen on, 0 for any free port
+        ready (obj): Optional queue to put the port on once listening
+        **options: Simulator options
+    '''
+    server = make_server(port, **options)
+    if ready:
+        ready.put(server.server_port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+    return
+
+
+def main():
+    parse = argparse.ArgumentParser(description='B1DDI API simulator')
+    parse.add_argument('--port', type=int, default=8080,
+                       help="Port to listen on")
+    parse.add_argument('--latency', type=float, default=0.0,
+                       help="Seconds added to each request")
+    parse.add_argument('--jitter', type=float, default=0.0,
+                       help="Maximum random seconds added to latency")
+    parse.add_argument('--error-rate', type=float, default=0.0,
+                       help="Probability of a 503 response")
+    parse.add_argument('--throttle-rate', type=float, default=0.0,
+                       help="Probability of a 429 response")
+    parse.add_argument('--rate-limit', type=float, default=0.0,
+                       help="Requests per second allowed, 0 unlimited")
+    parse.add_argument('--slow-rate', type=float, default=0.0,
+                       help="Probability of a slow response")
+    parse.add_argument('--slow-latency', type=float, default=1.0,
+                       help="Seconds added to slow responses")
+    parse.add_argument('--nsg', type=str, default=NSG,
+                       help="Name Server Group to provide")
+    args = parse.parse_args()
+
+    print('B1DDI simulator listening on http://127.0.0.1:{}'.format(args.port))
+    serve(args.port, latency=args.latency, jitter=args.jitter,
+          error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+          rate_limit=args.rate_limit, nsg=args.nsg, 
+          slow_rate=args.slow_rate, slow_latency=args.slow_latency)
+
+    return
+
+
+### Main ###
+if __name__ == '__main__':
+    main()
+## End Main ###
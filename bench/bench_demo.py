@@ -0,0 +1,263 @@
+#!/usr/local/bin/python3
+#vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4
+'''
+
+ Description:
+
+    Benchmark create and clean up of the demo data against the local
+    B1DDI simulator (bench/b1ddi_sim.py), reporting wall time and objects
+    per second for each scale.
+    
+    The simulator runs in a separate process so that it does not compete
+    with the client for the interpreter lock.
+    
+        Usage: python3 bench/bench_demo.py [-s SCALE [SCALE ...]] [-w WORKERS]
+                                           [--record-window N] [--rate RPS]
+                                           [--latency SECS] [--error-rate P]
+                                           [--throttle-rate P] [--slow-rate P]
+                                           [--slow-latency SECS] [--hedge]
+                                           [--json]
+
+ Requirements:
+   Python3 with bloxone, multiprocessing and requests modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import bloxone
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import b1ddi_demo_automation as demo
+import b1ddi_sim
+
+# Demo sizes: (no_of_networks, no_of_ips, no_of_records)
+SCALES = { 'small': (10, 5, 100),
+           'medium': (50, 20, 1000),
+           'large': (200, 40, 5000) }
+
+B1INI = '''[BloxOne]
+url = 'http://127.0.0.1:{port}'
+api_version = 'v1'
+api_key = '{key}'
+'''
+
+DEMOINI = '''[B1DDI_Demo]
+b1inifile = {b1ini}
+owner = bench
+location = lab
+customer = {scale}
+postfix = %(customer)s
+tld = com
+dns_view = %(owner)s-%(postfix)s-view
+dns_domain = %(customer)s.%(tld)s
+nsg = {nsg}
+no_of_records = {records}
+ip_space = %(owner)s-%(postfix)s-demo
+no_of_networks = {networks}
+no_of_ips = {ips}
+base_net = 10.0.0.0
+container_cidr = 16
+cidr = 24
+net_comments = Office Network, VoIP Network, POS Network, Guest WiFI
+'''
+
+
+def start_simulator(**options):
+    '''
+    Start the simulator in a child process
+
+    Returns:
+        (process, port) tuple
+    '''
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=b1ddi_sim.serve, 
+                                      kwargs=dict(options, ready=ready),
+                                      daemon=True)
+    process.start()
+    port = ready.get(timeout=10)
+
+    return process, port
+
+
+def sim_stats(port):
+    return requests.get('http://127.0.0.1:{}/_sim/stats'.format(port)).json()
+
+
+def write_config(tmpdir, port, scale):
+    '''
+    Write bloxone and demo ini files for a scale
+
+    Returns:
+        config (dict): Demo config
+    '''
+    networks, ips, records = SCALES[scale]
+    b1ini = os.path.join(tmpdir, 'bloxone.ini')
+    demoini = os.path.join(tmpdir, scale + '.ini')
+    with open(b1ini, 'w') as f:
+        f.write(B1INI.format(port=port, key='0' * 32))
+    with open(demoini, 'w') as f:
+        f.write(DEMOINI.format(b1ini=b1ini, scale=scale, nsg=b1ddi_sim.NSG,
+                               networks=networks, ips=ips, records=records))
+
+    return demo.read_demo_ini(demoini)
+
+
+def run_phase(func, config, port, remove=False):
+    '''
+    Time create_demo or clean_up with a new client
+
+    Returns:
+        result (dict): Phase measurements
+    '''
+    b1ddi = demo.setup_client(bloxone.b1ddi(config['b1inifile']), config,
+                              remove=remove)
+    before = sim_stats(port)
+    start = time.perf_counter()
+    exitcode = func(b1ddi, config)
+    elapsed = time.perf_counter() - start
+    after = sim_stats(port)
+    if hasattr(b1ddi, 'inventory'):
+        b1ddi.inventory.finish_run(exitcode)
+        b1ddi.inventory.close()
+    if hasattr(b1ddi, 'hedger'):
+        b1ddi.hedger.close()
+    objects = abs(after['total'] - before['total'])
+    requests_made = (sum(after['requests'].values()) - 
+                     sum(before['requests'].values()))
+    result = { 'exitcode': exitcode,
+               'objects': objects,
+               'requests': requests_made,
+               'seconds': round(elapsed, 3),
+               'objects_per_sec': round(objects / elapsed, 1) if elapsed else 0,
+               'retries': (b1ddi.retry_policy.retries 
+                           if hasattr(b1ddi, 'retry_policy') else 0),
+               'connections': b1ddi.transport.pool_stats()['connections'] }
+
+    return result
+
+
+def main():
+    '''
+    Run the benchmark for each scale and print the results
+    '''
+    parse = argparse.ArgumentParser(description='Demo create/clean up '
+                                    'benchmark against the B1DDI simulator')
+    parse.add_argument('-s', '--scale', nargs='+', default=['small', 'medium'],
+                       choices=list(SCALES.keys()), help="Scales to run")
+    parse.add_argument('-w', '--workers', type=int, default=1,
+                       help="Number of concurrent API workers")
+    parse.add_argument('--record-window', type=int, default=1,
+                       help="Maximum DNS record creates in flight")
+    parse.add_argument('--rate', type=float, default=0,
+                       help="Client request rate, 0 disables rate control")
+    parse.add_argument('--retries', type=int, default=4,
+                       help="Maximum attempts for failed requests, 0 disables")
+    parse.add_argument('--latency', type=float, default=0.0,
+                       help="Simulated seconds per request")
+    parse.add_argument('--jitter', type=float, default=0.0,
+                       help="Simulated random extra seconds per request")
+    parse.add_argument('--error-rate', type=float, default=0.0,
+                       help="Probability of a simulated 503")
+    parse.add_argument('--throttle-rate', type=float, default=0.0,
+                       help="Probability of a simulated 429")
+    parse.add_argument('--rate-limit', type=float, default=0.0,
+                       help="Simulated tenant requests per second")
+    parse.add_argument('--slow-rate', type=float, default=0.0,
+                       help="Probability of a simulated slow response")
+    parse.add_argument('--slow-latency', type=float, default=1.0,
+                       help="Simulated seconds added to slow responses")
+    parse.add_argument('--hedge', action='store_true',
+                       help="Resend slow reads")
+    parse.add_argument('--json', action='store_true',
+                       help="Output results as JSON")
+    args = parse.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    process, port = start_simulator(latency=args.latency, jitter=args.jitter,
+                                    error_rate=args.error_rate,
+                                    throttle_rate=args.throttle_rate,
+                                    rate_limit=args.rate_limit,
+                                    slow_rate=args.slow_rate,
+                                    slow_latency=args.slow_latency)
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for scale in args.scale:
+                requests.post('http://127.0.0.1:{}/_sim/reset'.format(port))
+                config = write_config(tmpdir, port, scale)
+                config['workers'] = str(args.workers)
+                config['record_window'] = str(args.record_window)
+                config['rate'] = str(args.rate)
+                config['retries'] = str(args.retries)
+                config['hedge'] = 'true' if args.hedge else 'false'
+                # Keep each scale's inventory with its ini files
+                config['inventory'] = os.path.join(tmpdir, 
+                                                   scale + '.sqlite')
+                for phase, func, remove in [ ('create', demo.create_demo, False),
+                                             ('teardown', demo.clean_up, True) ]:
+                    result = run_phase(func, config, port, remove=remove)
+                    result.update(scale=scale, phase=phase)
+                    results.append(result)
+    finally:
+        process.terminate()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print('{:<8} {:<9} {:>8} {:>9} {:>9} {:>10} {:>8} {:>5}'
+              .format('scale', 'phase', 'objects', 'requests', 'seconds', 
+                      'objects/s', 'retries', 'exit'))
+        for r in results:
+            print('{scale:<8} {phase:<9} {objects:>8} {requests:>9} '
+                  '{seconds:>9.2f} {objects_per_sec:>10,.1f} {retries:>8} '
+                  '{exitcode:>5}'.format(**r))
+
+    return
+
+
+### Main ###
+if __name__ == '__main__':
+    main()
+## End Main ###
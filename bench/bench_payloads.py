@@ -0,0 +1,143 @@
+#!/usr/local/bin/python3
+#vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4
+'''
+
+ Description:
+
+    Microbenchmark for request body building, comparing per object
+    string concatenation (with create_tag_body() per object) against the
+    precompiled b1ddi_demo.payloads builder
+    
+    Usage: python3 bench/bench_payloads.py [-n COUNT]
+
+ Requirements:
+   Python3 with timeit module
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from b1ddi_demo import payloads
+
+CONFIG = { 'owner': 'bench', 'location': 'lab' }
+SPACE = 'ipam/ip_space/38b941b5-098a-11eb-baaa-26b14d489ac1'
+ZONE = 'dns/auth_zone/7d7a3e1c-2f0e-11eb-9b4f-4e2b1f0c7d11'
+
+
+def legacy_subnet(n):
+    tag_body = payloads.tag_body(CONFIG)
+    return ( '{ "address": "' + '10.0.' + str(n % 256) + '.0' + '", '
+            + '"cidr": "' + '24' + '", '
+            + '"space": "' + SPACE + '", '
+            + '"comment": "' + 'Office Network' + '", '
+            + tag_body + ' }' )
+
+
+def legacy_range(n):
+    tag_body = payloads.tag_body(CONFIG)
+    return ( '{ "start": "' + '10.0.0.126' + '", "end": "' + '10.0.0.254' +
+            '", "space": "' + SPACE + '", '  + tag_body + ' }' )
+
+
+def legacy_address(n):
+    tag_body = payloads.tag_body(CONFIG)
+    return ( '{ "address": "' + '10.0.0.' + str(n % 256) + '", "space": "' 
+            + SPACE + '", '  + tag_body + ' }' )
+
+
+def legacy_record(n):
+    tag_body = payloads.tag_body(CONFIG)
+    return ( '{"name_in_zone":"' + 'host' + str(n) + '",' +
+             '"zone": "' + ZONE + '",' +
+             '"type": "A", ' +
+             '"rdata": {"address": "' + '10.0.0.' + str(n % 256) + '"}, ' +
+             '"options": {"create_ptr": true},' + 
+             '"inheritance_sources": ' +
+             '{"ttl": {"action": "inherit"}}, ' +
+             tag_body + ' }' )
+
+
+def main():
+    '''
+    Run benchmark and print bodies per second
+    '''
+    parse = argparse.ArgumentParser(description='Payload builder benchmark')
+    parse.add_argument('-n', '--count', type=int, default=100000,
+                       help="Number of bodies per test")
+    args = parse.parse_args()
+    n = args.count
+
+    builder = payloads.PayloadBuilder(CONFIG)
+    tests = {
+        'subnet': (legacy_subnet, 
+                   lambda i: builder.subnet('10.0.' + str(i % 256) + '.0', 
+                                            '24', SPACE, 'Office Network')),
+        'range': (legacy_range,
+                  lambda i: builder.range('10.0.0.126', '10.0.0.254', SPACE)),
+        'address': (legacy_address,
+                    lambda i: builder.address('10.0.0.' + str(i % 256), 
+                                              SPACE)),
+        'record': (legacy_record,
+                   lambda i: builder.a_record('host' + str(i), ZONE,
+                                              '10.0.0.' + str(i % 256))),
+    }
+
+    print('{:<10} {:>16} {:>16} {:>8}'
+          .format('object', 'legacy bodies/s', 'builder bodies/s', 'speedup'))
+    for name, (legacy, fast) in tests.items():
+        # Sanity check the bodies are equivalent (ignoring timestamp)
+        old, new = json.loads(legacy(1)), json.loads(fast(1))
+        old['tags'].pop('Created')
+        new['tags'].pop('Created')
+        assert old == new, name
+        t_old = timeit.timeit(lambda: [ legacy(i) for i in range(n) ], number=1)
+        t_new = timeit.timeit(lambda: [ fast(i) for i in range(n) ], number=1)
+        print('{:<10} {:>16,.0f} {:>16,.0f} {:>7.1f}x'
+              .format(name, n / t_old, n / t_new, t_old / t_new))
+
+    return
+
+
+### Main ###
+if __name__ == '__main__':
+    main()
+## End Main ###
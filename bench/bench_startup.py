@@ -0,0 +1,183 @@
+#!/usr/local/bin/python3
+#vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4
+'''
+
+ Description:
+
+    Benchmark start up of the demo script, each run in a new interpreter:
+    import time of the script, wall time of --help and of a dry run, and the
+    time from starting a create until the first API request reaches the
+    local B1DDI simulator (bench/b1ddi_sim.py).
+    
+    Optional budgets, in milliseconds, fail the benchmark if the median
+    import or first request time exceeds them, for use in automated checks.
+
+ Requirements:
+   Python3 with argparse, json, os, statistics, subprocess, sys, tempfile and
+   time modules
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import requests
+
+import bench_demo
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, 'b1ddi_demo_automation.py')
+
+IMPORT_CODE = ('import time; start = time.perf_counter(); '
+               'import b1ddi_demo_automation; '
+               'print(time.perf_counter() - start)')
+
+
+def write_config(tmpdir, port):
+    '''
+    Write bloxone and demo ini files for a minimal demo
+
+    Returns:
+        demoini (str): Demo ini filename
+    '''
+    b1ini = os.path.join(tmpdir, 'bloxone.ini')
+    demoini = os.path.join(tmpdir, 'startup.ini')
+    with open(b1ini, 'w') as f:
+        f.write(bench_demo.B1INI.format(port=port, key='0' * 32))
+    with open(demoini, 'w') as f:
+        f.write(bench_demo.DEMOINI.format(b1ini=b1ini, scale='startup', 
+                                          nsg=bench_demo.b1ddi_sim.NSG,
+                                          networks=1, ips=2, records=1))
+        f.write("plan_cache = {}\n".format(os.path.join(tmpdir, 'plans')))
+
+    return demoini
+
+
+def run(args, cwd):
+    '''
+    Run the script in a new interpreter
+
+    Returns:
+        (start, seconds, stdout) tuple, start is the wall clock time
+    '''
+    start = time.time()
+    timer = time.perf_counter()
+    output = subprocess.run([ sys.executable ] + args, cwd=cwd, check=True,
+                            stdout=subprocess.PIPE, 
+                            stderr=subprocess.DEVNULL).stdout
+    
+    return start, time.perf_counter() - timer, output
+
+
+def summary(samples):
+    '''
+    Median and minimum of samples, in milliseconds
+    '''
+    return { 'median_ms': round(statistics.median(samples) * 1000, 1),
+             'min_ms': round(min(samples) * 1000, 1) }
+
+
+def main():
+    '''
+    Run the start up benchmarks and print the results
+    '''
+    parse = argparse.ArgumentParser(description='Demo script start up '
+                                    'benchmark')
+    parse.add_argument('-n', '--runs', type=int, default=5,
+                       help="Runs of each measurement")
+    parse.add_argument('--import-budget', type=float, default=0,
+                       help="Maximum median import time in ms, 0 for none")
+    parse.add_argument('--first-request-budget', type=float, default=0,
+                       help="Maximum median time to first request in ms, "
+                            "0 for none")
+    parse.add_argument('--json', action='store_true',
+                       help="Output results as JSON")
+    args = parse.parse_args()
+
+    samples = { 'import': [], 'help': [], 'dry_run': [], 
+                'first_request': [], 'create': [] }
+    process, port = bench_demo.start_simulator()
+    sim_url = 'http://127.0.0.1:{}/_sim/'.format(port)
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            demoini = write_config(tmpdir, port)
+            for n in range(args.runs):
+                output = run([ '-c', IMPORT_CODE ], ROOT)[2]
+                samples['import'].append(float(output))
+                samples['help'].append(run([ SCRIPT, '--help' ], tmpdir)[1])
+                samples['dry_run'].append(
+                    run([ SCRIPT, '-c', demoini, '-n' ], tmpdir)[1])
+                requests.post(sim_url + 'reset')
+                start, seconds, output = run([ SCRIPT, '-c', demoini ], 
+                                             tmpdir)
+                first = requests.get(sim_url + 'stats').json()['first_request']
+                samples['first_request'].append(first - start)
+                samples['create'].append(seconds)
+    finally:
+        process.terminate()
+
+    results = { name: summary(values) for name, values in samples.items() }
+    failed = []
+    if (args.import_budget and 
+        results['import']['median_ms'] > args.import_budget):
+        failed.append('import')
+    if (args.first_request_budget and 
+        results['first_request']['median_ms'] > args.first_request_budget):
+        failed.append('first_request')
+
+    if args.json:
+        print(json.dumps(dict(results, over_budget=failed), indent=2))
+    else:
+        print('{:<14} {:>10} {:>10}'.format('measure', 'median ms', 'min ms'))
+        for name, r in results.items():
+            print('{:<14} {median_ms:>10.1f} {min_ms:>10.1f}'
+                  .format(name, **r))
+        for name in failed:
+            print("Over budget: {}".format(name))
+
+    return 1 if failed else 0
+
+
+### Main ###
+if __name__ == '__main__':
+    sys.exit(main())
+## End Main ###
@@ -0,0 +1,97 @@
+'''
+
+ Description:
+
+    Shared pytest setup, making the b1ddi_demo package and the bench
+    simulator importable from the tests
+
+ Requirements:
+   Python3 with pytest
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import os
+import sys
+import pytest
+
+# Global Variables
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for path in [ ROOT, os.path.join(ROOT, 'bench') ]:
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import bench_demo
+
+
+@pytest.fixture
+def demo_config(tmp_path):
+    '''
+    Config for the small benchmark demo, written to a temporary 
+    directory, without an inventory
+    '''
+    config = bench_demo.write_config(str(tmp_path), 0, 'small')
+    config['inventory'] = ''
+
+    return config
+
+
+class FakeClock:
+    '''
+    Replacement for time.monotonic() and time.sleep(), sleeping 
+    advances the clock immediately
+    '''
+
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.slept = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+        self.slept += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr('time.monotonic', fake.monotonic)
+    monkeypatch.setattr('time.sleep', fake.sleep)
+
+    return fake
@@ -0,0 +1,105 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.addressing
+
+ Requirements:
+   Python3 with pytest
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import ipaddress
+from b1ddi_demo import addressing
+
+
+def test_int_conversion_round_trip():
+    for ip in [ '0.0.0.0', '10.1.2.3', '192.168.255.254', '255.255.255.255' ]:
+        n = addressing.ip_to_int(ip)
+        assert n == int(ipaddress.ip_address(ip))
+        assert addressing.int_to_ip(n) == ip
+
+
+def test_validate_ip():
+    assert addressing.validate_ip('192.168.0.1')
+    assert addressing.validate_ip('2001:db8::1')
+    assert not addressing.validate_ip('192.168.0.256')
+    assert not addressing.validate_ip('demo')
+
+
+def test_reverse_zone():
+    n = addressing.ip_to_int('192.168.10.0')
+    assert addressing.reverse_zone(n) == '168.192.in-addr.arpa.'
+
+
+def test_parent_subnet():
+    assert addressing.parent_subnet('10.1.2.200', 24) == '10.1.2.0/24'
+    assert addressing.parent_subnet('10.1.2.200', '26') == '10.1.2.192/26'
+
+
+def test_subnets_match_ipaddress():
+    expected = list(ipaddress.ip_network('10.0.0.0/16').subnets(new_prefix=24))
+    subnets = list(addressing.iter_subnets('10.0.0.0', 16, 24))
+
+    assert addressing.subnet_count('10.0.0.0', 16, 24) == 256
+    assert subnets == expected
+
+
+def test_subnet_ranges():
+    all_subnets = list(addressing.iter_subnets('10.0.0.0', 16, 24))
+    batch = addressing.subnet_batch('10.0.0.0', 16, 24, start=10, stop=20)
+
+    assert len(batch) == 10
+    assert list(addressing.iter_subnets('10.0.0.0', 16, 24, 10, 20)) == \
+           all_subnets[10:20]
+    # Stop is limited to the subnets in the container
+    assert len(addressing.subnet_batch('10.0.0.0', 16, 24, 250, 1000)) == 6
+
+
+def test_range_bounds():
+    network = ipaddress.ip_network('192.168.1.0/24')
+    assert addressing.range_bounds(network) == ('192.168.1.126', 
+                                                '192.168.1.254')
+
+
+def test_reservations():
+    network = ipaddress.ip_network('192.168.1.0/24')
+    assert addressing.reservation_count(network, 10) == 10
+    assert addressing.reservation_count(network, '500') == 64
+    assert list(addressing.reservation_addresses(network, 4)) == \
+           [ '192.168.1.2', '192.168.1.3', '192.168.1.4' ]
+    assert addressing.host_address(network, 5) == '192.168.1.5'
@@ -0,0 +1,149 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.batch
+
+ Requirements:
+   Python3 with pytest
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import concurrent.futures
+import threading
+import time
+import pytest
+from b1ddi_demo import batch
+
+URL = 'https://csp.infoblox.com/api/ddi/v1/ipam/subnet'
+
+
+class Counter:
+    '''
+    Peak number of requests in flight
+    '''
+
+    def __init__(self):
+        self.inflight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def enter(self):
+        with self.lock:
+            self.inflight += 1
+            self.peak = max(self.peak, self.inflight)
+
+    def leave(self):
+        with self.lock:
+            self.inflight -= 1
+
+
+class FakeAPI:
+    '''
+    Stand in for the bloxone request methods counting the requests in
+    flight for the tenant and across all tenants
+    '''
+
+    def __init__(self, tenant, total):
+        self.counters = [ tenant, total ]
+
+    def _request(self, url, *args, **kwargs):
+        for counter in self.counters:
+            counter.enter()
+        time.sleep(0.01)
+        for counter in self.counters:
+            counter.leave()
+        return url
+
+    _apiget = _apipost = _apidelete = _apiput = _apipatch = _request
+
+
+def config(b1inifile, rate='0'):
+    return { 'b1inifile': b1inifile, 'rate': rate, 'max_rate': '0',
+             'rate_increase': '5' }
+
+
+def test_demo_sections(tmp_path):
+    path = tmp_path / 'batch.ini'
+    path.write_text('[B1DDI_Demo:acme]\n[B1DDI_Demo:globex]\n[BloxOne]\n')
+
+    assert batch.demo_sections(str(path)) == [ 'B1DDI_Demo:acme', 
+                                               'B1DDI_Demo:globex' ]
+    assert batch.demo_label('demo.ini', 'B1DDI_Demo') == 'demo.ini'
+    assert batch.demo_label('demo.ini', 'B1DDI_Demo:acme') == 'demo.ini:acme'
+
+
+def test_tenants_shared_by_b1inifile():
+    runner = batch.Batch(None, tenant_inflight=2)
+    first = runner.tenant(config('a.ini', rate='20'))
+
+    assert runner.tenant(config('a.ini', rate='50')) is first
+    assert runner.tenant(config('b.ini')) is not first
+    # The first demo for a tenant sets its rate
+    assert first.controller.rate == 20
+    assert runner.tenant(config('b.ini')).controller is None
+
+
+def test_budgets_limit_requests_in_flight():
+    runner = batch.Batch(None, inflight=3, tenant_inflight=2)
+    total = Counter()
+    tenants = {}
+    apis = []
+    for name in [ 'a.ini', 'b.ini' ]:
+        tenants[name] = Counter()
+        for demo in range(2):
+            api = FakeAPI(tenants[name], total)
+            batch.install_budget(api, runner, runner.tenant(config(name)))
+            apis.append(api)
+
+    with concurrent.futures.ThreadPoolExecutor(16) as pool:
+        list(pool.map(lambda n: apis[n % 4]._apiget(URL), range(64)))
+
+    assert total.peak == 3
+    assert all([ counter.peak == 2 for counter in tenants.values() ])
+    assert apis[0].tenant is apis[1].tenant
+    assert apis[0].tenant is not apis[2].tenant
+
+
+def test_global_rate(clock):
+    budget = batch.Budget(rate=10)
+    for n in range(30):
+        budget.acquire()
+        budget.release()
+
+    # The first 10 requests are a burst, the rest are held to 10/s
+    assert clock.slept == pytest.approx(2.0)
@@ -0,0 +1,130 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.export
+
+ Requirements:
+   Python3 with pytest
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import collections
+import csv
+import json
+import os
+import pytest
+import b1ddi_demo_automation as demo
+from b1ddi_demo import export
+
+
+def write(directory, count, **kwargs):
+    output = export.ExportFile(str(directory), '/ipam/ip_space', **kwargs)
+    for n in range(count):
+        output.write(json.dumps({ 'name': 'space-' + str(n), 
+                                  'tags': { 'n': n } }))
+    return output.close()
+
+
+def read_csv(filename):
+    with open(filename, newline='') as f:
+        return list(csv.reader(f))
+
+
+@pytest.mark.parametrize('chunk', [ 1, 2, 100 ])
+def test_split_on_rows_per_file(tmp_path, chunk):
+    files = write(tmp_path, 8, chunk=chunk, rows_per_file=3)
+
+    assert [ (os.path.basename(f), rows) for f, rows in files ] == \
+           [ ('ip_space-0001.csv', 3), ('ip_space-0002.csv', 3), 
+             ('ip_space-0003.csv', 2) ]
+    rows = []
+    for filename, count in files:
+        content = read_csv(filename)
+        assert content[0] == [ 'name', 'tags' ]
+        assert len(content) == count + 1
+        rows += content[1:]
+    assert [ row[0] for row in rows ] == [ 'space-' + str(n) 
+                                           for n in range(8) ]
+    assert json.loads(rows[7][1]) == { 'n': 7 }
+    assert sorted(os.listdir(tmp_path)) == [ os.path.basename(f) 
+                                             for f, rows in files ]
+
+
+def test_exact_multiple_leaves_no_empty_file(tmp_path):
+    files = write(tmp_path, 6, chunk=4, rows_per_file=3)
+
+    assert [ rows for f, rows in files ] == [ 3, 3 ]
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_no_limit(tmp_path):
+    files = write(tmp_path, 25, chunk=10)
+
+    assert files == [ (str(tmp_path / 'ip_space.csv'), 25) ]
+
+
+def test_json_lines(tmp_path):
+    files = write(tmp_path, 5, format='json', rows_per_file=2)
+
+    assert [ os.path.basename(f) for f, rows in files ] == \
+           [ 'ip_space-0001.jsonl', 'ip_space-0002.jsonl', 
+             'ip_space-0003.jsonl' ]
+    with open(files[2][0]) as f:
+        assert [ json.loads(line)['name'] for line in f ] == [ 'space-4' ]
+
+
+def test_export_plan(demo_config, tmp_path):
+    creates = collections.Counter([ e['objpath'] 
+                                    for e in demo.plan_demo(demo_config)
+                                    if e['op'] == 'create' ])
+    files = export.export(demo.plan_demo(demo_config), str(tmp_path),
+                          rows_per_file=7, now='2026-01-01T00:00:00Z')
+    rows = collections.Counter()
+    for objpath, filename, count in files:
+        rows[objpath] += count
+        assert count <= 7
+
+    assert rows == creates
+    # Files are in import order
+    order = list(export.FILES)
+    assert [ order.index(f[0]) for f in files ] == \
+           sorted([ order.index(f[0]) for f in files ])
+    # References are replaced by names
+    subnet = read_csv(str(tmp_path / 'subnet-0001.csv'))[1]
+    assert subnet[2] == demo_config['ip_space']
+    assert '2026-01-01T00:00:00Z' in subnet[4]
@@ -0,0 +1,162 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.hedge
+
+ Requirements:
+   Python3 with pytest and requests
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import io
+import itertools
+import time
+import pytest
+from b1ddi_demo import hedge
+from b1ddi_demo import retry
+
+URL = 'https://csp.infoblox.com/api/ddi/v1/ipam/subnet'
+
+
+class FakeAPI:
+    '''
+    Stand in for the bloxone request methods, the first GET takes 
+    'slow' seconds
+    '''
+
+    def __init__(self, slow=0.0):
+        self.slow = slow
+        self.calls = itertools.count()
+        self.methods = []
+
+    def _request(self, method, url, *args, **kwargs):
+        if method == 'GET' and next(self.calls) == 0:
+            time.sleep(self.slow)
+        self.methods.append(method)
+        response = retry.error_response('ok', status_code=200)
+        response.raw = io.BytesIO()
+        return response
+
+    def _apiget(self, url, *args, **kwargs):
+        return self._request('GET', url, *args, **kwargs)
+
+    def _apipost(self, url, *args, **kwargs):
+        return self._request('POST', url, *args, **kwargs)
+
+    _apidelete = _apiput = _apipatch = _apipost
+
+
+@pytest.fixture
+def hedger():
+    hedger = hedge.Hedger(delay=0.05, budget=0.1, burst=2)
+    yield hedger
+    hedger.close()
+
+
+def install(api, hedger):
+    hedge.install_timer(api, hedger)
+    hedge.install_hedging(api, hedger)
+    return api
+
+
+def test_allow_within_budget(hedger):
+    assert hedger.allow()
+    assert hedger.allow()
+    assert not hedger.allow()
+
+    hedger.requests = 100
+    assert sum([ hedger.allow() for n in range(20) ]) == 10
+    assert hedger.hedged == 12
+
+
+def test_delay_uses_endpoint_then_overall_percentile(hedger):
+    assert hedger.delay('/ipam/subnet') == 0.05
+
+    for n in range(hedge.MIN_SAMPLES):
+        hedger.record('/ipam/address', 0.2)
+    assert hedger.delay('/ipam/subnet') == pytest.approx(0.2, rel=0.05)
+
+    for n in range(hedge.MIN_SAMPLES):
+        hedger.record('/ipam/subnet', 0.01)
+    assert hedger.delay('/ipam/subnet') == pytest.approx(0.01, rel=0.05)
+
+    hedger.record('/dns/record', 0.0)
+    assert hedger.min_delay <= hedger.delay('/ipam/subnet')
+
+
+def test_slow_read_is_hedged(hedger):
+    api = install(FakeAPI(slow=2.0), hedger)
+    start = time.perf_counter()
+    response = api._apiget(URL)
+
+    assert response.status_code == 200
+    assert time.perf_counter() - start < 1.0
+    assert hedger.hedged == 1 and hedger.wins == 1
+
+
+def test_fast_read_and_writes_not_hedged(hedger):
+    api = install(FakeAPI(), hedger)
+    api._apiget(URL)
+    api._apipost(URL)
+
+    assert hedger.requests == 1
+    assert hedger.hedged == 0
+    assert hedger.latency['/ipam/subnet'].count == 1
+    assert api.methods == [ 'GET', 'POST' ]
+
+
+def test_delay_starts_when_read_is_sent(hedger):
+    # A wait before the timer, as in the rate limiter, is not hedged
+    api = FakeAPI()
+    hedge.install_timer(api, hedger)
+    get = api._apiget
+    api._apiget = lambda url, *a, **kw: time.sleep(0.2) or get(url, *a, **kw)
+    hedge.install_hedging(api, hedger)
+    api._apiget(URL)
+
+    assert hedger.hedged == 0
+    assert hedger.latency[''].max < 0.1
+
+
+def test_close_stops_threads():
+    hedger = hedge.Hedger()
+    install(FakeAPI(), hedger)._apiget(URL)
+    hedger.close()
+
+    with pytest.raises(RuntimeError):
+        hedger.executor.submit(time.sleep, 0)
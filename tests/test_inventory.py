@@ -0,0 +1,145 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.inventory
+
+ Requirements:
+   Python3 with pytest
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import pytest
+from b1ddi_demo import inventory
+
+CONFIG = { 'customer': 'acme', 'ip_space': 'acme-demo', 
+           'dns_view': 'acme-view' }
+
+SPACE = 'ipam/ip_space/1'
+VIEW = 'dns/view/1'
+ZONE = 'dns/auth_zone/1'
+
+# (objpath, result) for a small demo
+CREATED = [ ('/ipam/ip_space', { 'id': SPACE, 'name': 'acme-demo' }),
+            ('/ipam/subnet', { 'id': 'ipam/subnet/1', 'space': SPACE,
+                               'address': '10.0.0.0', 'cidr': 24 }),
+            ('/ipam/subnet', { 'id': 'ipam/subnet/2', 'space': SPACE,
+                               'address': '10.0.1.0', 'cidr': 24 }),
+            ('/ipam/range', { 'id': 'ipam/range/1', 'space': SPACE,
+                              'start': '10.0.0.126', 'end': '10.0.0.254' }),
+            ('/ipam/address', { 'id': 'ipam/address/1', 'space': SPACE,
+                                'address': '10.0.0.2' }),
+            ('/ipam/address', { 'id': 'ipam/address/2', 'space': SPACE,
+                                'address': '10.0.1.2' }),
+            ('/dns/view', { 'id': VIEW, 'name': 'acme-view' }),
+            ('/dns/auth_zone', { 'id': ZONE, 'view': VIEW, 
+                                 'fqdn': 'acme.com.' }),
+            ('/dns/record', { 'id': 'dns/record/1', 'zone': ZONE,
+                              'name_in_zone': 'host1' }) ]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = inventory.Inventory(str(tmp_path / 'inventory.sqlite'), 
+                                batch_size=4)
+    store.start_run(CONFIG)
+    for objpath, result in CREATED:
+        store.add(objpath, result)
+    yield store
+    store.close()
+
+
+def ids(plan):
+    return [ (objpath, sorted([ i[1] for i in items ])) 
+             for objpath, items in plan ]
+
+
+def test_object_id():
+    url = 'https://csp.infoblox.com/api/ddi/v1/ipam/subnet/abc?_fields=id'
+    assert inventory.object_id(url) == 'ipam/subnet/abc'
+
+
+def test_teardown_plan_skips_cascaded_children(store):
+    plan = inventory.teardown_plan(store.select(CONFIG))
+
+    assert ids(plan) == [ ('/dns/auth_zone', [ ZONE ]), 
+                          ('/dns/view', [ VIEW ]), 
+                          ('/ipam/ip_space', [ SPACE ]) ]
+
+
+def test_teardown_plan_for_a_subnet(store):
+    objects = store.select(CONFIG, subnet='10.0.0.0/24')
+    plan = inventory.teardown_plan(objects)
+
+    assert ids(plan) == [ ('/ipam/address', [ 'ipam/address/1' ]),
+                          ('/ipam/range', [ 'ipam/range/1' ]),
+                          ('/ipam/subnet', [ 'ipam/subnet/1' ]) ]
+    assert plan[0][1][0][2] == '/ipam/address 10.0.0.2'
+
+
+def test_select_by_run(store, tmp_path):
+    first = store.run_id
+    store.finish_run(0)
+    store.start_run(CONFIG)
+    store.add('/dns/record', { 'id': 'dns/record/2', 'zone': ZONE,
+                               'name_in_zone': 'host2' })
+
+    assert store.run_id != first
+    assert [ o[1] for o in store.select(run_id=store.run_id) ] == \
+           [ 'dns/record/2' ]
+    assert len(store.select(run_id=first)) == len(CREATED)
+    assert store.select(dict(CONFIG, ip_space='other', 
+                             dns_view='other')) == []
+
+
+def test_delete_cascades_to_children(store):
+    store.remove(ZONE)
+    store.remove(SPACE)
+    remaining = set([ o[1] for o in store.select(CONFIG) ])
+
+    assert remaining == set([ VIEW ])
+
+
+def test_report(store):
+    store.remove('dns/record/1')
+    store.finish_run(1)
+    runs = store.report()
+
+    assert len(runs) == 1
+    assert runs[0]['exitcode'] == 1
+    assert runs[0]['created']['/ipam/subnet'] == 2
+    assert runs[0]['live']['/dns/record'] == 0
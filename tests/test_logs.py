@@ -0,0 +1,142 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.logs
+
+ Requirements:
+   Python3 with pytest
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import io
+import json
+import logging
+import sys
+import pytest
+from b1ddi_demo import logs
+
+
+@pytest.fixture
+def root():
+    '''
+    Restore the root logger's handlers and level after a test
+    '''
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield root
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def stream_handler(formatter=None):
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(formatter or logging.Formatter('%(message)s'))
+    return handler
+
+
+def test_listener_restarts(root):
+    handler = stream_handler()
+    listener = logs.start([ handler ])
+    log = logging.getLogger('test')
+    for job in range(3):
+        listener.start()
+        log.info("job %s", job)
+        listener.stop()
+        # Records are written by the time the listener has stopped
+        assert handler.stream.getvalue().splitlines()[-1] == 'job ' + str(job)
+    listener.stop()
+
+
+def test_summary_level(root):
+    handler = stream_handler(logging.Formatter('%(levelname)s %(message)s'))
+    listener = logs.start([ handler ], level=logs.LEVELS['summary'])
+    log = logging.getLogger('test')
+    log.info("detail")
+    log.log(logs.SUMMARY, "total %s", 5)
+    log.warning("problem")
+    listener.stop()
+
+    assert logs.LEVELS['summary'] == logs.SUMMARY
+    assert logging.INFO < logs.SUMMARY < logging.WARNING
+    assert handler.stream.getvalue().splitlines() == [ 'SUMMARY total 5',
+                                                       'WARNING problem' ]
+
+
+def test_json_formatter():
+    record = logging.LogRecord('b1ddi_demo.test', logs.SUMMARY, __file__, 1,
+                               "%s objects", (5,), None)
+    entry = json.loads(logs.JSONFormatter().format(record))
+
+    assert entry['level'] == 'SUMMARY'
+    assert entry['logger'] == 'b1ddi_demo.test'
+    assert entry['message'] == '5 objects'
+    assert entry['time'] and 'exception' not in entry
+
+
+def test_json_formatter_exception():
+    try:
+        raise ValueError('bad')
+    except ValueError:
+        record = logging.LogRecord('test', logging.ERROR, __file__, 1, 
+                                   "failed", None, sys.exc_info())
+    entry = json.loads(logs.JSONFormatter().format(record))
+
+    assert entry['message'] == 'failed'
+    assert entry['exception'].endswith('ValueError: bad')
+
+
+def test_message_merged_when_logged(root):
+    handler = stream_handler(logs.JSONFormatter())
+    listener = logs.start([ handler ])
+    log = logging.getLogger('test')
+    counts = { 'created': 1 }
+    log.info("counts %s", counts)
+    counts['created'] = 2
+    try:
+        raise ValueError('bad')
+    except ValueError:
+        log.exception("failed")
+    listener.stop()
+    lines = [ json.loads(l) for l in handler.stream.getvalue().splitlines() ]
+
+    assert lines[0]['message'] == "counts {'created': 1}"
+    assert lines[1]['message'] == 'failed'
+    assert 'ValueError: bad' in lines[1]['exception']
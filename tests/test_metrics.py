@@ -0,0 +1,134 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.metrics
+
+ Requirements:
+   Python3 with pytest
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import json
+import math
+import pickle
+import random
+import pytest
+from b1ddi_demo import metrics
+
+
+def exact(values, p):
+    values = sorted(values)
+    return values[max(0, math.ceil(len(values) * p / 100) - 1)]
+
+
+def test_percentiles_within_bucket_growth():
+    rng = random.Random(3)
+    values = [ rng.lognormvariate(-4, 1) for n in range(5000) ]
+    histogram = metrics.Histogram()
+    for value in values:
+        histogram.record(value)
+
+    assert histogram.count == 5000
+    assert histogram.max == max(values)
+    assert histogram.total == pytest.approx(sum(values))
+    for p in [ 50, 90, 99, 99.9, 100 ]:
+        assert histogram.percentile(p) == pytest.approx(exact(values, p),
+                                                        rel=metrics.GROWTH - 1)
+
+
+def test_empty_and_tiny_values():
+    histogram = metrics.Histogram()
+    assert histogram.percentile(99) == 0.0
+    assert histogram.to_dict()['mean'] == 0.0
+
+    histogram.record(0.0, count=3)
+    assert histogram.percentile(50) == 0.0
+    assert histogram.count == 3
+
+
+def test_merge_matches_recording_everything():
+    one, two, both = metrics.Histogram(), metrics.Histogram(), \
+                     metrics.Histogram()
+    for n in range(1, 200):
+        (one if n % 2 else two).record(n / 1000)
+        both.record(n / 1000)
+    one.merge(two)
+
+    assert one.buckets == both.buckets
+    assert one.count == both.count
+    assert one.max == both.max
+    assert one.total == pytest.approx(both.total)
+
+
+def test_metrics_summary_and_merge():
+    first, second = metrics.Metrics(), metrics.Metrics()
+    first.request('GET', '/ipam/subnet', 0.01, 200, received=100)
+    second.request('GET', '/ipam/subnet', 0.02, 503)
+    second.retry('GET', '/ipam/subnet')
+    second.operation('subnet', 0.5, False)
+    first.merge(second)
+    summary = first.summary()
+
+    subnet = summary['endpoints']['GET /ipam/subnet']
+    assert subnet['count'] == 2
+    assert subnet['status'] == { '200': 1, '503': 1 }
+    assert subnet['retries'] == 1
+    assert subnet['bytes_received'] == 100
+    assert summary['operations']['subnet']['failed'] == 1
+    json.dumps(summary)
+
+
+def test_metrics_pickle():
+    collected = metrics.Metrics()
+    collected.request('POST', '/dns/record', 0.05, 201, sent=300)
+    copy = pickle.loads(pickle.dumps(collected))
+    copy.request('POST', '/dns/record', 0.05, 201)
+
+    assert copy.summary()['endpoints']['POST /dns/record']['count'] == 2
+
+
+def test_prometheus_format():
+    collected = metrics.Metrics()
+    collected.request('GET', '/ipam/subnet', 0.01, 200)
+    text = collected.prometheus()
+
+    assert '# TYPE b1ddi_request_duration_seconds summary' in text
+    assert ('b1ddi_responses_total{method="GET",endpoint="/ipam/subnet",'
+            'code="200"} 1') in text
+    assert ('b1ddi_request_duration_seconds_count{method="GET",'
+            'endpoint="/ipam/subnet"} 1') in text
@@ -0,0 +1,166 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.plan and the compiled demo plan
+
+ Requirements:
+   Python3 with pytest
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import json
+import b1ddi_demo_automation as demo
+from b1ddi_demo import plan
+from b1ddi_demo import shards
+
+
+class Response:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body or {}
+        self.text = json.dumps(self.body)
+
+    def json(self):
+        return self.body
+
+
+class FakeB1DDI:
+    '''
+    Stand in for bloxone.b1ddi, creates of bodies containing "raise" 
+    raise an exception
+    '''
+    return_codes_ok = [ 200, 201, 204 ]
+
+    def __init__(self):
+        self.created = []
+
+    def create(self, objpath, body):
+        if 'raise' in body:
+            raise ValueError('unexpected response')
+        self.created.append(objpath)
+        return Response(201, { 'result': { 'id': objpath.strip('/') + '/1' } })
+
+
+def entry_keys(entries):
+    return sorted([ json.dumps(e, sort_keys=True) for e in entries 
+                    if e['op'] != 'barrier' ])
+
+
+def test_config_hash_ignores_runtime_options(demo_config):
+    runtime = dict(demo_config, workers='8', rate='5', retries='1', 
+                   verbosity='summary', hedge='true', inventory='x.sqlite',
+                   shards='4', soak_rate='100', metrics='m.json')
+
+    assert plan.config_hash(runtime) == plan.config_hash(demo_config)
+
+
+def test_config_hash_changes_with_content(demo_config):
+    digest = plan.config_hash(demo_config)
+
+    assert plan.config_hash(dict(demo_config, no_of_records='5')) != digest
+    assert plan.config_hash(dict(demo_config, seed='2')) != digest
+    assert plan.config_hash(demo_config, version='0.9') != digest
+
+
+def test_cached_plan_compiles_once(demo_config, tmp_path):
+    calls = []
+
+    def compile(config):
+        calls.append(config)
+        return demo.plan_demo(config)
+
+    path = plan.cached_plan(compile, demo_config, str(tmp_path / 'plans'))
+    again = plan.cached_plan(compile, dict(demo_config, workers='8'), 
+                             str(tmp_path / 'plans'))
+
+    assert path == again
+    assert len(calls) == 1
+    assert entry_keys(plan.read_plan(path)) == \
+           entry_keys(demo.plan_demo(demo_config))
+
+
+def test_plan_matches_planned_totals(demo_config):
+    counts = plan.summarise(demo.plan_demo(demo_config))
+    totals = demo.planned_totals(demo_config)
+
+    assert counts['create /dns/record'] == totals['records']
+    assert sum([ n for k, n in counts.items() 
+                 if k.startswith('create /ipam/') ]) == totals['ipam']
+
+
+def test_plan_is_deterministic(demo_config):
+    assert entry_keys(demo.plan_demo(demo_config)) == \
+           entry_keys(demo.plan_demo(dict(demo_config)))
+
+
+def test_shards_compile_the_whole_plan(demo_config):
+    nets = demo.demo_subnet_count(demo_config)
+    hosts = demo.planned_totals(demo_config)['records']
+    entries = list(demo.plan_demo(demo_config, subnets=(0, 0), 
+                                  hosts=(0, 0)))
+    for subnets, records in zip(shards.partition(nets, 3), 
+                                shards.partition(hosts, 3)):
+        entries += demo.plan_demo(demo_config, subnets=subnets, 
+                                  hosts=records, shared=False)
+
+    assert entry_keys(entries) == entry_keys(demo.plan_demo(demo_config))
+
+
+def test_profile_shards_compile_the_whole_plan(demo_config):
+    config = dict(demo_config, profile='small', seed='7')
+    nets = sum([ 1 for subnet in demo.profiles.layout(config) ])
+    entries = list(demo.plan_demo(config, subnets=(0, 0)))
+    for subnets in shards.partition(nets, 4):
+        entries += demo.plan_demo(config, subnets=subnets, shared=False)
+
+    assert entry_keys(entries) == entry_keys(demo.plan_demo(config))
+
+
+def test_executor_counts_errors_as_failed():
+    entries = [ { 'op': 'create', 'objpath': '/ipam/ip_space', 'ref': 'space',
+                  'label': 'IP Space', 'body': '{"name": "demo"}' } ]
+    entries += [ { 'op': 'create', 'objpath': '/ipam/subnet', 
+                   'label': 'Subnet ' + str(n), 'requires': [ 'space' ],
+                   'body': json.dumps({ 'space': plan.ref('space'),
+                                        'comment': 'raise' if n == 1 else '' })}
+                 for n in range(4) ]
+    b1ddi = FakeB1DDI()
+    counts = plan.Executor(b1ddi, workers=2).run(entries)
+
+    assert counts == { 'created': 4, 'found': 0, 'failed': 1, 'skipped': 0 }
+    assert b1ddi.created.count('/ipam/subnet') == 3
@@ -0,0 +1,94 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.profiles
+
+ Requirements:
+   Python3 with pytest
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import collections
+import pytest
+import b1ddi_demo_automation as demo
+from b1ddi_demo import profiles
+from b1ddi_demo import progress
+
+
+@pytest.fixture
+def config(demo_config):
+    return dict(demo_config, profile='small', seed='7')
+
+
+def test_seed_gives_same_layout(config):
+    first = list(profiles.layout(config))
+
+    assert list(profiles.layout(dict(config))) == first
+    assert list(profiles.layout(dict(config, seed='8'))) != first
+    assert [ list(profiles.records(config, s)) for s in first[:3] ] == \
+           [ list(profiles.records(dict(config), s)) for s in first[:3] ]
+
+
+def test_layout_subnets(config):
+    subnets = list(profiles.layout(config))
+    block = profiles.address_block(config)
+    profile = profiles.get_profile('small')
+
+    assert len(subnets) == profile['networks']
+    assert [ s.index for s in subnets ] == list(range(len(subnets)))
+    for subnet, following in zip(subnets, subnets[1:]):
+        assert subnet.network.prefixlen in profile['prefixes']
+        assert subnet.network.subnet_of(block)
+        assert subnet.network.broadcast_address < following.network.network_address
+        low, high = profile['utilization']
+        assert low <= subnet.utilization <= high
+
+
+def test_unknown_profile(config):
+    with pytest.raises(ValueError):
+        list(profiles.layout(dict(config, profile='huge')))
+
+
+def test_totals_match_plan(config):
+    counts = collections.Counter()
+    for entry in demo.plan_demo(config):
+        if entry['op'] == 'create':
+            counts[progress.phase('POST', entry['objpath'])] += 1
+
+    assert profiles.totals(config) == dict(counts)
+    assert demo.planned_totals(config) == dict(counts)
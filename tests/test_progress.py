@@ -0,0 +1,125 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.progress
+
+ Requirements:
+   Python3 with pytest
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import io
+from b1ddi_demo import progress
+
+
+def test_phase():
+    assert progress.phase('POST', '/ipam/subnet') == 'ipam'
+    assert progress.phase('POST', '/dns/auth_zone') == 'zones'
+    assert progress.phase('POST', '/dns/record') == 'records'
+    assert progress.phase('DELETE', '/dns/record') == 'teardown'
+    assert progress.phase('GET', '/ipam/subnet') is None
+
+
+def test_duration():
+    assert progress.duration(0) == '0:00:00'
+    assert progress.duration(75.9) == '0:01:15'
+    assert progress.duration(3725) == '1:02:05'
+
+
+def test_phase_render_and_eta(clock):
+    phase = progress.Phase('records', total=100)
+    phase.update(clock.monotonic())
+    assert phase.render() == 'records 0/100 0% 0.0/s'
+
+    clock.sleep(5)
+    phase.done = 25
+    phase.update(clock.monotonic())
+    assert phase.render() == 'records 25/100 25% 5.0/s ETA 0:00:15'
+
+    # Failed objects will not be retried so are not waited for
+    phase.errors = 25
+    assert phase.render().endswith('ETA 0:00:10')
+
+    phase.total = 0
+    assert phase.render() == 'records 25 5.0/s'
+
+
+def test_rate_window(clock):
+    phase = progress.Phase('ipam')
+    for second in range(20):
+        phase.done = second * (10 if second < 10 else 2)
+        phase.update(clock.monotonic(), window=5)
+        clock.sleep(1)
+
+    # Only the last window counts, not the faster start
+    assert phase.rate == 2.0
+
+
+def test_progress_render(clock):
+    status = progress.Progress(totals={ 'ipam': 10, 'records': 40 }, 
+                               stream=io.StringIO())
+    for n in range(5):
+        status.request_started()
+        status.request_done('POST', '/ipam/subnet', True)
+    status.request_started()
+    status.request_started()
+    status.request_done('POST', '/ipam/subnet', False)
+    status.request_done('GET', '/ipam/subnet', False)
+    status.request_started()
+    clock.sleep(65)
+
+    assert status.render() == ('ipam 5/10 50% 0.0/s | in flight 1 | '
+                               'errors 2 | 0:01:05')
+
+
+def test_progress_eta_and_final_average(clock):
+    status = progress.Progress(totals={ 'records': 100 }, 
+                               stream=io.StringIO(), interval=1)
+    status.render()
+    for second in range(10):
+        clock.sleep(1)
+        for n in range(4):
+            status.request_started()
+            status.request_done('POST', '/dns/record', True)
+        line = status.render()
+
+    assert line.startswith('records 40/100 40% 4.0/s ETA 0:00:15 |')
+    status.expect('records', 20)
+    assert status.render().startswith('records 40/120 33% 4.0/s ETA 0:00:20')
+    # The final line has the average rate over the whole phase
+    assert status.render(final=True).startswith('records 40/120 33% 4.4/s')
@@ -0,0 +1,112 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.ratelimit
+
+ Requirements:
+   Python3 with pytest
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import email.utils
+import time
+import pytest
+from b1ddi_demo import ratelimit
+
+
+class Response:
+    def __init__(self, headers=None):
+        self.headers = headers or {}
+
+
+def test_burst_then_steady_rate(clock):
+    controller = ratelimit.RateController(rate=10, burst=1)
+    waits = [ controller.acquire() for n in range(30) ]
+
+    assert waits[:10] == [ 0.0 ] * 10
+    assert waits[10] == pytest.approx(0.1)
+    # 20 requests beyond the burst take 2 seconds at 10/s
+    assert clock.slept == pytest.approx(2.0)
+    assert controller.requests == 30
+
+
+def test_increase_only_while_limited(clock):
+    controller = ratelimit.RateController(rate=10, max_rate=12, increase=5)
+    clock.sleep(2)
+    controller.success()
+    assert controller.rate == 10
+
+    for n in range(11):
+        controller.acquire()
+    clock.sleep(1)
+    controller.success()
+    assert controller.rate == 12
+
+
+def test_throttle_decreases_once_and_pauses(clock):
+    controller = ratelimit.RateController(rate=10, min_rate=4)
+    clock.sleep(1)
+    controller.throttle(delay=3)
+    controller.throttle()
+    assert controller.rate == 5
+    assert controller.throttled == 2
+
+    assert controller.acquire() == pytest.approx(3.0)
+    clock.sleep(1)
+    controller.throttle()
+    assert controller.rate == 4
+
+
+def test_from_config():
+    config = { 'rate': '0', 'max_rate': '0', 'rate_increase': '5' }
+    assert ratelimit.from_config(config) is None
+
+    controller = ratelimit.from_config(dict(config, rate='20', max_rate='80',
+                                            rate_increase='2.5'))
+    assert controller.rate == 20
+    assert controller.max_rate == 80
+    assert controller.increase == 2.5
+
+
+def test_retry_after():
+    later = email.utils.formatdate(time.time() + 30, usegmt=True)
+
+    assert ratelimit.retry_after(Response({ 'Retry-After': '2.5' })) == 2.5
+    assert 25 < ratelimit.retry_after(Response({ 'Retry-After': later })) <= 30
+    assert ratelimit.retry_after(Response(), default=1.5) == 1.5
+    assert ratelimit.retry_after(Response({ 'Retry-After': '-1' })) == 0.0
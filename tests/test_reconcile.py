@@ -0,0 +1,126 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.reconcile
+
+ Requirements:
+   Python3 with pytest
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import json
+import threading
+from b1ddi_demo import reconcile
+
+
+class Response:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body or {}
+        self.text = json.dumps(self.body)
+
+    def json(self):
+        return self.body
+
+
+class FakeB1DDI:
+    '''
+    Stand in for bloxone.b1ddi recording creates and deletes. Bodies
+    with a "fail" key are rejected.
+    '''
+    return_codes_ok = [ 200, 201, 204 ]
+
+    def __init__(self):
+        self.created = []
+        self.deleted = []
+        self.lock = threading.Lock()
+
+    def create(self, objpath, body):
+        if 'fail' in json.loads(body):
+            return Response(400)
+        with self.lock:
+            self.created.append((objpath, json.loads(body)['name']))
+        return Response(201)
+
+    def delete(self, objpath, id=''):
+        with self.lock:
+            self.deleted.append((objpath, id))
+        return Response(204)
+
+
+def test_diff():
+    existing = { 'a': 'x/1', 'b': 'x/2', 'c': 'x/3' }
+    desired = ( (k, ('Label ' + k, k.upper())) for k in [ 'b', 'c', 'd' ] )
+    missing, stale = reconcile.diff(desired, existing)
+
+    assert missing == [ ('Label d', 'D') ]
+    assert stale == { 'a': 'x/1' }
+    # Existing objects are not modified
+    assert len(existing) == 3
+
+
+def test_diff_no_changes():
+    existing = { 'a': 'x/1' }
+
+    assert reconcile.diff([ ('a', ('Label a', '')) ], existing) == ([], {})
+    assert reconcile.diff([], {}) == ([], {})
+
+
+def test_apply_counts():
+    b1ddi = FakeB1DDI()
+    missing = [ ('Subnet ' + str(n), json.dumps({ 'name': str(n) })) 
+                for n in range(5) ]
+    missing.append(('Bad subnet', '{"name": "bad", "fail": true}'))
+    stale = { '10.0.{}.0/24'.format(n): 'ipam/subnet/' + str(n) 
+              for n in range(3) }
+    counts = reconcile.apply(b1ddi, '/ipam/subnet', missing, stale, 
+                             workers=2)
+
+    assert counts == { 'created': 5, 'deleted': 3, 'failed': 1 }
+    assert sorted(b1ddi.created) == [ ('/ipam/subnet', str(n)) 
+                                      for n in range(5) ]
+    assert sorted(b1ddi.deleted) == [ ('/ipam/subnet', str(n)) 
+                                      for n in range(3) ]
+
+
+def test_apply_nothing_to_do():
+    b1ddi = FakeB1DDI()
+    counts = reconcile.apply(b1ddi, '/ipam/subnet', [], {})
+
+    assert counts == { 'created': 0, 'deleted': 0, 'failed': 0 }
+    assert b1ddi.created == [] and b1ddi.deleted == []
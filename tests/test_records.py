@@ -0,0 +1,132 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.records
+
+ Requirements:
+   Python3 with pytest
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import json
+import threading
+import time
+from b1ddi_demo import records
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.text = ''
+
+
+class FakeB1DDI:
+    '''
+    Stand in for bloxone.b1ddi recording the creates in flight. Bodies
+    with a "fail" key get a 400 response and bodies with a "raise" key 
+    raise an exception.
+    '''
+    return_codes_ok = [ 200, 201, 204 ]
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.inflight = 0
+        self.peak = 0
+        self.completed = 0
+        self.lock = threading.Lock()
+
+    def create(self, objpath, body):
+        with self.lock:
+            self.inflight += 1
+            self.peak = max(self.peak, self.inflight)
+        try:
+            time.sleep(self.delay)
+            if 'raise' in json.loads(body):
+                raise ConnectionError('reset')
+            return Response(400 if 'fail' in json.loads(body) else 201)
+        finally:
+            with self.lock:
+                self.inflight -= 1
+                self.completed += 1
+
+
+def items(count, fail=(), error=()):
+    for n in range(count):
+        body = { 'name': str(n) }
+        if n in fail:
+            body['fail'] = True
+        if n in error:
+            body['raise'] = True
+        yield 'Record ' + str(n), json.dumps(body)
+
+
+def test_counts():
+    b1ddi = FakeB1DDI()
+    counts = records.bulk_create(b1ddi, '/dns/record', 
+                                 items(20, fail=[ 3, 7 ], error=[ 11 ]), 
+                                 window=4)
+
+    assert counts == { 'created': 17, 'failed': 3 }
+
+
+def test_empty():
+    assert records.bulk_create(FakeB1DDI(), '/dns/record', []) == \
+           { 'created': 0, 'failed': 0 }
+
+
+def test_window_limits_requests_in_flight():
+    b1ddi = FakeB1DDI(delay=0.01)
+    counts = records.bulk_create(b1ddi, '/dns/record', items(40), window=5)
+
+    assert counts == { 'created': 40, 'failed': 0 }
+    assert b1ddi.peak == 5
+
+
+def test_items_pulled_as_needed():
+    b1ddi = FakeB1DDI(delay=0.01)
+    pulled = []
+
+    def generate():
+        for label, body in items(20):
+            # Only the next item is held beyond those in the window
+            assert len(pulled) - b1ddi.completed <= 3
+            pulled.append(label)
+            yield label, body
+
+    assert records.bulk_create(b1ddi, '/dns/record', generate(), 
+                               window=3)['created'] == 20
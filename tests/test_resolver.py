@@ -0,0 +1,180 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.resolver
+
+ Requirements:
+   Python3 with pytest
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import json
+from b1ddi_demo import resolver
+
+
+class Response:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body or {}
+
+    def json(self):
+        return self.body
+
+
+class FakeB1DDI:
+    '''
+    Stand in for bloxone.b1ddi holding objects in memory. Filters are
+    only matched on the values they contain.
+    '''
+    return_codes_ok = [ 200, 201, 204 ]
+    ddi_url = 'https://csp.infoblox.com/api/ddi/v1'
+
+    def __init__(self):
+        self.objects = {}
+        self.gets = []
+        self.next_id = 1
+
+    def get(self, objpath, id='', **params):
+        self.gets.append(params.get('_filter', ''))
+        results = [ o for o in self.objects.values() 
+                    if o['id'].startswith(objpath.strip('/')) and
+                    all([ '"' + str(v) + '"' in params.get('_filter', '') 
+                          for k, v in o.items() if k != 'id' ]) ]
+        return Response(200, { 'results': results })
+
+    def get_id(self, objpath, key='', value='', include_path=False):
+        for o in self.objects.values():
+            if o['id'].startswith(objpath.strip('/')) and o[key] == value:
+                return o['id']
+        return ''
+
+    def create(self, objpath, body=''):
+        obj = dict(json.loads(body), 
+                   id=objpath.strip('/') + '/' + str(self.next_id))
+        self.next_id += 1
+        self.objects[obj['id']] = obj
+        return Response(201, { 'result': obj })
+
+    def delete(self, objpath, id=''):
+        full = objpath.strip('/') + '/' + resolver.short_id(id)
+        if self.objects.pop(full, None):
+            return Response(204)
+        return Response(404)
+
+
+def install():
+    b1ddi = FakeB1DDI()
+    resolver.install_resolver(b1ddi)
+    return b1ddi
+
+
+def test_build_filter():
+    assert resolver.build_filter({ 'view': 'v1', 'fqdn': 'a.com' }) == \
+           '(fqdn=="a.com")and(view=="v1")'
+    assert resolver.build_filter({ 'view': 'v1' }, 'fqdn', [ 'a', 'b' ]) == \
+           '(view=="v1")and((fqdn=="a")or(fqdn=="b"))'
+
+
+def test_create_seeds_cache():
+    b1ddi = install()
+    id = b1ddi.create('/dns/view', '{"name": "demo-view"}').json()['result']['id']
+
+    assert b1ddi.get_id('/dns/view', key='name', value='demo-view',
+                        include_path=True) == id
+    assert b1ddi.get_id('/dns/view', key='name', value='demo-view') == '1'
+    assert b1ddi.resolver.hits == 2 and b1ddi.resolver.misses == 0
+
+
+def test_delete_forgets():
+    b1ddi = install()
+    b1ddi.create('/ipam/ip_space', '{"name": "demo"}')
+    b1ddi.delete('/ipam/ip_space', id='1')
+
+    assert b1ddi.resolver.cached('/ipam/ip_space', name='demo') == ''
+    assert b1ddi.get_id('/ipam/ip_space', key='name', value='demo') == ''
+
+
+def test_resolve_many_uses_one_query():
+    b1ddi = FakeB1DDI()
+    for fqdn in [ 'a.com', 'b.com', 'c.com' ]:
+        b1ddi.create('/dns/auth_zone', 
+                     json.dumps({ 'fqdn': fqdn, 'view': 'dns/view/9' }))
+    resolver.install_resolver(b1ddi)
+    b1ddi.resolver.add('/dns/auth_zone', 'dns/auth_zone/1', fqdn='a.com',
+                       view='dns/view/9')
+    ids = resolver.resolve_many(b1ddi, '/dns/auth_zone', 'fqdn', 
+                                [ 'a.com', 'b.com', 'c.com', 'd.com' ],
+                                view='dns/view/9')
+
+    assert ids == { 'a.com': 'dns/auth_zone/1', 'b.com': 'dns/auth_zone/2',
+                    'c.com': 'dns/auth_zone/3' }
+    assert b1ddi.gets == [ '(view=="dns/view/9")and((fqdn=="b.com")or'
+                           '(fqdn=="c.com")or(fqdn=="d.com"))' ]
+    assert b1ddi.resolver.lookup('/dns/auth_zone', fqdn='c.com', 
+                                 view='dns/view/9') == 'dns/auth_zone/3'
+    assert len(b1ddi.gets) == 1
+
+
+def test_stale_persisted_id_is_looked_up_again(tmp_path):
+    path = str(tmp_path / 'ids.json')
+    b1ddi = install()
+    b1ddi.create('/dns/view', '{"name": "demo-view"}')
+    b1ddi.resolver.save(path)
+
+    # The view is recreated with a new id before the clean up run
+    b1ddi.objects.clear()
+    b1ddi.create('/dns/view', '{"name": "demo-view"}')
+    cleanup = FakeB1DDI()
+    cleanup.objects = b1ddi.objects
+    resolver.install_resolver(cleanup, path=path).load()
+    stale = cleanup.get_id('/dns/view', key='name', value='demo-view')
+    response = cleanup.delete('/dns/view', id=stale)
+
+    assert stale == '1'
+    assert response.status_code == 204
+    assert cleanup.objects == {}
+    assert cleanup.resolver.cached('/dns/view', name='demo-view') == ''
+
+
+def test_missing_object_is_not_looked_up_again():
+    b1ddi = install()
+    b1ddi.create('/dns/view', '{"name": "demo-view"}')
+    b1ddi.objects.clear()
+
+    assert b1ddi.delete('/dns/view', id='1').status_code == 404
+    assert b1ddi.gets == []
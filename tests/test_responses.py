@@ -0,0 +1,89 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.responses
+
+ Requirements:
+   Python3 with pytest
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import json
+import pytest
+from b1ddi_demo import responses
+
+
+def chunked(text, size):
+    data = text.encode('utf-8')
+    return [ data[i:i + size] for i in range(0, len(data), size) ]
+
+
+def items(text, size, key='results'):
+    return list(responses.iter_items(chunked(text, size), key=key))
+
+
+@pytest.mark.parametrize('size', [ 1, 2, 3, 5, 64 ])
+def test_numbers_split_across_chunks(size):
+    assert items('{"results":[12345,67890]}', size) == [ 12345, 67890 ]
+
+
+@pytest.mark.parametrize('size', [ 1, 2, 3, 4 ])
+def test_literals_split_across_chunks(size):
+    assert items('{"results":[true,1.5e3,"a",null,false]}', size) == \
+           [ True, 1500.0, 'a', None, False ]
+
+
+@pytest.mark.parametrize('size', [ 1, 2, 7 ])
+def test_strings_and_objects_split_across_chunks(size):
+    results = [ { 'id': 'ipam/subnet/' + str(i), 'comment': 'café "%s"' % i,
+                  'tags': { 'n': i } } for i in range(5) ]
+    text = json.dumps({ 'results': results, 'total': 5 }, ensure_ascii=False)
+
+    assert items(text, size) == results
+
+
+def test_key_split_across_chunks():
+    text = '{"total": 2, "results" :\n [ 1 , 2 ] }'
+
+    assert items(text, 1) == [ 1, 2 ]
+    assert items('{"other": [1]}', 2) == []
+
+
+def test_truncated_body_raises():
+    with pytest.raises(ValueError):
+        items('{"results":[1, 2, {"id": "ipam', 3)
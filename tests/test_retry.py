@@ -0,0 +1,181 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.retry
+
+ Requirements:
+   Python3 with pytest and requests
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import random
+import pytest
+import requests
+from b1ddi_demo import retry
+
+URL = 'https://csp.infoblox.com/api/ddi/v1/ipam/subnet'
+
+
+class FakeAPI:
+    '''
+    Stand in for the bloxone request methods, returning responses with
+    the queued status codes or raising queued exceptions
+    '''
+
+    def __init__(self, *codes):
+        self.codes = list(codes)
+        self.calls = 0
+
+    def _request(self, url, *args, **kwargs):
+        self.calls += 1
+        code = self.codes.pop(0)
+        if isinstance(code, Exception):
+            raise code
+        return retry.error_response('test', status_code=code)
+
+    _apiget = _apipost = _apidelete = _apiput = _apipatch = _request
+
+
+def install(api, attempts=4, threshold=10):
+    return retry.install_retry(api, retry.RetryPolicy(attempts=attempts),
+                               retry.Breakers(threshold=threshold))
+
+
+def test_retryable():
+    policy = retry.RetryPolicy()
+
+    assert policy.retryable('GET', retry.error_response('', 503))
+    assert policy.retryable('DELETE', retry.error_response('', 500))
+    assert not policy.retryable('GET', retry.error_response('', 404))
+    assert policy.retryable('POST', retry.error_response('', 503))
+    assert not policy.retryable('POST', retry.error_response('', 500))
+    assert policy.retryable('GET', 
+                            error=requests.exceptions.ConnectionError())
+    assert policy.retryable('POST', 
+                            error=requests.exceptions.ConnectTimeout())
+    assert not policy.retryable('POST', 
+                                error=requests.exceptions.ReadTimeout())
+
+
+def test_backoff_is_capped():
+    random.seed(1)
+    policy = retry.RetryPolicy(base=0.5, cap=3.0)
+
+    for attempt in range(1, 8):
+        delays = [ policy.backoff(attempt) for n in range(50) ]
+        assert 0 <= min(delays)
+        assert max(delays) <= min(3.0, 0.5 * 2 ** attempt)
+
+
+def test_breaker_opens_and_half_opens(clock):
+    breaker = retry.CircuitBreaker(threshold=3, reset=10)
+    for n in range(3):
+        assert breaker.allow()
+        breaker.record(False)
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+    clock.sleep(10)
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record(False)
+    assert breaker.state == 'open'
+
+    clock.sleep(10)
+    assert breaker.allow()
+    breaker.record(True)
+    assert breaker.state == 'closed'
+    assert breaker.allow()
+
+
+def test_retries_until_success(clock):
+    api = FakeAPI(503, 502, 200)
+    policy = install(api)
+    response = api._apiget(URL)
+
+    assert response.status_code == 200
+    assert api.calls == 3
+    assert policy.retries == 2
+    assert policy.gave_up == 0
+
+
+def test_gives_up_after_attempts(clock):
+    api = FakeAPI(*[ 503 ] * 10)
+    policy = install(api, attempts=4)
+
+    assert api._apiget(URL).status_code == 503
+    assert api.calls == 4
+    assert policy.gave_up == 1
+
+
+def test_create_not_retried_on_500(clock):
+    api = FakeAPI(500, 200)
+    policy = install(api)
+
+    assert api._apipost(URL).status_code == 500
+    assert policy.retries == 0
+
+
+def test_open_circuit_fails_fast(clock):
+    api = FakeAPI(*[ 503 ] * 4)
+    install(api, attempts=1, threshold=2)
+    api._apiget(URL)
+    api._apiget(URL)
+
+    assert api._apiget(URL).status_code == 503
+    assert api.calls == 2
+    assert api.breakers.open_endpoints() == [ '/ipam/subnet' ]
+
+
+def test_unexpected_error_recorded_by_breaker(clock):
+    api = FakeAPI(503, 503, ValueError('bad body'), 200)
+    install(api, attempts=1, threshold=2)
+    api._apiget(URL)
+    api._apiget(URL)
+    breaker = api.breakers.get('/ipam/subnet')
+    assert breaker.state == 'open'
+
+    # A half-open trial that raises reopens the circuit
+    clock.sleep(30)
+    with pytest.raises(ValueError):
+        api._apiget(URL)
+    assert breaker.state == 'open'
+
+    clock.sleep(30)
+    assert api._apiget(URL).status_code == 200
+    assert breaker.state == 'closed'
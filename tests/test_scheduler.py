@@ -0,0 +1,113 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.scheduler
+
+ Requirements:
+   Python3 with pytest
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import threading
+import pytest
+from b1ddi_demo import scheduler
+
+
+def test_dependencies_run_in_order():
+    order = []
+    tasks = scheduler.Scheduler(workers=4)
+    tasks.add('a', lambda: order.append('a') or True)
+    tasks.add('b', lambda: order.append('b') or True, requires=['a'])
+    tasks.add('c', lambda: order.append('c') or True, after=['b'])
+    summary = tasks.run()
+
+    assert order == [ 'a', 'b', 'c' ]
+    assert sorted(summary['ok']) == [ 'a', 'b', 'c' ]
+
+
+def test_results_are_substituted():
+    tasks = scheduler.Scheduler()
+    tasks.add('id', lambda: 'ipam/ip_space/1')
+    tasks.add('use', lambda id, suffix='': id + suffix, 
+              scheduler.Result('id'), suffix='/x', requires=['id'])
+    tasks.run()
+
+    assert tasks.result('use') == 'ipam/ip_space/1/x'
+
+
+def test_failure_skips_requires_but_not_after():
+    tasks = scheduler.Scheduler()
+    tasks.add('fail', lambda: False)
+    tasks.add('needs', lambda: True, requires=['fail'])
+    tasks.add('then', lambda: True, requires=['needs'])
+    tasks.add('later', lambda: True, after=['fail'])
+    summary = tasks.run()
+
+    assert summary['failed'] == [ 'fail' ]
+    assert sorted(summary['skipped']) == [ 'needs', 'then' ]
+    assert summary['ok'] == [ 'later' ]
+
+
+def test_exception_is_a_failure():
+    def broken():
+        raise RuntimeError('broken')
+
+    tasks = scheduler.Scheduler()
+    tasks.add('broken', broken)
+
+    assert tasks.run()['failed'] == [ 'broken' ]
+    assert tasks.result('broken') is None
+
+
+def test_independent_tasks_run_concurrently():
+    # Both tasks must be running at once to pass the barrier
+    barrier = threading.Barrier(2, timeout=5)
+    tasks = scheduler.Scheduler(workers=2)
+    tasks.add('a', lambda: barrier.wait() is not None)
+    tasks.add('b', lambda: barrier.wait() is not None)
+
+    assert sorted(tasks.run()['ok']) == [ 'a', 'b' ]
+
+
+def test_invalid_graph():
+    tasks = scheduler.Scheduler()
+    tasks.add('a', lambda: True)
+    with pytest.raises(ValueError):
+        tasks.add('a', lambda: True)
+    with pytest.raises(ValueError):
+        tasks.add('b', lambda: True, requires=['missing'])
@@ -0,0 +1,92 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.shards
+
+ Requirements:
+   Python3 with pytest
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import os
+from b1ddi_demo import shards
+
+# Number of times init_worker() has run in this process
+initialised = 0
+
+
+def init_worker(increment):
+    global initialised
+    initialised += increment
+
+
+def worker_state(job):
+    return os.getpid(), initialised
+
+
+def test_partition_covers_all_items():
+    for total in [ 0, 1, 7, 100, 1001 ]:
+        for count in [ 1, 2, 3, 8 ]:
+            ranges = shards.partition(total, count)
+            sizes = [ stop - start for start, stop in ranges ]
+
+            assert len(ranges) == count
+            assert ranges[0][0] == 0 and ranges[-1][1] == total
+            assert all([ a[1] == b[0] for a, b in zip(ranges, ranges[1:]) ])
+            assert max(sizes) - min(sizes) <= 1
+
+
+def test_partition_examples():
+    assert shards.partition(10, 3) == [ (0, 4), (4, 7), (7, 10) ]
+    assert shards.partition(2, 4) == [ (0, 1), (1, 2), (2, 2), (2, 2) ]
+    assert shards.partition(5, 0) == [ (0, 5) ]
+
+
+def test_run_returns_results_in_order():
+    # Builtins can be pickled to the spawned workers
+    results = shards.run(divmod, [ (7, 2), (1, 0), (9, 3) ], processes=2)
+
+    assert results == [ (3, 1), None, (3, 0) ]
+
+
+def test_run_initialises_each_worker_once():
+    results = shards.run(worker_state, [ (n,) for n in range(6) ], 
+                         processes=2, initializer=init_worker, initargs=(1,))
+
+    assert len(set([ pid for pid, count in results ])) <= 2
+    assert [ count for pid, count in results ] == [ 1 ] * 6
@@ -0,0 +1,173 @@
+'''
+
+ Description:
+
+    Round trip tests creating and removing the demo against the B1DDI
+    simulator, run in process on a free port
+
+ Requirements:
+   Python3 with pytest, bloxone and requests
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import threading
+import io
+import pytest
+import b1ddi_demo_automation as demo
+import b1ddi_sim
+import bench_demo
+from b1ddi_demo import client
+
+
+@pytest.fixture(scope='module')
+def server():
+    server = b1ddi_sim.make_server()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def config(server, tmp_path):
+    server.sim.reset()
+    config = bench_demo.write_config(str(tmp_path), server.server_port, 
+                                     'small')
+    config['inventory'] = str(tmp_path / 'inventory.sqlite')
+    # No client rate limit, as the benchmark
+    config['rate'] = '0'
+
+    return config
+
+
+def run(func, config, remove=False, reporter=None, **kwargs):
+    '''
+    Call func with a new client, as a run of the script would
+    '''
+    b1ddi = demo.setup_client(client.connect(config['b1inifile']), config,
+                              remove=remove, reporter=reporter)
+    exitcode = func(b1ddi, config, **kwargs)
+    if hasattr(b1ddi, 'inventory'):
+        b1ddi.inventory.finish_run(exitcode)
+        b1ddi.inventory.close()
+    if hasattr(b1ddi, 'hedger'):
+        b1ddi.hedger.close()
+
+    return exitcode
+
+
+def objects(server):
+    # Objects created by the demo, the simulator provides the NSG
+    stats = server.sim.stats()['objects']
+    stats.pop('/dns/auth_nsg', None)
+
+    return { k: v for k, v in stats.items() if v }
+
+
+def planned(config):
+    totals = demo.planned_totals(config)
+    return totals['ipam'] + totals['zones'] + totals['records']
+
+
+def test_create_and_clean_up(server, config):
+    config['inventory'] = ''
+    assert run(demo.create_demo, config) == 0
+    assert sum(objects(server).values()) == planned(config)
+    assert objects(server)['/ipam/subnet'] == 10
+
+    assert run(demo.clean_up, config, remove=True) == 0
+    assert objects(server) == {}
+
+
+def test_concurrent_create_and_inventory_remove(server, config):
+    config.update(workers='4', record_window='8', hedge='true')
+    assert run(demo.create_demo, config) == 0
+    assert sum(objects(server).values()) == planned(config)
+
+    assert run(demo.remove_demo, config, remove=True, 
+               subnet='10.0.0.0/24') == 0
+    assert objects(server)['/ipam/subnet'] == 9
+
+    assert run(demo.remove_demo, config, remove=True) == 0
+    assert objects(server) == {}
+
+
+def test_sharded_create(server, config):
+    config.update(shards='2', workers='2')
+    assert run(demo.create_demo, config) == 0
+    assert sum(objects(server).values()) == planned(config)
+
+    assert run(demo.remove_demo, config, remove=True) == 0
+    assert objects(server) == {}
+
+
+def deletes(server):
+    return sum([ count for request, count in server.sim.stats()['requests'].items()
+                 if request.startswith('DELETE') ])
+
+
+@pytest.mark.parametrize('workers', [ '1', '4' ])
+def test_teardown_progress_matches_deletes(server, config, workers):
+    config.update(inventory='', workers=workers)
+    assert run(demo.create_demo, config) == 0
+
+    reporter = demo.progress.Progress(stream=io.StringIO())
+    assert run(demo.clean_up, config, remove=True, reporter=reporter) == 0
+    teardown = reporter.phases['teardown']
+
+    assert objects(server) == {}
+    assert teardown.total == demo.planned_deletes(config)
+    assert teardown.done == teardown.total == deletes(server)
+    assert teardown.errors == 0
+
+
+def test_sweep_progress_matches_deletes(server, config):
+    config['inventory'] = ''
+    assert run(demo.create_demo, config) == 0
+
+    reporter = demo.progress.Progress(stream=io.StringIO())
+    def sweep(b1ddi, config):
+        demo.progress.expect(b1ddi, 'teardown', demo.planned_deletes(config))
+        counts = demo.sweep.sweep(b1ddi, 
+                    demo.sweep.tag_filter(Owner=config['owner']))
+        return 1 if counts['failed'] else 0
+    assert run(sweep, config, remove=True, reporter=reporter) == 0
+    teardown = reporter.phases['teardown']
+
+    assert objects(server) == {}
+    assert teardown.done == teardown.total == deletes(server)
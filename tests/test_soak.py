@@ -0,0 +1,177 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.soak
+
+ Requirements:
+   Python3 with pytest
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import json
+import time
+import pytest
+from b1ddi_demo import addressing
+from b1ddi_demo import soak
+
+
+class Response:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body or {}
+        self.text = json.dumps(self.body)
+
+    def json(self):
+        return self.body
+
+
+class FakeB1DDI:
+    '''
+    Stand in for bloxone.b1ddi, requests raise while error is set
+    '''
+    return_codes_ok = [ 200, 201, 204 ]
+
+    def __init__(self):
+        self.error = None
+        self.delay = 0.0
+        self.next_id = 1
+
+    def request(self):
+        if self.error:
+            raise self.error
+        time.sleep(self.delay)
+        self.next_id += 1
+        return Response(201, { 'result': { 'id': 'x/' + str(self.next_id) } })
+
+    def create(self, objpath, body):
+        return self.request()
+
+    def replace(self, objpath, id='', body=''):
+        return self.request()
+
+    def delete(self, objpath, id=''):
+        return self.request()
+
+
+def test_parse_mix():
+    assert soak.parse_mix('create_record=60, delete_record=40,') == \
+           { 'create_record': 60.0, 'delete_record': 40.0 }
+    assert soak.parse_mix('update_address') == { 'update_address': 1.0 }
+    assert soak.parse_mix('') == soak.parse_mix(soak.DEFAULT_MIX)
+    assert sum(soak.parse_mix('').values()) == 100
+
+
+@pytest.mark.parametrize('text', [ 'create_host=1', 'create_record=-1',
+                                   'create_record=0,delete_record=0',
+                                   'create_record=x' ])
+def test_parse_mix_errors(text):
+    with pytest.raises(ValueError):
+        soak.parse_mix(text)
+
+
+def test_parse_slo():
+    assert soak.parse_slo('p99=0.5, p50=0.1,errors=0.01') == \
+           { 'p99': 0.5, 'p50': 0.1, 'errors': 0.01 }
+    assert soak.parse_slo('p99.9=2') == { 'p99.9': 2.0 }
+    assert soak.parse_slo('') == {}
+
+
+@pytest.mark.parametrize('text', [ 'p0=1', 'p101=1', 'latency=1', 'p=1',
+                                   'p99=slow' ])
+def test_parse_slo_errors(text):
+    with pytest.raises(ValueError):
+        soak.parse_slo(text)
+
+
+@pytest.fixture
+def runner(demo_config):
+    runner = soak.Soak(FakeB1DDI(), demo_config, seed=1)
+    runner.space = 'ipam/ip_space/1'
+    runner.zone = 'dns/auth_zone/1'
+    runner.network = next(addressing.iter_subnets(demo_config['base_net'],
+                          demo_config['container_cidr'], 
+                          demo_config['cidr'], 0, 1))
+    return runner
+
+
+def test_failed_create_returns_address(runner):
+    runner.b1ddi.error = ConnectionError('reset')
+    with pytest.raises(ConnectionError):
+        runner.execute('create_address')
+
+    assert len(runner.freed) == 1
+    assert runner.created['address'] == []
+
+    runner.b1ddi.error = None
+    assert runner.execute('create_address') == ('create_address', True)
+    assert len(runner.freed) == 0
+    assert len(runner.created['address']) == 1
+
+
+@pytest.mark.parametrize('op', [ 'update_record', 'delete_record' ])
+def test_failed_request_returns_object(runner, op):
+    runner.execute('create_record')
+    created = list(runner.created['record'])
+    runner.b1ddi.error = ConnectionError('reset')
+    with pytest.raises(ConnectionError):
+        runner.execute(op)
+
+    assert runner.created['record'] == created
+
+    runner.b1ddi.error = None
+    runner.execute(op)
+    assert len(runner.created['record']) == (1 if op == 'update_record' else 0)
+
+
+def test_latency_measured_from_schedule(runner):
+    # One worker taking 0.1s per operation cannot keep up with 20/s, so
+    # later operations wait and their latency includes the wait
+    runner.b1ddi.delay = 0.1
+    runner.rate = 20.0
+    runner.duration = 0.5
+    runner.workers = 1
+    runner.mix = soak.parse_mix('create_record=1')
+    summary = runner.run()
+    all = summary['operations']['all']
+
+    assert all['ok'] == 10 and all['failed'] == 0
+    assert all['service']['max'] < 0.2
+    assert all['latency']['max'] > 0.45
+    assert summary['max_lag'] > 0.3
+    assert runner.breaches({ 'p50': 0.2, 'errors': 0.0 }) == [ 
+        'p50 {:0.4f} > 0.2'.format(runner.latency['all'].percentile(50)) ]
@@ -0,0 +1,156 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.sweep
+
+ Requirements:
+   Python3 with pytest
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import threading
+import pytest
+from b1ddi_demo import sweep
+from b1ddi_demo import teardown
+
+
+class Response:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body or {}
+        self.text = ''
+
+    def json(self):
+        return self.body
+
+
+class FakeB1DDI:
+    '''
+    Stand in for bloxone.b1ddi holding objects of one type per path.
+    Deletes of ids in fail never succeed, other deletes only take effect
+    after lag further list requests, as the API completes some deletes 
+    asynchronously.
+    '''
+    return_codes_ok = [ 200, 201, 204 ]
+
+    def __init__(self, objects, fail=(), lag=0):
+        self.objects = objects
+        self.fail = set(fail)
+        self.lag = lag
+        self.pending = {}
+        self.gets = []
+        self.deletes = []
+        self.lock = threading.Lock()
+
+    def get(self, objpath, _offset='0', _limit='1000', **params):
+        with self.lock:
+            self.gets.append((objpath, int(_offset), _limit))
+            for id in list(self.pending):
+                self.pending[id] -= 1
+                if self.pending[id] < 0:
+                    del self.pending[id]
+                    self.objects[objpath] = [ o for o in self.objects[objpath]
+                                              if o['id'] != id ]
+            start = int(_offset)
+            page = self.objects.get(objpath, [])[start:start + int(_limit)]
+        return Response(200, { 'results': page })
+
+    def delete(self, objpath, id=''):
+        id = objpath.strip('/') + '/' + id
+        with self.lock:
+            self.deletes.append(id)
+            if id in self.fail:
+                return Response(500)
+            self.pending[id] = self.lag
+        return Response(204)
+
+
+def zones(count):
+    return [ { 'id': 'dns/auth_zone/' + str(n), 'fqdn': str(n) + '.com' }
+             for n in range(count) ]
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(teardown.time, 'sleep', lambda delay: None)
+
+
+def test_drain_pages():
+    b1ddi = FakeB1DDI({ '/dns/auth_zone': zones(25) })
+    counts = sweep.drain(b1ddi, '/dns/auth_zone', workers=4, page_size=10)
+
+    assert counts == { 'deleted': 25, 'failed': 0 }
+    assert b1ddi.objects['/dns/auth_zone'] == []
+    assert len(b1ddi.deletes) == 25
+
+
+def test_drain_skips_failed_objects():
+    fail = [ 'dns/auth_zone/0', 'dns/auth_zone/11' ]
+    b1ddi = FakeB1DDI({ '/dns/auth_zone': zones(25) }, fail=fail)
+    counts = sweep.drain(b1ddi, '/dns/auth_zone', workers=4, page_size=10)
+
+    assert counts == { 'deleted': 23, 'failed': 2 }
+    assert [ o['id'] for o in b1ddi.objects['/dns/auth_zone'] ] == fail
+    # Failed objects stay in the results so later pages start after them
+    assert [ get[1] for get in b1ddi.gets ] == [ 0, 1, 2, 2 ]
+    # Each object is only deleted once
+    assert len(b1ddi.deletes) == 25
+
+
+def test_drain_waits_for_async_deletes():
+    b1ddi = FakeB1DDI({ '/dns/auth_zone': zones(25) }, lag=2)
+    counts = sweep.drain(b1ddi, '/dns/auth_zone', workers=4, page_size=10)
+
+    assert counts == { 'deleted': 25, 'failed': 0 }
+    assert b1ddi.objects['/dns/auth_zone'] == []
+    assert sorted(b1ddi.deletes) == sorted(z['id'] for z in zones(25))
+
+
+def test_sweep_waits_for_zones_before_views():
+    b1ddi = FakeB1DDI({ '/dns/auth_zone': zones(3), 
+                        '/dns/view': [ { 'id': 'dns/view/1', 'name': 'v' } ] },
+                      lag=3)
+    counts = sweep.sweep(b1ddi, sweep.tag_filter(), workers=2)
+
+    assert counts == { 'deleted': 4, 'failed': 0 }
+    assert b1ddi.deletes[-1] == 'dns/view/1'
+    # The zones were checked before the views were listed
+    paths = [ (path, limit) for path, offset, limit in b1ddi.gets ]
+    check = paths.index(('/dns/auth_zone', '1'))
+    assert check < paths.index(('/dns/view', '1000'))
+    assert '/dns/auth_zone' not in dict(paths[check + 1:])
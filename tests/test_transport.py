@@ -0,0 +1,142 @@
+'''
+
+ Description:
+
+    Tests for b1ddi_demo.transport
+
+ Requirements:
+   Python3 with pytest
+
+ Author: Chris Marrison
+
+ Date Last Updated: 20261017
+
+ Todo:
+
+ Copyright (c) 2020 Chris Marrison / Infoblox
+
+ Redistribution and use in source and binary forms,
+ with or without modification, are permitted provided
+ that the following conditions are met:
+
+ 1. Redistributions of source code must retain the above copyright
+ notice, this list of conditions and the following disclaimer.
+
+ 2. Redistributions in binary form must reproduce the above copyright
+ notice, this list of conditions and the following disclaimer in the
+ documentation and/or other materials provided with the distribution.
+
+ THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+ FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+ COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+ INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+ BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+ LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+ CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+ LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+ ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ POSSIBILITY OF SUCH DAMAGE.
+
+'''
+__author__ = 'Chris Marrison'
+__author_email__ = 'chris@infoblox.com'
+
+import gzip
+import http.server
+import json
+import threading
+import pytest
+from b1ddi_demo import transport
+
+HEADERS = { 'Content-Type': 'application/json' }
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    '''
+    Keep-alive server recording the Accept-Encoding of each request and
+    compressing the response when gzip is accepted
+    '''
+    protocol_version = 'HTTP/1.1'
+
+    def respond(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(length)
+        encoding = self.headers.get('Accept-Encoding', '')
+        self.server.encodings.append((self.command, encoding))
+        body = json.dumps({ 'results': [ { 'id': n } for n in range(100) ] })
+        body = body.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if 'gzip' in encoding:
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = respond
+
+    def log_message(self, *args):
+        return
+
+
+@pytest.fixture(scope='module')
+def server():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.encodings = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def url(server):
+    server.encodings.clear()
+    return 'http://127.0.0.1:{}/api/ddi/v1/ipam/subnet'.format(
+        server.server_address[1])
+
+
+def test_gzip_requested_for_gets(server, url):
+    api = transport.Transport()
+    response = api.request('GET', url, HEADERS)
+    api.request('POST', url, HEADERS, body='{}')
+    api.close()
+
+    assert server.encodings == [ ('GET', 'gzip'), ('POST', 'identity') ]
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert len(response.json()['results']) == 100
+
+
+def test_compress_off(server, url):
+    api = transport.Transport(compress=False)
+    response = api.request('GET', url, HEADERS)
+    api.close()
+
+    assert server.encodings == [ ('GET', 'identity') ]
+    assert 'Content-Encoding' not in response.headers
+    assert len(response.json()['results']) == 100
+
+
+def test_pool_stats(url):
+    api = transport.Transport(pool_size=3)
+    sizes = [ len(api.request('GET', url, HEADERS).content) 
+              for n in range(5) ]
+    stats = api.pool_stats()
+    api.close()
+
+    assert stats == { 'requests': 5, 'connections': 1, 'reused': 4,
+                      'bytes': sum(sizes), 'pool_size': 3 }
+
+
+def test_streamed_bytes_not_counted(url):
+    api = transport.Transport()
+    response = api.request('GET', url, HEADERS, stream=True)
+
+    assert response.streamed
+    assert api.pool_stats()['bytes'] == 0
+    assert len(response.json()['results']) == 100
+    api.close()